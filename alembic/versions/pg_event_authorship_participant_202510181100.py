@@ -0,0 +1,73 @@
+"""Event authorship and participants; merges the two root heads
+
+- events gain min_confirmations_for_edit (default 3) and created_by_user_id
+  (FK users, nullable: older events have no recorded author);
+- participant(id, event_id -> events, user_id -> users, display_name, lat,
+  lng, confirmed_at): one row per confirmation.  Its indexes come with
+  pg_hot_path_indexes, the FK into events is dropped again by
+  pg_monthly_partitions.
+
+Runs before the partitions migration, which recreates the compatibility
+"event" view as SELECT * over events, so the new columns show through it.
+Every step checks what exists first; PostgreSQL only, a no-op elsewhere.
+
+Revision ID: pg_event_authorship_participant_202510181100
+Revises: pg_baseline_20250814, pg_init_users_202508241125
+Create Date: 2025-10-18T11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_event_authorship_participant_202510181100'
+down_revision = ('pg_baseline_20250814', 'pg_init_users_202508241125')
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    # physical tables only: the baseline leaves compatibility *views* named "event"/"user"
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _event_table(tables):
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    tables = _tables()
+    event = _event_table(tables)
+    if not event:
+        return
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns(event)}
+    if 'min_confirmations_for_edit' not in columns:
+        op.add_column(event, sa.Column('min_confirmations_for_edit', sa.Integer(), nullable=False,
+                                       server_default=sa.text('3')))
+    if 'created_by_user_id' not in columns:
+        op.add_column(event, sa.Column('created_by_user_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(f'{event}_created_by_user_id_fkey', event, 'users', ['created_by_user_id'], ['id'])
+
+    if 'participant' not in tables:
+        op.create_table(
+            'participant',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('event_id', sa.Integer(), sa.ForeignKey(f'{event}.id'), nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('display_name', sa.String(length=200), nullable=False),
+            sa.Column('lat', sa.Float(), nullable=True),
+            sa.Column('lng', sa.Float(), nullable=True),
+            sa.Column('confirmed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    tables = _tables()
+    event = _event_table(tables)
+    op.execute('DROP TABLE IF EXISTS participant')
+    if event:
+        op.execute(f'ALTER TABLE {event} DROP COLUMN IF EXISTS created_by_user_id')
+        op.execute(f'ALTER TABLE {event} DROP COLUMN IF EXISTS min_confirmations_for_edit')
@@ -0,0 +1,43 @@
+"""event_change: append-only change log behind GET /events/changes
+
+- event_change(seq, event_id, op, changed_at); seq is an identity column and
+  the delta-sync cursor, so it must never be reused (pruning keeps it going);
+- ix_event_change_event_id for the per-event lookups.  No FK on event_id:
+  entries outlive the events they describe.
+
+Every event write appends a row (backend.services.changes.record_change), so
+this has to exist before the API serves writes.  PostgreSQL only; a no-op
+elsewhere.
+
+Revision ID: pg_event_change_202510181800
+Revises: pg_location_trail_202510181700
+Create Date: 2025-10-18T18:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_event_change_202510181800'
+down_revision = 'pg_location_trail_202510181700'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_table(
+        'event_change',
+        sa.Column('seq', sa.Integer(), sa.Identity(), primary_key=True),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(length=8), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_event_change_event_id', 'event_change', ['event_id'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_event_change_event_id', table_name='event_change')
+    op.drop_table('event_change')
@@ -0,0 +1,48 @@
+"""Event coordinates: drop the baseline DEFAULT 0
+
+The baseline declares event.lat / event.lng NOT NULL DEFAULT 0.
+pg_job_queue dropped the NOT NULL, but the default still turned an insert
+without coordinates into (0, 0) instead of NULL, so the geocode job never
+picked it up.  Both constraints go here; on a partitioned parent this
+reaches every partition.
+
+PostgreSQL only; a no-op elsewhere.
+
+Revision ID: pg_event_coordinates_202510181900
+Revises: pg_event_change_202510181800
+Create Date: 2025-10-18T19:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_event_coordinates_202510181900'
+down_revision = 'pg_event_change_202510181800'
+branch_labels = None
+depends_on = None
+
+
+def _event_table():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    event = _event_table()
+    if not event:
+        return
+    for column in ('lat', 'lng'):
+        op.execute(f'ALTER TABLE {event} ALTER COLUMN {column} DROP NOT NULL, ALTER COLUMN {column} DROP DEFAULT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    event = _event_table()
+    if not event:
+        return
+    # NOT NULL is pg_job_queue's to restore; only the default comes back here
+    for column in ('lat', 'lng'):
+        op.execute(f'ALTER TABLE {event} ALTER COLUMN {column} SET DEFAULT 0')
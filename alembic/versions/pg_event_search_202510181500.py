@@ -0,0 +1,75 @@
+"""Trigram index for GET /events/search
+
+- pg_trgm extension;
+- ix_event_search_trgm: GIN (gin_trgm_ops) on
+  title || ' ' || address || ' ' || description, the expression the search
+  queries repeat (models.event.search_document); serves ILIKE '%term%' in
+  any script, Hebrew included.
+
+Built without blocking writes.  On a partitioned event the parent index is
+created ON ONLY the parent (invalid until complete), each partition's index
+is built CONCURRENTLY and attached; partitions created later inherit it.
+IF NOT EXISTS throughout, so an interrupted run can be retried.
+
+Revision ID: pg_event_search_202510181500
+Revises: pg_event_summary_202510181400
+Create Date: 2025-10-18T15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_event_search_202510181500'
+down_revision = 'pg_event_summary_202510181400'
+branch_labels = None
+depends_on = None
+
+INDEX = 'ix_event_search_trgm'
+EXPR = "USING gin (((((title || ' ') || address) || ' ') || description) gin_trgm_ops)"
+
+
+def _event_table():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def _partitions(table):
+    kind = op.get_bind().execute(
+        sa.text('SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)'), {'t': table}
+    ).scalar()
+    if kind != 'p':
+        return None
+    return [row[0] for row in op.get_bind().execute(sa.text(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = to_regclass(:t) ORDER BY 1'
+    ), {'t': table})]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    event = _event_table()
+    if not event:
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    partitions = _partitions(event)
+    if partitions is None:
+        with op.get_context().autocommit_block():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX} ON {event} {EXPR}')
+        return
+    op.execute(f'CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY {event} {EXPR}')
+    with op.get_context().autocommit_block():
+        for part in partitions:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {part}_search_trgm ON {part} {EXPR}')
+            attached = op.get_bind().execute(sa.text(
+                'SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:child) AND inhparent = to_regclass(:parent)'
+            ), {'child': f'{part}_search_trgm', 'parent': INDEX}).scalar()
+            if not attached:
+                op.execute(f'ALTER INDEX {INDEX} ATTACH PARTITION {part}_search_trgm')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # partition indexes attached to it go with it; pg_trgm may have other users
+    op.execute(f'DROP INDEX IF EXISTS {INDEX}')
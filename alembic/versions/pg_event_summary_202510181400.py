@@ -0,0 +1,117 @@
+"""event_summary: per-event confirmation counts kept current by triggers
+
+- event_summary(event_id, confirmations, required_attendees) plus stored
+  generated still_needed and status ('open' | 'filled');
+- backfilled from event/participant in the same transaction;
+- row triggers on event (insert/delete/required_attendees) and participant
+  (insert/delete/event_id) apply +1/-1 deltas; both tables may be
+  partitioned (row triggers on a partitioned parent apply to every partition).
+  Without a participant table only the event side is installed and
+  confirmations stay 0.
+
+Mirrors the SQLite triggers declared with the model for create_all.
+
+Revision ID: pg_event_summary_202510181400
+Revises: pg_monthly_partitions_202510181300
+Create Date: 2025-10-18T14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_event_summary_202510181400'
+down_revision = 'pg_monthly_partitions_202510181300'
+branch_labels = None
+depends_on = None
+
+
+def _event_table():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    event = _event_table()
+    if not event:
+        return
+    # the listings read event_summary on every request, so it is created even
+    # without participant; then confirmations simply stay 0
+    participants = 'participant' in set(sa.inspect(op.get_bind()).get_table_names())
+    count = '(SELECT count(*) FROM participant WHERE event_id = NEW.id)' if participants else '0'
+
+    op.create_table(
+        'event_summary',
+        sa.Column('event_id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('confirmations', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('required_attendees', sa.Integer(), nullable=False, server_default=sa.text('1')),
+        sa.Column('still_needed', sa.Integer(), sa.Computed(
+            'CASE WHEN required_attendees > confirmations THEN required_attendees - confirmations ELSE 0 END',
+            persisted=True,
+        )),
+        sa.Column('status', sa.String(length=8), sa.Computed(
+            "CASE WHEN confirmations >= required_attendees THEN 'filled' ELSE 'open' END",
+            persisted=True,
+        )),
+    )
+    # triggers first, backfill second: the table lock from CREATE TRIGGER
+    # keeps writers out until the migration commits, so nothing is missed
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION event_summary_on_event() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM event_summary WHERE event_id = OLD.id;
+        ELSIF TG_OP = 'UPDATE' THEN
+            UPDATE event_summary SET required_attendees = NEW.required_attendees WHERE event_id = NEW.id;
+        ELSE
+            -- counts instead of assuming zero: a partition-moving UPDATE
+            -- arrives as DELETE + INSERT
+            INSERT INTO event_summary (event_id, confirmations, required_attendees)
+            VALUES (NEW.id, {count}, NEW.required_attendees)
+            ON CONFLICT (event_id) DO UPDATE
+            SET confirmations = EXCLUDED.confirmations, required_attendees = EXCLUDED.required_attendees;
+        END IF;
+        RETURN NULL;
+    END $$;
+
+    CREATE TRIGGER trg_event_summary AFTER INSERT OR DELETE OR UPDATE OF required_attendees ON {event}
+        FOR EACH ROW EXECUTE FUNCTION event_summary_on_event();
+    """)
+    if participants:
+        op.execute("""
+    CREATE OR REPLACE FUNCTION event_summary_on_participant() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE event_summary SET confirmations = confirmations - 1 WHERE event_id = OLD.event_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE event_summary SET confirmations = confirmations + 1 WHERE event_id = NEW.event_id;
+        END IF;
+        RETURN NULL;
+    END $$;
+
+    CREATE TRIGGER trg_participant_summary AFTER INSERT OR DELETE OR UPDATE OF event_id ON participant
+        FOR EACH ROW EXECUTE FUNCTION event_summary_on_participant();
+    """)
+        op.execute(f"""
+    INSERT INTO event_summary (event_id, confirmations, required_attendees)
+    SELECT e.id, coalesce(p.n, 0), e.required_attendees
+    FROM {event} e
+    LEFT JOIN (SELECT event_id, count(*) AS n FROM participant GROUP BY event_id) p ON p.event_id = e.id
+    """)
+    else:
+        op.execute(f"INSERT INTO event_summary (event_id, required_attendees) SELECT id, required_attendees FROM {event}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    event = _event_table()
+    if event:
+        op.execute(f'DROP TRIGGER IF EXISTS trg_event_summary ON {event}')
+    if 'participant' in set(sa.inspect(op.get_bind()).get_table_names()):
+        op.execute('DROP TRIGGER IF EXISTS trg_participant_summary ON participant')
+    op.execute('DROP FUNCTION IF EXISTS event_summary_on_event()')
+    op.execute('DROP FUNCTION IF EXISTS event_summary_on_participant()')
+    op.execute('DROP TABLE IF EXISTS event_summary')
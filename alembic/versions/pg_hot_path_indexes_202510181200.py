@@ -0,0 +1,77 @@
+"""Indexes for the hot query paths
+
+- events: (end_time, start_time) for active/historical listings and time
+  windows, (lat, lng) for bounding boxes, partial created_by_user_id.
+- participant: (event_id, confirmed_at) for per-event lists and counts
+  (replaces the single-column event_id index), partial (user_id, event_id).
+- users: lower(email) for case-insensitive login.
+
+Built CONCURRENTLY outside the migration transaction so writes keep flowing;
+every statement is IF [NOT] EXISTS, so a partially applied run can be retried.
+tests/test_query_plans.py checks the same indexes against EXPLAIN.
+
+Revision ID: pg_hot_path_indexes_202510181200
+Revises: pg_event_authorship_participant_202510181100
+Create Date: 2025-10-18T12:00:00
+"""
+import contextlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_hot_path_indexes_202510181200'
+down_revision = 'pg_event_authorship_participant_202510181100'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    # physical tables only: the baseline leaves compatibility *views* named "event"/"user"
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _event_table(tables):
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def _indexes(tables):
+    event = _event_table(tables)
+    if event:
+        yield 'ix_event_end_time_start_time', f'{event} (end_time, start_time)'
+        yield 'ix_event_lat_lng', f'{event} (lat, lng)'
+        if 'created_by_user_id' in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(event)}:
+            yield 'ix_event_created_by', f'{event} (created_by_user_id) WHERE created_by_user_id IS NOT NULL'
+    if 'participant' in tables:
+        yield 'ix_participant_event_confirmed', 'participant (event_id, confirmed_at)'
+        yield 'ix_participant_user_event', 'participant (user_id, event_id) WHERE user_id IS NOT NULL'
+    if 'users' in tables:
+        yield 'ix_users_email_lower', 'users (lower(email))'
+
+
+def _online():
+    # CONCURRENTLY cannot run inside a transaction; elsewhere plain DDL is fine
+    if op.get_bind().dialect.name == 'postgresql':
+        return 'CONCURRENTLY ', op.get_context().autocommit_block()
+    return '', contextlib.nullcontext()
+
+
+def upgrade() -> None:
+    tables = _tables()
+    concurrently, block = _online()
+    with block:
+        for name, target in _indexes(tables):
+            op.execute(f'CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {target}')
+        if 'participant' in tables:
+            # covered by the leading column of ix_participant_event_confirmed
+            op.execute(f'DROP INDEX {concurrently}IF EXISTS ix_participant_event_id')
+
+
+def downgrade() -> None:
+    tables = _tables()
+    concurrently, block = _online()
+    with block:
+        if 'participant' in tables:
+            op.execute(f'CREATE INDEX {concurrently}IF NOT EXISTS ix_participant_event_id ON participant (event_id)')
+        for name, _ in reversed(list(_indexes(tables))):
+            op.execute(f'DROP INDEX {concurrently}IF EXISTS {name}')
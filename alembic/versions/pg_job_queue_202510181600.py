@@ -0,0 +1,75 @@
+"""Background job queue; event coordinates become optional
+
+- job: durable queue read by backend.services.jobs workers; ix_job_due
+  (kind, run_at) covers only unfinished jobs, idempotency_key is unique;
+- event.lat / event.lng lose NOT NULL: an event created without coordinates
+  gets them from the geocode job.
+
+PostgreSQL only; a no-op elsewhere.
+
+Revision ID: pg_job_queue_202510181600
+Revises: pg_event_search_202510181500
+Create Date: 2025-10-18T16:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_job_queue_202510181600'
+down_revision = 'pg_event_search_202510181500'
+branch_labels = None
+depends_on = None
+
+UNFINISHED = "status IN ('queued', 'running')"
+
+
+def _event_table():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_table(
+        'job',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('kind', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=8), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=200), nullable=True, unique=True),
+        sa.Column('run_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('locked_by', sa.String(length=64), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_job_due', 'job', ['kind', 'run_at'],
+                    postgresql_where=sa.text(UNFINISHED))
+    op.create_index('ix_job_finished_at', 'job', ['finished_at'])
+
+    event = _event_table()
+    if event:
+        # on a partitioned parent this reaches every partition
+        op.alter_column(event, 'lat', existing_type=sa.Float(), nullable=True)
+        op.alter_column(event, 'lng', existing_type=sa.Float(), nullable=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    event = _event_table()
+    if event:
+        missing = op.get_bind().execute(
+            sa.text(f'SELECT count(*) FROM {event} WHERE lat IS NULL OR lng IS NULL')
+        ).scalar()
+        if missing:
+            raise RuntimeError(f'{missing} events have no coordinates yet; run the geocode jobs first')
+        op.alter_column(event, 'lat', existing_type=sa.Float(), nullable=False)
+        op.alter_column(event, 'lng', existing_type=sa.Float(), nullable=False)
+    op.drop_index('ix_job_finished_at', table_name='job')
+    op.drop_index('ix_job_due', table_name='job')
+    op.drop_table('job')
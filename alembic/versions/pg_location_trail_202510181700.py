@@ -0,0 +1,43 @@
+"""Stored responder location trails
+
+- location_trail: chunks of one responder's trail flushed by
+  backend.services.trails (delta-coded, zlib-compressed points), looked up
+  by (username, start_at).
+
+PostgreSQL only; a no-op elsewhere.
+
+Revision ID: pg_location_trail_202510181700
+Revises: pg_job_queue_202510181600
+Create Date: 2025-10-18T17:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_location_trail_202510181700'
+down_revision = 'pg_job_queue_202510181600'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_table(
+        'location_trail',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('start_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_location_trail_username_start_at', 'location_trail', ['username', 'start_at'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_location_trail_username_start_at', table_name='location_trail')
+    op.drop_table('location_trail')
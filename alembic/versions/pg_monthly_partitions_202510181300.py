@@ -0,0 +1,153 @@
+"""Monthly range partitions: event by start_time, participant by confirmed_at
+
+Each table is rebuilt as a partitioned table of the same name:
+
+- primary key becomes (id, <key>) - PostgreSQL requires the partition key in
+  every unique constraint; ids still come from the same sequence/identity;
+- one partition per month from the oldest row through three months ahead,
+  plus a DEFAULT partition; backend.services.partitions creates later months;
+- existing indexes (the hot-path set included) are recreated on the parent,
+  which cascades them to every partition;
+- participant.event_id loses its FOREIGN KEY: a partitioned event has no
+  unique constraint on id alone to reference.  The write path already checks
+  the event exists (confirm updates it first and 404s otherwise), and
+  participant rows are removed by the ORM cascade.
+
+PostgreSQL only; a no-op elsewhere.  The copy runs in the migration
+transaction, so schedule it for a quiet window on large tables.
+
+Revision ID: pg_monthly_partitions_202510181300
+Revises: pg_hot_path_indexes_202510181200
+Create Date: 2025-10-18T13:00:00
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'pg_monthly_partitions_202510181300'
+down_revision = 'pg_hot_path_indexes_202510181200'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _pg():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _scalar(sql, **params):
+    return op.get_bind().execute(sa.text(sql), params).scalar()
+
+
+def _event_table():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    return 'events' if 'events' in tables else 'event' if 'event' in tables else None
+
+
+def _months(first, last):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= last:
+        index = month.year * 12 + month.month
+        following = month.replace(year=index // 12, month=index % 12 + 1)
+        yield month, following
+        month = following
+
+
+def _rebuild(table, key, drop_fk_to=()):
+    """Recreate ``table`` partitioned by ``key`` (or plain again when key is None)."""
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    legacy = f'{table}_unpartitioned'
+    fks = [fk for fk in insp.get_foreign_keys(table) if fk['referred_table'] not in drop_fk_to]
+    indexes = bind.execute(sa.text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = :t"
+    ), {'t': table}).all()
+    pk_name = insp.get_pk_constraint(table)['name']
+    identity = _scalar(
+        "SELECT attidentity <> '' FROM pg_attribute WHERE attrelid = to_regclass(:t) AND attname = 'id'", t=table
+    )
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    # index names are schema-wide; free them for the new table
+    for name, _ in indexes:
+        op.execute(f'ALTER INDEX {name} RENAME TO {name}_old')
+
+    partition_by = f' PARTITION BY RANGE ({key})' if key else ''
+    op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY){partition_by}')
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {pk_name} PRIMARY KEY (id{", " + key if key else ""})')
+
+    if key:
+        now = datetime.now(timezone.utc)
+        oldest = _scalar(f'SELECT min({key}) FROM {legacy}') or now
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        horizon = now.replace(year=now.year + (now.month + MONTHS_AHEAD - 1) // 12,
+                              month=(now.month + MONTHS_AHEAD - 1) % 12 + 1, day=1)
+        for lower, upper in _months(min(oldest, now), horizon):
+            op.execute(
+                f"CREATE TABLE {table}_p{lower:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    if identity:
+        op.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 0) + 1 FROM {table}), false)")
+    else:
+        sequence = _scalar("SELECT pg_get_serial_sequence(:t, 'id')", t=legacy)
+        if sequence:
+            op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+
+    for fk in fks:
+        op.create_foreign_key(fk['name'], table, fk['referred_table'], fk['constrained_columns'],
+                              fk['referred_columns'], ondelete=fk.get('options', {}).get('ondelete'))
+    for name, definition in indexes:
+        if name != pk_name:
+            op.execute(definition.replace(' ON ONLY ', ' ON '))
+
+    op.execute(f'DROP TABLE {legacy}')
+
+
+def _compat_view(event_table, create):
+    # the baseline's singular "event" view over "events" binds to the table's
+    # OID, so it is dropped around the rebuild and recreated on the new table
+    # (a plain single-table view is updatable without the old rules)
+    if event_table != 'events':
+        return
+    if create:
+        op.execute('CREATE VIEW event AS SELECT * FROM events')
+    else:
+        op.execute('DROP VIEW IF EXISTS event')
+
+
+def upgrade() -> None:
+    if not _pg():
+        return
+    event = _event_table()
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    # participant first: dropping its legacy copy removes the FK into event
+    if 'participant' in tables:
+        _rebuild('participant', 'confirmed_at', drop_fk_to=('event', 'events'))
+    if event:
+        _compat_view(event, create=False)
+        _rebuild(event, 'start_time')
+        _compat_view(event, create=True)
+
+
+def downgrade() -> None:
+    if not _pg():
+        return
+    event = _event_table()
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if event:
+        _compat_view(event, create=False)
+        _rebuild(event, None)
+        _compat_view(event, create=True)
+    if 'participant' in tables:
+        _rebuild('participant', None)
+        if event:
+            op.create_foreign_key('participant_event_id_fkey', 'participant', event, ['event_id'], ['id'])
@@ -1,29 +1,119 @@
+"""
+API entry point: ``create_app(settings)`` builds the FastAPI app.
+
+Routers are imported inside the factory, and only the enabled ones, so
+``import backend.app`` is cheap; the DB engine and bcrypt load on first use
+(see ``backend.database`` and ``backend.security_simple``).  Run with::
+
+    uvicorn --factory backend.app:create_app
+    uvicorn backend.app:app          # same app, built on first attribute access
+
+Cold start can be checked with ``python -m benchmarks.bench_coldstart``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
 import os
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes.auth import router as auth_router
+from .core.config import Settings, settings as default_settings
+from .core.responses import FastJSONResponse
 
-app = FastAPI(title="Zufar API", version="0.1.0")
-
-default_origins = [
+DEFAULT_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
     "https://zufar-frontend-t13k.onrender.com",
 ]
-env_origins = os.getenv("CORS_ORIGINS", "").strip()
-origins = [o.strip() for o in env_origins.split(",") if o.strip()] or default_origins
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+
+# (module, enabled?) - imported lazily, in this order
+ROUTERS = (
+    ("backend.routers.auth", lambda s: True),
+    ("backend.routers.events", lambda s: True),
+    ("backend.routers.metrics", lambda s: True),
+    ("backend.routes.debug", lambda s: s.ENABLE_DEBUG_ROUTES),
 )
 
-@app.get("/healthz")
-def healthz():
-    return {"ok": True}
 
-app.include_router(auth_router, prefix="/auth", tags=["auth"])
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or default_settings
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    from .core.compression import CompressionMiddleware
+    from .core.metrics import MetricsMiddleware, install_db_hooks
+    from .core.profiling import ProfilingMiddleware
+
+    app = FastAPI(title="Zufar API", version="0.1.0", default_response_class=FastJSONResponse)
+    app.state.settings = settings
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS or DEFAULT_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        levels=settings.COMPRESSION_LEVELS,
+        encodings=settings.COMPRESSION_ENCODINGS,
+    )
+    app.add_middleware(ProfilingMiddleware)
+    # outermost, so latency includes CORS handling
+    app.add_middleware(MetricsMiddleware)
+    install_db_hooks()
+
+    @app.get("/healthz")
+    def healthz():
+        return {"ok": True}
+
+    for module, enabled in ROUTERS:
+        if enabled(settings):
+            app.include_router(importlib.import_module(module).router)
+
+    if settings.JOBS_RUN_IN_APP:
+        from . import database
+        from .services.jobs import Worker
+
+        # the engine is still built on first use, when the worker starts
+        worker = Worker(lambda: database.SessionLocal(), concurrency=settings.JOBS_CONCURRENCY, poll_interval=settings.JOBS_POLL_SECONDS)
+        app.state.job_worker = worker
+        app.add_event_handler("startup", worker.start)
+        app.add_event_handler("shutdown", worker.stop)
+
+    if settings.SERVE_STATIC and os.path.isdir(settings.STATIC_DIR):
+        from .core.static import StaticAssets
+
+        assets = StaticAssets(settings.STATIC_DIR, prefix="/static")
+        app.state.static = assets
+        app.mount("/static", assets, name="static")
+        app.add_api_route("/", assets.index, methods=["GET", "HEAD"], include_in_schema=False)
+
+    if settings.ENABLE_PROTOTYPE:
+        # the in-memory prototype keeps its own paths (/events/create, /ws/events, ...)
+        from casualty_management_app import app as prototype, on_startup
+
+        app.mount("/prototype", prototype)
+        # mounted apps get no startup events of their own
+        app.add_event_handler("startup", on_startup)
+
+    return app
+
+
+_app: Optional[FastAPI] = None
+
+
+def __getattr__(name: str):
+    # ``uvicorn backend.app:app`` and ``from backend.app import app`` build the
+    # default app on first access instead of at import
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 import os
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
@@ -9,6 +10,7 @@ from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
 
+from .core.metrics import AUTH_VERIFY
 from .db import get_session
 from .models import User
 from .schemas import UserCreate
@@ -86,12 +88,15 @@ def get_current_user(
     token: str = Depends(oauth2),
     session: Session = Depends(get_session),
 ) -> User:
+    started = time.perf_counter()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         sub = payload.get("sub")
         uid = int(sub)
     except (JWTError, ValueError, TypeError):
         raise HTTPException(status_code=401, detail="Invalid token")
+    finally:
+        AUTH_VERIFY.observe(time.perf_counter() - started, ("jwt",))
 
     user = session.get(User, uid)
     if not user:
@@ -0,0 +1,185 @@
+"""
+Response cache for hot read endpoints.
+
+Handlers cache the serialised JSON body under a key built from the endpoint
+path, the sorted query string, the caller's auth scope, the data *version*
+the handler read (for the event listings, its ETag version, looked up on the
+same session that builds the body) and a per-namespace *generation*.  A
+write anywhere moves the version on, so old keys become unreachable without
+the writer having to tell this process; ``invalidate(namespace)`` bumps the
+generation to do the same by hand.  Old entries simply age out of the
+LRU/TTL store, so invalidation needs no key scans and works the same on a
+shared backend.
+
+The default backend is an in-process LRU with per-entry TTL.  Setting
+``RESPONSE_CACHE_URL=redis://...`` shares entries and generations between
+workers (requires the ``redis`` package).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Optional, Protocol, Tuple
+
+from starlette.requests import Request
+
+from .config import settings
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    def generation(self, namespace: str) -> int: ...
+
+    def bump(self, namespace: str) -> int: ...
+
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace: str) -> int:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return self._generations[namespace]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared backend; generations are Redis counters so every worker sees
+    an invalidation immediately."""
+
+    def __init__(self, url: str, prefix: str = "zufar:rc:") -> None:
+        import redis  # optional dependency, only needed for a shared cache
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._redis.get(self._prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._redis.set(self._prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    def generation(self, namespace: str) -> int:
+        return int(self._redis.get(f"{self._prefix}gen:{namespace}") or 0)
+
+    def bump(self, namespace: str) -> int:
+        return int(self._redis.incr(f"{self._prefix}gen:{namespace}"))
+
+
+class CacheStats:
+    """Hit/miss counters plus a sliding window of lookup latencies."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._hit_latency: Deque[float] = deque(maxlen=window)
+        self._miss_latency: Deque[float] = deque(maxlen=window)
+
+    def observe(self, hit: bool, seconds: float) -> None:
+        if hit:
+            self.hits += 1
+            self._hit_latency.append(seconds)
+        else:
+            self.misses += 1
+            self._miss_latency.append(seconds)
+
+    @staticmethod
+    def _percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+        def pick(q: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+        return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+    def snapshot(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "hit_latency": self._percentiles(self._hit_latency),
+            "miss_latency": self._percentiles(self._miss_latency),
+        }
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, default_ttl: float = 30.0) -> None:
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+
+    def key(self, namespace: str, request: Request, scope: str = "public", version: str = "") -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        generation = self.backend.generation(namespace)
+        return f"{namespace}:{generation}:{version}:{scope}:{request.url.path}?{query}"
+
+    def fetch(
+        self,
+        namespace: str,
+        request: Request,
+        build: Callable[[], Tuple[bytes, Optional[float]]],
+        scope: str = "public",
+        version: str = "",
+    ) -> bytes:
+        """Return the cached body, or call ``build`` -> ``(body, ttl)`` and
+        store it.  ``ttl=None`` uses the default; a TTL is capped by it."""
+        started = time.perf_counter()
+        key = self.key(namespace, request, scope, version)
+        body = self.backend.get(key)
+        hit = body is not None
+        if not hit:
+            body, ttl = build()
+            ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+            if ttl > 0:
+                self.backend.set(key, body, ttl)
+        self.stats.observe(hit, time.perf_counter() - started)
+        return body
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+
+
+def _make_backend(url: str) -> CacheBackend:
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    return MemoryBackend(maxsize=settings.RESPONSE_CACHE_SIZE)
+
+
+response_cache = ResponseCache(_make_backend(settings.RESPONSE_CACHE_URL), default_ttl=settings.RESPONSE_CACHE_TTL)
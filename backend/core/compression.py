@@ -0,0 +1,246 @@
+"""
+Content-coding helpers and the response compression middleware.
+
+``negotiate`` picks a coding from an ``Accept-Encoding`` header (q-values,
+``*`` and ``identity;q=0`` included) among the ones the server offers, in the
+server's order of preference.  ``compress`` produces a complete body for
+``br``, ``zstd`` or ``gzip``.  brotli and zstandard are optional: without the
+package that coding is simply never offered.
+
+``CompressionMiddleware`` applies them to API responses on the fly; static
+assets are compressed once at startup instead (see ``core/static.py``).
+"""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Dict, Optional, Sequence
+
+from starlette.datastructures import MutableHeaders
+
+try:  # optional
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:  # optional
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# best ratio first; gzip is always available
+PREFERENCE = ("br", "zstd", "gzip")
+DEFAULT_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+MAX_LEVELS = {"br": 11, "zstd": 19, "gzip": 9}
+
+
+def available(encodings: Sequence[str] = PREFERENCE) -> tuple:
+    have = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    return tuple(e for e in encodings if have.get(e))
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    level = DEFAULT_LEVELS[encoding] if level is None else min(level, MAX_LEVELS[encoding])
+    if encoding == "gzip":
+        # mtime=0 keeps output (and so ETags) stable across restarts
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+
+def _parse(accept_encoding: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+    return weights
+
+
+def negotiate(accept_encoding: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """Best of ``offered`` for this client, ``"identity"``, or None when the
+    client refuses everything we have (``identity;q=0`` with no match)."""
+    if not accept_encoding:
+        return "identity"
+    weights = _parse(accept_encoding)
+    star = weights.get("*")
+    best, best_q = None, 0.0
+    for encoding in offered:
+        q = weights.get(encoding, star if star is not None else 0.0)
+        if q > best_q:
+            best, best_q = encoding, q
+    if best is not None:
+        return best
+    identity_q = weights.get("identity", star if star is not None else 1.0)
+    return "identity" if identity_q > 0 else None
+
+
+# ---------- streaming compressors ----------
+
+class _Stream:
+    """Incremental compressor; ``chunk`` returns bytes decodable so far."""
+
+    def __init__(self, encoding: str, level: int) -> None:
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._z = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._z = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"unsupported encoding {encoding!r}")
+
+    def chunk(self, data: bytes) -> bytes:
+        # flush per chunk so streamed responses (NDJSON, SSE) are not held back
+        if self.encoding == "gzip":
+            return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._z.process(data) + self._z.flush()
+        return self._z.compress(data) + self._z.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._z.flush(zlib.Z_FINISH)
+        if self.encoding == "br":
+            return self._z.finish()
+        return self._z.flush()
+
+
+# ---------- ASGI middleware ----------
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml",
+                      "application/x-ndjson", "image/svg+xml")
+
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.split(";")[0].endswith("+json")
+
+
+class CompressionMiddleware:
+    """Negotiated br/zstd/gzip for responses of at least ``minimum_size`` bytes.
+
+    Pure ASGI so streaming responses are compressed chunk by chunk instead of
+    being buffered.  Responses that already carry a Content-Encoding (e.g.
+    precompressed static assets), are not a text type, ask for
+    ``no-transform``, or stay below the threshold pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        levels: Optional[Dict[str, int]] = None,
+        encodings: Sequence[str] = PREFERENCE,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.encodings = available(encodings)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept = None
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept, self.encodings)
+        responder = _CompressingSend(send, encoding, self.levels.get(encoding or "", 0), self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: Optional[str], level: int, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding if encoding not in (None, "identity") else None
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start: Optional[dict] = None
+        self.stream: Optional[_Stream] = None
+        self.passthrough = False
+
+    async def __call__(self, message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=list(message.get("headers", [])))
+            eligible = (
+                message["status"] not in (204, 206, 304)
+                and "content-encoding" not in headers
+                and _compressible(headers.get("content-type", ""))
+                and "no-transform" not in headers.get("cache-control", "")
+            )
+            if eligible:
+                self.start = message  # held until the first body chunk
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if self.stream is not None:
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            out = self.stream.chunk(body) if body else b""
+            if not more:
+                out += self.stream.finish()
+            if out or not more:
+                await self.send({"type": "http.response.body", "body": out, "more_body": more})
+            return
+
+        # first body chunk: decide once.  Streams without a Content-Length are
+        # assumed large, so slow streams (SSE, NDJSON) are never held back.
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        headers = MutableHeaders(raw=list(self.start.get("headers", [])))
+        declared = headers.get("content-length")
+        size = int(declared) if declared is not None else (len(body) if not more else None)
+        if size is not None and size < self.minimum_size:
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        # large enough: the representation now depends on Accept-Encoding
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None:
+            self.passthrough = True
+            await self.send({**self.start, "headers": headers.raw})
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        # a strong validator names exact bytes, which compression changes
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if not more:
+            payload = compress(body, self.encoding, self.level)
+            headers["Content-Length"] = str(len(payload))
+            await self.send({**self.start, "headers": headers.raw})
+            await self.send({"type": "http.response.body", "body": payload, "more_body": False})
+            return
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.stream = _Stream(self.encoding, self.level)
+        await self.send({**self.start, "headers": headers.raw})
+        await self.send({"type": "http.response.body", "body": self.stream.chunk(body), "more_body": True})
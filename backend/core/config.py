@@ -6,7 +6,42 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
     ALGORITHM: str = "HS256"
     ALLOW_ORIGINS = os.getenv("ALLOW_ORIGINS", "*").split(",")
+    # CORS for the API app; empty means the built-in frontend origins
+    CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # optional routers, imported only when enabled
+    ENABLE_DEBUG_ROUTES: bool = os.getenv("ENABLE_DEBUG_ROUTES", "0") == "1"
+    ENABLE_PROTOTYPE: bool = os.getenv("ENABLE_PROTOTYPE", "0") == "1"
+    # on-the-fly API response compression (see core/compression.py)
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_ENCODINGS = [e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",") if e.strip()]
+    COMPRESSION_LEVELS = {
+        "br": int(os.getenv("COMPRESSION_BR_LEVEL", "4")),
+        "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+        "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    }
+    # console assets, hashed and precompressed at startup (see core/static.py)
+    SERVE_STATIC: bool = os.getenv("SERVE_STATIC", "1") == "1"
+    STATIC_DIR: str = os.getenv("STATIC_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "static"))
+    # longest an event may run; lets the active listing bound start_time so
+    # PostgreSQL prunes partitions (see services/partitions.py)
+    EVENT_MAX_DURATION_DAYS: int = int(os.getenv("EVENT_MAX_DURATION_DAYS", "30"))
+    # background jobs (services/jobs.py): run a worker inside the web process
+    # instead of (or besides) "python -m backend.services.jobs work"
+    JOBS_RUN_IN_APP: bool = os.getenv("JOBS_RUN_IN_APP", "0") == "1"
+    JOBS_CONCURRENCY: int = int(os.getenv("JOBS_CONCURRENCY", "4"))
+    JOBS_POLL_SECONDS: float = float(os.getenv("JOBS_POLL_SECONDS", "1"))
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     NOMINATIM_URL: str = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+    # Response cache for hot GET endpoints: "memory://" or "redis://host:6379/0"
+    RESPONSE_CACHE_URL: str = os.getenv("RESPONSE_CACHE_URL", "memory://")
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+    # SQL profiling: SQL_PROFILE=1 profiles every request, SQL_PROFILE_HEADER=1
+    # lets a client ask for it with "X-Profile-SQL: 1"
+    SQL_PROFILE: bool = os.getenv("SQL_PROFILE", "0") == "1"
+    SQL_PROFILE_HEADER: bool = os.getenv("SQL_PROFILE_HEADER", "0") == "1"
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    SLOW_QUERY_LOG_PARAMS: bool = os.getenv("SLOW_QUERY_LOG_PARAMS", "0") == "1"
 
 settings = Settings()
\ No newline at end of file
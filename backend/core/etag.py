@@ -0,0 +1,59 @@
+"""
+Weak ETags for conditional GETs.
+
+Versions come from shared state, not process memory: every event write
+appends to ``event_change`` in its own transaction, so the newest ``seq``
+(``backend.services.changes``) versions the event collection the same way
+for every uvicorn worker, the standalone job worker and every replica.
+Read handlers look the version up on the session that serves the read,
+*before* querying, so a write racing with a read can only ever produce a
+spurious 200, never a stale 304.  A matching ``If-None-Match`` is answered
+with 304 after that one index lookup, before the read itself runs or any
+byte is serialised.
+
+Some listings also change with the clock (an event moves from ``/events`` to
+``/events/historical`` once its ``end_time`` passes), so their version also
+carries the earliest ``end_time`` still ahead, which moves on once it passes.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Union
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes for ``DateTime(timezone=True)``."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def make_etag(key: str, version: Union[int, str]) -> str:
+    return f'W/"{key}-{version}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag`` (RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(candidate) == wanted for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # no-cache: clients may store the body but must revalidate every time.
+    return {"ETag": etag, "Cache-Control": "no-cache"}
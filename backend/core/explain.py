@@ -0,0 +1,67 @@
+"""
+Query plans for the hot paths, so a missing index fails a test instead of a
+pager.
+
+``full_scans(conn, stmt)`` returns the tables ``stmt`` would read end to end:
+
+* PostgreSQL: ``EXPLAIN (FORMAT JSON)`` with ``enable_seqscan`` off, so a
+  ``Seq Scan`` left in the plan means no index can serve the query at all
+  (with it on, the planner rightly prefers seq scans on small test tables);
+* SQLite: ``EXPLAIN QUERY PLAN`` rows reading ``SCAN <table>``, covering-index
+  scans included, since they still visit every row.  An FTS5 table queried
+  with MATCH (``VIRTUAL TABLE INDEX n:M...``) is an index lookup, not a scan,
+  and neither is reading back a subquery's own (``MATERIALIZE``d) result.
+
+Statements are rendered with literal parameters, which is fine for the fixed
+shapes checked here but not for user input.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterator, List
+
+from sqlalchemy.engine import Connection
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)\b(?! VIRTUAL TABLE INDEX \d+:\S*M)")
+_SQLITE_SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+
+
+def render(conn: Connection, stmt) -> str:
+    return str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(conn: Connection, stmt) -> List[str]:
+    """Plan as readable lines (for assertion messages and debugging)."""
+    sql = render(conn, stmt)
+    if conn.dialect.name == "postgresql":
+        return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def _pg_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _pg_nodes(child)
+
+
+def full_scans(conn: Connection, stmt) -> List[str]:
+    sql = render(conn, stmt)
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        try:
+            raw: Any = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        finally:
+            conn.exec_driver_sql("RESET enable_seqscan")
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        return [n["Relation Name"] for n in _pg_nodes(plan) if n["Node Type"] == "Seq Scan"]
+    tables, subqueries = [], {"CONSTANT"}
+    for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"):
+        sub = _SQLITE_SUBQUERY.match(row[-1])
+        if sub:
+            subqueries.add(sub.group(1))
+        m = _SQLITE_SCAN.match(row[-1])
+        if m and m.group(1) not in subqueries:
+            tables.append(m.group(1))
+    return tables
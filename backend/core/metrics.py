@@ -0,0 +1,265 @@
+"""
+Prometheus-style metrics with lock-free hot paths.
+
+Each metric keeps one shard (a plain dict) per thread; ``inc``/``observe``
+only touch the calling thread's shard, so recording never takes a lock and
+never contends.  A lock is taken once per thread to register its shard and
+the scrape (``render``) sums all shards.  Reads during a scrape may be a few
+increments behind, which is fine for monitoring.
+
+``MetricsMiddleware`` records per-route latency and in-flight requests, and
+``install_db_hooks`` counts statements and DB time per request via
+SQLAlchemy cursor events.  Everything is served as text at ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._register_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            with self._register_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _merged(self) -> Dict[Labels, float]:
+        out: Dict[Labels, float] = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                out[labels] = out.get(labels, 0.0) + value
+        return out
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._merged().items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._merged().get(labels, 0.0)
+
+
+class Gauge(Counter):
+    """Up/down gauge; shards sum correctly even when inc and dec happen on
+    different threads.  ``set_function`` turns it into a callback gauge
+    evaluated at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, doc, labelnames)
+        self._fn: Optional[Callable[[], Dict[Labels, float]]] = None
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def set_function(self, fn: Callable[[], Dict[Labels, float]]) -> None:
+        self._fn = fn
+
+    def _merged(self) -> Dict[Labels, float]:
+        return dict(self._fn()) if self._fn else super()._merged()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, doc, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        row = shard.get(labels)
+        if row is None:
+            # one slot per bucket, one for +Inf, then the running sum
+            row = shard[labels] = [0.0] * (len(self.bounds) + 2)
+        row[bisect_left(self.bounds, value)] += 1
+        row[-1] += value
+
+    def _merged_rows(self) -> Dict[Labels, List[float]]:
+        out: Dict[Labels, List[float]] = {}
+        for shard in list(self._shards):
+            for labels, row in list(shard.items()):
+                acc = out.setdefault(labels, [0.0] * len(row))
+                for i, v in enumerate(row):
+                    acc[i] += v
+        return out
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        names = self.labelnames + ("le",)
+        for labels, row in sorted(self._merged_rows().items()):
+            cumulative = 0.0
+            for bound, count in zip(self.bounds + (float("inf"),), row[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_fmt_labels(names, labels + (_fmt_value(bound),))} {_fmt_value(cumulative)}")
+            base = _fmt_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_fmt_value(row[-1])}")
+            lines.append(f"{self.name}_count{base} {_fmt_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, doc, labelnames))
+
+    def gauge(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, doc, labelnames))
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being served", ("method",))
+DB_QUERIES = REGISTRY.histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ("route",), buckets=COUNT_BUCKETS)
+DB_TIME = REGISTRY.histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request", ("route",))
+AUTH_VERIFY = REGISTRY.histogram(
+    "auth_verify_seconds", "Bearer token verification time", ("scheme",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5))
+GEOCODE_CACHE = REGISTRY.counter("geocode_cache_requests_total", "Geocode lookups by cache result", ("result",))
+
+
+# ---------- per-request DB accounting ----------
+
+class _DbUsage:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_db_usage: contextvars.ContextVar[Optional[_DbUsage]] = contextvars.ContextVar("db_usage", default=None)
+_hooks_installed = False
+
+
+def install_db_hooks() -> None:
+    """Listen on every Engine (class-level) so all engines are counted."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    # the start time lives on the statement's execution context, not on the
+    # pooled connection: a failed statement never reaches _after
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_start", None)
+        usage = _db_usage.get()
+        if usage is not None and started is not None:
+            usage.queries += 1
+            usage.seconds += time.perf_counter() - started
+
+    _hooks_installed = True
+
+
+# ---------- ASGI middleware ----------
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware task overhead)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = ["500"]
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        usage = _DbUsage()
+        token = _db_usage.set(usage)
+        HTTP_IN_FLIGHT.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec((method,))
+            _db_usage.reset(token)
+            # route template, not the raw path, to keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            HTTP_LATENCY.observe(elapsed, (method, route, status[0]))
+            DB_QUERIES.observe(usage.queries, (route,))
+            DB_TIME.observe(usage.seconds, (route,))
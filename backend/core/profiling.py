@@ -0,0 +1,170 @@
+"""
+Per-request SQL profiling and the slow-query log.
+
+``install_sql_profiler(engine)`` times every statement on ``engine`` with
+``before/after_cursor_execute`` hooks:
+
+* statements slower than ``SLOW_QUERY_MS`` are written to the
+  ``app.db.slow`` logger as one JSON object, tagged with the route that ran
+  them (parameters only with ``SLOW_QUERY_LOG_PARAMS=1``);
+* when profiling is on for the current request (``SQL_PROFILE=1`` for every
+  request, or an ``X-Profile-SQL: 1`` header when ``SQL_PROFILE_HEADER=1``),
+  each statement, its parameters and its duration are recorded.
+
+``ProfilingMiddleware`` adds a ``Server-Timing`` header to profiled responses
+plus ``X-SQL-Profile-Id``; the full statement list is kept in a small ring
+buffer and served by ``/debug/sql-profiles/{id}``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import json
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+
+slow_log = logging.getLogger("app.db.slow")
+
+PROFILE_HEADER = b"x-profile-sql"
+MAX_STATEMENTS = 500
+MAX_PARAM_CHARS = 300
+KEEP_PROFILES = 100
+
+
+class SqlProfile:
+    __slots__ = ("id", "method", "path", "route", "statements", "total_ms")
+
+    def __init__(self, profile_id: int, method: str, path: str) -> None:
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.statements: List[Dict[str, Any]] = []
+        self.total_ms = 0.0
+
+    def add(self, statement: str, parameters: Any, ms: float) -> None:
+        self.total_ms += ms
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append({"sql": statement, "params": _short(parameters), "ms": round(ms, 3)})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "queries": len(self.statements),
+            "db_ms": round(self.total_ms, 3),
+            "statements": self.statements,
+        }
+
+
+def _short(parameters: Any) -> str:
+    text = repr(parameters)
+    return text if len(text) <= MAX_PARAM_CHARS else text[:MAX_PARAM_CHARS] + "..."
+
+
+# current request scope (route is filled in by the router after middleware
+# runs, so it is read lazily) and the active profile, if any
+_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("sql_profile_scope", default=None)
+_profile: contextvars.ContextVar[Optional[SqlProfile]] = contextvars.ContextVar("sql_profile", default=None)
+
+_ids = itertools.count(1)
+recent_profiles: "OrderedDict[int, SqlProfile]" = OrderedDict()
+_profiled_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _route_of(scope: Optional[dict]) -> Optional[str]:
+    if scope is None:
+        return None
+    return getattr(scope.get("route"), "path", None) or scope.get("path")
+
+
+def install_sql_profiler(engine) -> None:
+    from sqlalchemy import event
+
+    if engine in _profiled_engines:
+        return
+    _profiled_engines.add(engine)
+
+    # like the metrics hooks: timed on the execution context, so a failed
+    # statement leaves nothing behind on the pooled connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profile_start", None)
+        if started is None:
+            return
+        ms = (time.perf_counter() - started) * 1000
+        profile = _profile.get()
+        if profile is not None:
+            profile.add(statement, parameters, ms)
+        if ms >= settings.SLOW_QUERY_MS:
+            scope = _scope.get()
+            record = {
+                "event": "slow_query",
+                "ms": round(ms, 3),
+                "route": _route_of(scope),
+                "method": scope.get("method") if scope else None,
+                "statement": " ".join(statement.split()),
+            }
+            if settings.SLOW_QUERY_LOG_PARAMS:
+                record["params"] = _short(parameters)
+            slow_log.warning(json.dumps(record, default=str))
+
+
+def _wants_profile(scope: dict) -> bool:
+    if settings.SQL_PROFILE:
+        return True
+    if not settings.SQL_PROFILE_HEADER:
+        return False
+    return any(k == PROFILE_HEADER and v.strip() in (b"1", b"true") for k, v in scope.get("headers", []))
+
+
+class ProfilingMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        scope_token = _scope.set(scope)
+        if not _wants_profile(scope):
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _scope.reset(scope_token)
+            return
+
+        profile = SqlProfile(next(_ids), scope["method"], scope["path"])
+        profile_token = _profile.set(profile)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.route = _route_of(scope)
+                timing = f'db;dur={profile.total_ms:.2f};desc="{len(profile.statements)} queries"'
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                headers.append((b"x-sql-profile-id", str(profile.id).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(profile_token)
+            _scope.reset(scope_token)
+            recent_profiles[profile.id] = profile
+            while len(recent_profiles) > KEEP_PROFILES:
+                recent_profiles.popitem(last=False)
@@ -0,0 +1,153 @@
+"""
+Read replicas: round-robin choice, health tracking and read-your-writes.
+
+``ReplicaSet`` hands out sessions on the next healthy replica.  Health is
+checked on use: checking a connection out (``pool_pre_ping``) is the probe, a
+replica that fails is skipped for ``retry_seconds`` and then simply tried
+again.  On PostgreSQL, every ``lag_check_seconds`` the replay lag is read on
+the connection just checked out, and a replica more than ``max_lag_seconds``
+behind is skipped the same way.  With no healthy replica, reads go to the
+primary.
+
+``Stickiness`` remembers, per reader, when they last committed a write; for
+``window`` seconds afterwards their reads stay on the primary so they see
+their own write despite replication lag.  A reader is the bearer token (or the
+client address without one).  The map is per process, which is enough for a
+window of a few seconds behind a sticky load balancer.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("app.db.replicas")
+
+# seconds the replica is behind; 0 when it has replayed everything received
+PG_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    __slots__ = ("name", "engine", "down_until", "checked_at", "lag", "failures")
+
+    def __init__(self, name: str, engine: Engine) -> None:
+        self.name = name
+        self.engine = engine
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag: Optional[float] = None
+        self.failures = 0
+
+    def state(self, now: float) -> dict:
+        return {"name": self.name, "healthy": self.down_until <= now, "lag": self.lag, "failures": self.failures}
+
+
+class ReplicaSet:
+    def __init__(
+        self,
+        engines: Dict[str, Engine],
+        retry_seconds: float = 30.0,
+        max_lag_seconds: float = 10.0,
+        lag_check_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.replicas: List[Replica] = [Replica(name, engine) for name, engine in engines.items()]
+        self.retry_seconds = retry_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.clock = clock
+        self._order = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def _next(self, now: float) -> Optional[Replica]:
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._order)
+                if replica.down_until <= now:
+                    return replica
+        return None
+
+    def mark_down(self, replica: Replica, reason: str) -> None:
+        replica.down_until = self.clock() + self.retry_seconds
+        replica.failures += 1
+        logger.warning("replica %s unavailable for %.0fs: %s", replica.name, self.retry_seconds, reason)
+
+    def _check_lag(self, replica: Replica, db: Session, now: float) -> bool:
+        if replica.engine.dialect.name != "postgresql" or now - replica.checked_at < self.lag_check_seconds:
+            return True
+        replica.checked_at = now
+        replica.lag = float(db.execute(PG_LAG_SQL).scalar() or 0.0)
+        return replica.lag <= self.max_lag_seconds
+
+    def session(self, factory: Callable[..., Session]) -> Optional[Session]:
+        """A session on the next healthy replica, already connected; None if
+        every replica is down."""
+        for _ in range(len(self.replicas)):
+            now = self.clock()
+            replica = self._next(now)
+            if replica is None:
+                return None
+            db = factory(bind=replica.engine)
+            try:
+                db.connection()
+                lag_ok = self._check_lag(replica, db, now)
+            except DBAPIError as exc:
+                db.close()
+                self.mark_down(replica, str(exc.orig or exc).splitlines()[0])
+                continue
+            if not lag_ok:
+                db.close()
+                self.mark_down(replica, f"lag {replica.lag:.1f}s")
+                continue
+            db.info["replica"] = replica.name
+            return db
+        return None
+
+    def states(self) -> List[dict]:
+        now = self.clock()
+        return [r.state(now) for r in self.replicas]
+
+
+class Stickiness:
+    """Readers who wrote within the last ``window`` seconds read from the primary."""
+
+    def __init__(self, window: float = 5.0, maxsize: int = 10_000,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.window = window
+        self.maxsize = maxsize
+        self.clock = clock
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def note_write(self, reader: str) -> None:
+        with self._lock:
+            self._until[reader] = self.clock() + self.window
+            self._until.move_to_end(reader)
+            while len(self._until) > self.maxsize:
+                self._until.popitem(last=False)
+
+    def is_sticky(self, reader: str) -> bool:
+        until = self._until.get(reader)
+        return until is not None and until > self.clock()
+
+
+def reader_key(headers, client_host: Optional[str]) -> str:
+    auth = headers.get("authorization")
+    if auth:
+        return "auth:" + hashlib.blake2b(auth.encode(), digest_size=12).hexdigest()
+    return f"addr:{client_host or '-'}"
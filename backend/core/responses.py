@@ -0,0 +1,76 @@
+"""
+Fast JSON response helpers.
+
+FastAPI's default path for a route with ``response_model`` validates the
+handler's return value a second time (in a threadpool hop for sync
+handlers), runs it through ``jsonable_encoder`` and finally encodes it with
+the stdlib ``json`` module.  Our handlers already build validated pydantic
+models, so that work is pure overhead.
+
+``FastJSONResponse`` is the project-wide default response class (orjson),
+and ``model_response`` lets a handler hand back bytes produced directly by a
+precompiled pydantic ``TypeAdapter``.  Returning a ``Response`` instance
+makes FastAPI skip response-model validation entirely while the route's
+``response_model`` keeps documenting the schema in OpenAPI.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional, TypeVar
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+T = TypeVar("T")
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-backed response used as the application's default class."""
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise plain Python data (dicts, lists, datetimes) to JSON bytes."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def compile_adapter(tp: type[T]) -> TypeAdapter[T]:
+    """Build a ``TypeAdapter`` once at import time so its core schema and
+    serializer are reused for every request."""
+    return TypeAdapter(tp)
+
+
+def model_response(
+    adapter: TypeAdapter[Any],
+    value: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Encode ``value`` with ``adapter`` straight to JSON bytes.
+
+    ``value`` must already be valid for the adapter's type (e.g. models
+    produced by ``model_validate``); no re-validation happens here.
+    """
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        headers=dict(headers) if headers else None,
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+def bytes_response(
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Wrap JSON bytes that were serialised earlier (e.g. from a cache)."""
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=dict(headers) if headers else None,
+        media_type=JSON_MEDIA_TYPE,
+    )
@@ -0,0 +1,152 @@
+"""
+In-process sampling profiler for a live worker.
+
+A daemon thread wakes ``hz`` times a second, reads every other thread's
+current stack with ``sys._current_frames()`` and counts identical stacks.
+Nothing is traced or instrumented, so the cost is one stack walk per thread
+per tick and the worker keeps serving while it runs.
+
+Results come out as collapsed stacks (``thread;outer;...;leaf count``, the
+input of flamegraph.pl / speedscope / inferno) or as a speedscope "sampled"
+document.  Threads parked in a lock, queue or selector are dropped unless
+``include_idle`` is set, so a CPU spike is not drowned out by idle workers.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+MAX_SECONDS = 60.0
+MAX_HZ = 1000
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+Stack = Tuple[str, Tuple[Frame, ...]]  # (thread name, frames root first)
+
+# leaf frames of threads that are waiting rather than running
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socket.py", "readinto"),
+}
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    _running = threading.Lock()
+
+    def __init__(self, hz: int = 100, include_idle: bool = False) -> None:
+        self.interval = 1.0 / max(1, min(hz, MAX_HZ))
+        self.include_idle = include_idle
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        # one profile per process at a time; concurrent ones would skew each other
+        if not SamplingProfiler._running.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running")
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            SamplingProfiler._running.release()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        started = time.perf_counter()
+        next_tick = started
+        while not self._stop.is_set():
+            self._sample(me)
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                # fell behind (GIL contention); don't burst to catch up
+                next_tick = time.perf_counter()
+        self.duration = time.perf_counter() - started
+
+    def _sample(self, skip: int) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            frames: List[Frame] = []
+            f = frame
+            while f is not None:
+                code = f.f_code
+                frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+                f = f.f_back
+            if not frames:
+                continue
+            leaf = frames[0]
+            if not self.include_idle and (os.path.basename(leaf[1]), leaf[0]) in _IDLE_LEAVES:
+                continue
+            frames.reverse()
+            self.counts[(names.get(ident, str(ident)), tuple(frames))] += 1
+        self.samples += 1
+
+    # ---------- output ----------
+
+    def collapsed(self) -> str:
+        lines = []
+        for (thread, frames), count in self.counts.most_common():
+            names = [thread.replace(";", ":").replace(" ", "_")]
+            names.extend(f"{fn} ({os.path.basename(path)}:{line})" for fn, path, line in frames)
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def speedscope(self, name: str = "worker") -> dict:
+        index: Dict[Frame, int] = {}
+        frames: List[dict] = []
+        by_thread: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        for (thread, stack), count in self.counts.items():
+            ids = []
+            for fr in stack:
+                i = index.get(fr)
+                if i is None:
+                    i = index[fr] = len(frames)
+                    frames.append({"name": fr[0], "file": fr[1], "line": fr[2]})
+                ids.append(i)
+            samples, weights = by_thread.setdefault(thread, ([], []))
+            samples.append(ids)
+            weights.append(count * self.interval)
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+            for thread, (samples, weights) in sorted(by_thread.items())
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "zufar-sampler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
@@ -0,0 +1,145 @@
+"""
+Static console assets with content hashes and precompressed variants.
+
+At startup every file under the static directory is read once, given a
+content-hashed URL (``assets/app.js`` -> ``assets/app.1f3a9c0b2e.js``) and
+compressed to brotli (max quality) and gzip (level 9); a variant is kept only
+when it is smaller.  References in ``index.html`` are rewritten to the hashed
+URLs.  Requests then only pick the variant matching ``Accept-Encoding``;
+nothing is compressed per request.
+
+* hashed URLs: ``Cache-Control: public, max-age=31536000, immutable``
+* ``index.html`` and the original file names: ``no-cache`` plus an ETag, so
+  browsers revalidate with a cheap 304 and pick up new hashes immediately
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from .compression import available, compress, negotiate
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+HASH_CHARS = 10
+
+
+class Asset:
+    __slots__ = ("media_type", "digest", "variants", "cache_control")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str) -> None:
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:HASH_CHARS]
+        self.cache_control = cache_control
+        self.variants: Dict[str, bytes] = {"identity": body}
+        for encoding in available(tuple(STATIC_LEVELS)):
+            packed = compress(body, encoding, STATIC_LEVELS[encoding])
+            if len(packed) < len(body):
+                self.variants[encoding] = packed
+
+    def with_cache_control(self, cache_control: str) -> "Asset":
+        """Same bytes (shared, not recompressed) under another caching policy."""
+        other = Asset.__new__(Asset)
+        other.media_type, other.digest, other.variants = self.media_type, self.digest, self.variants
+        other.cache_control = cache_control
+        return other
+
+    def response(self, request: Request) -> Response:
+        offered = [e for e in self.variants if e != "identity"]
+        encoding = negotiate(request.headers.get("accept-encoding"), offered) or "identity"
+        etag = f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        body = b"" if request.method == "HEAD" else self.variants[encoding]
+        response = Response(body, media_type=self.media_type, headers=headers)
+        if request.method == "HEAD":
+            response.headers["content-length"] = str(len(self.variants[encoding]))
+        return response
+
+
+def _hashed_name(rel: str, digest: str) -> str:
+    root, ext = os.path.splitext(rel)
+    return f"{root}.{digest}{ext}"
+
+
+class StaticAssets:
+    """ASGI app for ``app.mount(prefix, assets)``; ``index`` serves the entry page."""
+
+    def __init__(self, directory: str, prefix: str = "/static", index: str = "index.html") -> None:
+        self.directory = directory
+        self.prefix = prefix.rstrip("/")
+        self.index_name = index
+        self.assets: Dict[str, Asset] = {}
+        self.urls: Dict[str, str] = {}
+        self._build()
+
+    def _build(self) -> None:
+        files: Dict[str, bytes] = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                with open(path, "rb") as fh:
+                    files[rel] = fh.read()
+
+        for rel, body in files.items():
+            if rel == self.index_name:
+                continue
+            media_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+            hashed = Asset(body, media_type, IMMUTABLE)
+            hashed_rel = _hashed_name(rel, hashed.digest)
+            self.assets[hashed_rel] = hashed
+            # old name stays reachable (bookmarks, cached pages) but must revalidate
+            self.assets[rel] = hashed.with_cache_control(REVALIDATE)
+            self.urls[rel] = f"{self.prefix}/{hashed_rel}"
+
+        if self.index_name in files:
+            html = files[self.index_name].decode("utf-8")
+            # longest first so "assets/app.js" never clobbers "assets/app.js.map"
+            for rel in sorted(self.urls, key=len, reverse=True):
+                html = html.replace(f"{self.prefix}/{rel}", self.urls[rel])
+            self.assets[self.index_name] = Asset(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE)
+
+    def url_for(self, rel: str) -> str:
+        return self.urls.get(rel, f"{self.prefix}/{rel}")
+
+    def lookup(self, rel: str) -> Optional[Asset]:
+        return self.assets.get(rel.lstrip("/"))
+
+    def index(self, request: Request) -> Response:
+        asset = self.lookup(self.index_name)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+        return asset.response(request)
+
+    async def __call__(self, scope, receive, send) -> None:
+        request = Request(scope, receive)
+        asset = self.lookup(_sub_path(scope))
+        if request.method not in ("GET", "HEAD"):
+            response: Response = PlainTextResponse("Method Not Allowed", status_code=405)
+        elif asset is None:
+            response = PlainTextResponse("Not Found", status_code=404)
+        else:
+            response = asset.response(request)
+        await response(scope, receive, send)
+
+
+def _sub_path(scope) -> str:
+    # path inside the mount, as Starlette's StaticFiles computes it
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path
@@ -1,12 +1,16 @@
 # backend/database.py
 import os
 import logging
+import threading
 from typing import Generator, Optional
-from sqlalchemy import create_engine, text
+from fastapi import Depends, Request
+from sqlalchemy import Engine, create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 
+from backend.core.profiling import install_sql_profiler
+from backend.core.replicas import ReplicaSet, Stickiness, reader_key
+
 logger = logging.getLogger("app.db")
-logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
 RUNNING_IN_RENDER = bool(os.getenv("RENDER") or os.getenv("RENDER_SERVICE_ID"))
 REQUIRE_DATABASE_URL = os.getenv("REQUIRE_DATABASE_URL", "1") == "1"
@@ -25,39 +29,120 @@ if RAW_URL:
     DATABASE_URL = _normalize_url(RAW_URL)
     ACTIVE_DB = "EXTERNAL_POSTGRES"
 else:
-    if RUNNING_IN_RENDER and REQUIRE_DATABASE_URL:
-        raise RuntimeError("DATABASE_URL missing in production; refusing SQLite fallback.")
     DATABASE_URL = "sqlite:///./dev.db"
     ACTIVE_DB = "SQLITE_FALLBACK"
 
-connect_args = {}
-if DATABASE_URL.startswith("sqlite:///"):
-    connect_args = {"check_same_thread": False}
+# Read replicas for GET handlers (see ``get_read_db``); comma-separated URLs
+REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    future=True,
-    echo=os.getenv("SQL_ECHO", "0") == "1",
-    connect_args=connect_args,
-)
+# The engine (and with it the DB driver) is built on first use rather than at
+# import, so importing models/routers stays cheap and a missing DATABASE_URL
+# surfaces when the app first touches the database, not when it is imported.
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
 
-SessionLocal = sessionmaker(
-    bind=engine,
+_SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     expire_on_commit=False,
     class_=Session,
 )
 
+def _make_engine(url: str, **connect_args) -> Engine:
+    if url.startswith("sqlite:///"):
+        connect_args["check_same_thread"] = False
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        future=True,
+        echo=os.getenv("SQL_ECHO", "0") == "1",
+        connect_args=connect_args,
+    )
+    install_sql_profiler(engine)
+    return engine
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if ACTIVE_DB == "SQLITE_FALLBACK" and RUNNING_IN_RENDER and REQUIRE_DATABASE_URL:
+                    raise RuntimeError("DATABASE_URL missing in production; refusing SQLite fallback.")
+                engine = _make_engine(DATABASE_URL)
+                _SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+_replicas: Optional[ReplicaSet] = None
+stickiness = Stickiness(READ_YOUR_WRITES_SECONDS)
+
+def get_replicas() -> Optional[ReplicaSet]:
+    """The replica set, built on first use; None without DATABASE_REPLICA_URLS."""
+    global _replicas
+    if _replicas is None and REPLICA_URLS:
+        with _engine_lock:
+            if _replicas is None:
+                # a dead replica should fail fast and fall back, not hang the request
+                timeout = {} if REPLICA_URLS[0].startswith("sqlite") else {"connect_timeout": 3}
+                _replicas = ReplicaSet(
+                    {_redact(u): _make_engine(_normalize_url(u), **timeout) for u in REPLICA_URLS},
+                    retry_seconds=REPLICA_RETRY_SECONDS,
+                    max_lag_seconds=REPLICA_MAX_LAG_SECONDS,
+                )
+    return _replicas
+
+def __getattr__(name: str):
+    # ``from backend.database import engine, SessionLocal`` keeps working, lazily
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        get_engine()
+        return _SessionLocal
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def _redact(url: str) -> str:
     try:
         return url.split("@")[-1]
     except Exception:
         return "REDACTED"
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+@event.listens_for(Session, "after_commit")
+def _note_write(session: Session) -> None:
+    reader = session.info.get("reader")
+    if reader is not None:
+        stickiness.note_write(reader)
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    """Primary session; a commit on it pins the caller's reads to the primary
+    for READ_YOUR_WRITES_SECONDS."""
+    get_engine()
+    db = _SessionLocal()
+    db.info["reader"] = reader_key(request.headers, request.client.host if request.client else None)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """Session for read-only handlers: the next healthy replica, or the
+    primary (no replicas configured, all down, or the caller just wrote).
+
+    Replicas lag, so anything shared between readers - ETags, cached bodies -
+    must be keyed by a version read on this same session (see
+    ``backend.core.etag``), never by state the writer updated elsewhere.
+    ``primary`` connects lazily, so it costs nothing when a replica serves.
+    """
+    replicas = get_replicas()
+    if not replicas or stickiness.is_sticky(primary.info.get("reader", "")):
+        yield primary
+        return
+    db = replicas.session(_SessionLocal)
+    if db is None:
+        yield primary
+        return
     try:
         yield db
     finally:
@@ -65,12 +150,12 @@ def get_db() -> Generator[Session, None, None]:
 
 def on_startup_db_check() -> None:
     try:
-        dialect = engine.dialect.name
+        dialect = get_engine().dialect.name
     except Exception:
         dialect = "unknown"
     logger.warning("DB INIT | mode=%s | dialect=%s | url=%s", ACTIVE_DB, dialect, _redact(DATABASE_URL))
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             conn.execute(text("SELECT 1"))
         logger.info("DB connectivity OK")
     except Exception as e:
@@ -0,0 +1,20 @@
+"""
+``backend.db`` is this package, which shadows the old ``backend/db.py``
+module; that module was unreachable and raised at import time without
+``DATABASE_URL``.  ``get_session`` now lives here and reuses the lazily
+created engine from ``backend.database``.
+"""
+
+from typing import TYPE_CHECKING, Generator
+
+if TYPE_CHECKING:
+    from sqlmodel import Session
+
+
+def get_session() -> Generator["Session", None, None]:
+    from sqlmodel import Session
+
+    from backend.database import get_engine
+
+    with Session(get_engine()) as session:
+        yield session
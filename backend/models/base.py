@@ -1,4 +1,7 @@
 from sqlalchemy.orm import DeclarativeBase
+from sqlmodel import SQLModel
 
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    # Share SQLModel's metadata so declarative tables can reference "users"
+    # and Alembic (which targets SQLModel.metadata) sees every table.
+    metadata = SQLModel.metadata
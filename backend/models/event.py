@@ -1,23 +1,37 @@
 from __future__ import annotations
 from typing import List, Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, ForeignKey, DateTime, Float, Boolean
+from sqlalchemy import Integer, String, ForeignKey, DateTime, Float, Boolean, Computed, DDL, Index, literal_column, text
+from sqlalchemy import event as sa_event
 from datetime import datetime, timezone
 from .base import Base
 
 class Event(Base):
     __tablename__ = "event"
+    __table_args__ = (
+        # active / historical listings: range on end_time, ordered by start_time
+        Index("ix_event_end_time_start_time", "end_time", "start_time"),
+        # map viewport (bounding box) queries
+        Index("ix_event_lat_lng", "lat", "lng"),
+        # "events I created"; most rows predate authorship and stay out of the index
+        Index("ix_event_created_by", "created_by_user_id",
+              postgresql_where=text("created_by_user_id IS NOT NULL"),
+              sqlite_where=text("created_by_user_id IS NOT NULL")),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(200))
     description: Mapped[str] = mapped_column(String(2000))
     address: Mapped[str] = mapped_column(String(300))
     country_code: Mapped[str] = mapped_column(String(2), default="IL")
-    lat: Mapped[float] = mapped_column(Float)
-    lng: Mapped[float] = mapped_column(Float)
+    # NULL until the geocode job resolves the address (see routers/events.py)
+    lat: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    lng: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     required_attendees: Mapped[int] = mapped_column(Integer, default=1)
+    min_confirmations_for_edit: Mapped[int] = mapped_column(Integer, default=3)
     is_locked_for_edit: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_by_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
 
     participants: Mapped[List["Participant"]] = relationship(
         back_populates="event", cascade="all, delete-orphan"
@@ -25,12 +39,160 @@ class Event(Base):
 
 class Participant(Base):
     __tablename__ = "participant"
+    __table_args__ = (
+        # participants of an event in confirmation order, and the per-event count;
+        # the leading event_id also serves the FK, so no separate index on it
+        Index("ix_participant_event_confirmed", "event_id", "confirmed_at"),
+        # anonymous confirmations (user_id NULL) never need the user lookup
+        Index("ix_participant_user_event", "user_id", "event_id",
+              postgresql_where=text("user_id IS NOT NULL"),
+              sqlite_where=text("user_id IS NOT NULL")),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    event_id: Mapped[int] = mapped_column(ForeignKey("event.id"), index=True, nullable=False)
-    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("user.id"), index=True, nullable=True)
+    event_id: Mapped[int] = mapped_column(ForeignKey("event.id"), nullable=False)
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
     display_name: Mapped[str] = mapped_column(String(200))
     lat: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     lng: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     confirmed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc))
 
-    event: Mapped["Event"] = relationship(back_populates="participants")
\ No newline at end of file
+    event: Mapped["Event"] = relationship(back_populates="participants")
+
+class EventChange(Base):
+    """Append-only change log backing ``GET /events/changes``.
+
+    ``seq`` is the sync cursor. No FK on ``event_id`` so entries survive the
+    event they describe (deletions must still be reported).
+    """
+    __tablename__ = "event_change"
+    # without AUTOINCREMENT SQLite reuses rowids after pruning
+    __table_args__ = {"sqlite_autoincrement": True}
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
+    op: Mapped[str] = mapped_column(String(8))  # insert | update | delete
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc))
+
+class EventSummary(Base):
+    """Per-event confirmation count and derived status for listings and reports.
+
+    Maintained by triggers on ``event`` and ``participant`` (below, and the
+    ``pg_event_summary`` migration), so every writer - bulk endpoints, the
+    ORM cascade, manual SQL - keeps it current without reading ``participant``.
+    ``still_needed`` and ``status`` are stored generated columns.  No FK on
+    ``event_id``: a partitioned ``event`` can't be referenced by id alone.
+    ``python -m backend.services.summary`` checks it against the base tables.
+    """
+    __tablename__ = "event_summary"
+    event_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    confirmations: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    required_attendees: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    still_needed: Mapped[int] = mapped_column(Integer, Computed(
+        "CASE WHEN required_attendees > confirmations THEN required_attendees - confirmations ELSE 0 END",
+        persisted=True,
+    ))
+    status: Mapped[str] = mapped_column(String(8), Computed(
+        "CASE WHEN confirmations >= required_attendees THEN 'filled' ELSE 'open' END",
+        persisted=True,
+    ))
+
+# A new event row counts its participants instead of assuming zero: on a
+# partitioned event an UPDATE that moves partitions fires DELETE + INSERT.
+_SQLITE_SUMMARY_TRIGGERS = (
+    """CREATE TRIGGER trg_event_summary_insert AFTER INSERT ON event BEGIN
+        INSERT OR REPLACE INTO event_summary (event_id, confirmations, required_attendees)
+        VALUES (NEW.id, (SELECT count(*) FROM participant WHERE event_id = NEW.id), NEW.required_attendees);
+    END""",
+    """CREATE TRIGGER trg_event_summary_required AFTER UPDATE OF required_attendees ON event BEGIN
+        UPDATE event_summary SET required_attendees = NEW.required_attendees WHERE event_id = NEW.id;
+    END""",
+    """CREATE TRIGGER trg_event_summary_delete AFTER DELETE ON event BEGIN
+        DELETE FROM event_summary WHERE event_id = OLD.id;
+    END""",
+    """CREATE TRIGGER trg_participant_summary_insert AFTER INSERT ON participant BEGIN
+        UPDATE event_summary SET confirmations = confirmations + 1 WHERE event_id = NEW.event_id;
+    END""",
+    """CREATE TRIGGER trg_participant_summary_delete AFTER DELETE ON participant BEGIN
+        UPDATE event_summary SET confirmations = confirmations - 1 WHERE event_id = OLD.event_id;
+    END""",
+    """CREATE TRIGGER trg_participant_summary_move AFTER UPDATE OF event_id ON participant BEGIN
+        UPDATE event_summary SET confirmations = confirmations - 1 WHERE event_id = OLD.event_id;
+        UPDATE event_summary SET confirmations = confirmations + 1 WHERE event_id = NEW.event_id;
+    END""",
+)
+
+_PG_SUMMARY_TRIGGERS = (
+    """CREATE OR REPLACE FUNCTION event_summary_on_event() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM event_summary WHERE event_id = OLD.id;
+        ELSIF TG_OP = 'UPDATE' THEN
+            UPDATE event_summary SET required_attendees = NEW.required_attendees WHERE event_id = NEW.id;
+        ELSE
+            INSERT INTO event_summary (event_id, confirmations, required_attendees)
+            VALUES (NEW.id, (SELECT count(*) FROM participant WHERE event_id = NEW.id), NEW.required_attendees)
+            ON CONFLICT (event_id) DO UPDATE
+            SET confirmations = EXCLUDED.confirmations, required_attendees = EXCLUDED.required_attendees;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION event_summary_on_participant() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE event_summary SET confirmations = confirmations - 1 WHERE event_id = OLD.event_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE event_summary SET confirmations = confirmations + 1 WHERE event_id = NEW.event_id;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE TRIGGER trg_event_summary AFTER INSERT OR DELETE OR UPDATE OF required_attendees ON event
+        FOR EACH ROW EXECUTE FUNCTION event_summary_on_event()""",
+    """CREATE TRIGGER trg_participant_summary AFTER INSERT OR DELETE OR UPDATE OF event_id ON participant
+        FOR EACH ROW EXECUTE FUNCTION event_summary_on_participant()""",
+)
+
+# no FKs, so tell create_all the triggers' tables must exist first
+EventSummary.__table__.add_is_dependent_on(Event.__table__)
+EventSummary.__table__.add_is_dependent_on(Participant.__table__)
+for _dialect, _statements in (("sqlite", _SQLITE_SUMMARY_TRIGGERS), ("postgresql", _PG_SUMMARY_TRIGGERS)):
+    for _sql in _statements:
+        sa_event.listen(EventSummary.__table__, "after_create", DDL(_sql).execute_if(dialect=_dialect))
+
+
+# ---------- search (backend/services/search.py) ----------
+
+def search_document():
+    """title, address and description as one string: the expression the
+    PostgreSQL trigram index is built on, so queries must use exactly this."""
+    t, sep = Event.__table__.c, literal_column("' '")
+    return t.title.op("||")(sep).op("||")(t.address).op("||")(sep).op("||")(t.description)
+
+# SQLite: FTS5 with the trigram tokenizer over the same columns, reading the
+# text from event itself (external content) and kept current by triggers.
+SQLITE_SEARCH = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5(
+        title, description, address, content='event', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS trg_event_fts_insert AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts (rowid, title, description, address)
+        VALUES (NEW.id, NEW.title, NEW.description, NEW.address);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_event_fts_delete AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts (event_fts, rowid, title, description, address)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.address);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_event_fts_update AFTER UPDATE OF title, description, address ON event BEGIN
+        INSERT INTO event_fts (event_fts, rowid, title, description, address)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.address);
+        INSERT INTO event_fts (rowid, title, description, address)
+        VALUES (NEW.id, NEW.title, NEW.description, NEW.address);
+    END""",
+)
+
+Index(
+    "ix_event_search_trgm", search_document().label("search_doc"),
+    postgresql_using="gin", postgresql_ops={"search_doc": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+sa_event.listen(Event.__table__, "before_create",
+                DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+for _sql in SQLITE_SEARCH:
+    sa_event.listen(Event.__table__, "after_create", DDL(_sql).execute_if(dialect="sqlite"))
@@ -0,0 +1,41 @@
+from __future__ import annotations
+from typing import Any, Optional
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class Job(Base):
+    """Background work queued by request handlers (``backend/services/jobs.py``).
+
+    ``run_at`` is when the job is next due: while ``queued`` the earliest run
+    (later for a retry), while ``running`` the end of the worker's lease, after
+    which another worker may take it over.  So "claimable" is one range on
+    ``run_at`` over the unfinished rows.
+    """
+    __tablename__ = "job"
+    __table_args__ = (
+        # the claim query; finished jobs (the bulk of the table) stay out of it
+        Index("ix_job_due", "kind", "run_at",
+              postgresql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+        # dashboard: recently finished jobs
+        Index("ix_job_finished_at", "finished_at"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String(8), nullable=False, default="queued")  # queued | running | done | failed
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    # a second enqueue with the same key is a no-op (while the row is kept)
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(200), unique=True, nullable=True)
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc))
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
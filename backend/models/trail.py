@@ -0,0 +1,27 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class LocationTrail(Base):
+    """A flushed chunk of one responder's location trail.
+
+    ``data`` is ``points`` records encoded by ``backend.services.trails.encode``
+    (delta-coded integer columns, zlib-compressed); ``start_at``/``end_at``
+    are the first and last point times so a time range reads a few chunks.
+    """
+    __tablename__ = "location_trail"
+    __table_args__ = (
+        Index("ix_location_trail_username_start_at", "username", "start_at"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    username: Mapped[str] = mapped_column(String(64), nullable=False)
+    start_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    end_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    points: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc))
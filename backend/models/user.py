@@ -1,9 +1,12 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Column, String, Boolean
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    # login matches emails case-insensitively; uq_users_email still guards exact duplicates
+    __table_args__ = (Index("ix_users_email_lower", text("lower(email)")),)
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(
         sa_column=Column(String(255), unique=True, index=True, nullable=False)
@@ -1,42 +1,25 @@
-from datetime import datetime, timedelta, timezone
-import os
-from typing import Dict, Any
-
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from jose import jwt
-from passlib.context import CryptContext
 
 from backend.models.user import User
 from backend.schemas.auth import SignUp, Login, Token
 from backend.database import get_db  # adjust if your dependency path differs
+from backend.security_simple import create_access_token, hash_password, verify_password
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# === Security helpers ===
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None = None) -> str:
-    to_encode = data.copy()
-    expire = datetime.now(tz=timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+def _by_email(db: Session, email: str):
+    # lower() on both sides matches ix_users_email_lower and rows stored before
+    # emails were normalised
+    return db.query(User).filter(func.lower(User.email) == email.strip().lower()).first()
 
 # === Routes ===
 @router.post("/signup", response_model=Token)
 def signup(payload: SignUp, db: Session = Depends(get_db)):
     # Duplicate email check
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = _by_email(db, payload.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -44,19 +27,19 @@ def signup(payload: SignUp, db: Session = Depends(get_db)):
         )
     user = User(
         full_name=payload.full_name,
-        email=payload.email,
-        password_hash=get_password_hash(payload.password),
+        email=payload.email.strip().lower(),
+        hashed_password=hash_password(payload.password),
     )
     db.add(user)
     db.commit()
     db.refresh(user)
-    token = create_access_token({"sub": str(user.id)})
+    token = create_access_token(str(user.id))
     return Token(access_token=token)
 
 @router.post("/login", response_model=Token)
 def login(payload: Login, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+    user = _by_email(db, payload.email)
+    if not user or not verify_password(payload.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
-    token = create_access_token({"sub": str(user.id)})
+    token = create_access_token(str(user.id))
     return Token(access_token=token)
@@ -1,15 +1,28 @@
 # backend/routers/events.py
 from __future__ import annotations
-from datetime import datetime, timezone
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, insert, or_, select, update
 from sqlalchemy.orm import Session
 
-from backend.database import get_db
-from backend.models.event import Event, Participant
+from backend.core.cache import response_cache
+from backend.core.config import settings
+from backend.core.etag import as_utc, etag_headers, is_not_modified, make_etag, not_modified
+from backend.core.responses import bytes_response, compile_adapter, model_response
+from backend.database import get_db, get_read_db
+from backend.models.event import Event, EventChange, EventSummary, Participant
 from backend.security_simple import get_current_user_id
+from backend.models.job import Job
+from backend.services import jobs
+from backend.services.changes import (
+    DEFAULT_LIMIT, MAX_LIMIT, changes_since, collection_version, event_version, record_change,
+)
+from backend.services.jobs import enqueue, enqueue_many
+from backend.services.search import QueryTooShort, search
+from backend.services.summary import report
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -21,8 +34,9 @@ class EventCreate(BaseModel):
     address: str = Field(..., min_length=1, max_length=300)
     start_time: datetime
     end_time: datetime
-    lat: float
-    lng: float
+    # omit both to have the address geocoded in the background
+    lat: Optional[float] = None
+    lng: Optional[float] = None
 
 class EventPatch(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=200)
@@ -50,89 +64,453 @@ class EventOut(BaseModel):
     description: str
     address: str
     country_code: str
-    lat: float
-    lng: float
+    lat: Optional[float] = None
+    lng: Optional[float] = None
     start_time: datetime
     end_time: datetime
     min_confirmations_for_edit: int
     is_locked_for_edit: bool
     created_by_user_id: Optional[int] = None
     participants: List[ParticipantOut] = []
+    # from event_summary; filled by the listings and GET /events/{id}
+    confirmations: Optional[int] = None
+    still_needed: Optional[int] = None
+    status: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class SummaryReport(BaseModel):
+    events: int
+    open: int
+    filled: int
+    confirmations: int
+    still_needed: int
+
+class SearchHit(BaseModel):
+    id: int
+    title: str
+    address: str
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    start_time: datetime
+    end_time: datetime
+    rank: float
+    # HTML-escaped text with matches wrapped in <mark>; description is a snippet
+    highlights: Dict[str, str]
+
+class SearchOut(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
 class ConfirmBody(BaseModel):
     display_name: str = Field(..., min_length=1, max_length=64)
     lat: Optional[float] = None
     lng: Optional[float] = None
 
-# ---------- Routes ----------
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    errors: Optional[List[Dict[str, Any]]] = None
 
-@router.post("", response_model=EventOut, status_code=status.HTTP_201_CREATED)
-def create_event(payload: EventCreate, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> EventOut:
-    if payload.end_time <= payload.start_time:
-        raise HTTPException(status_code=400, detail="end_time must be after start_time")
-    ev = Event(
-        title=payload.title,
-        description=payload.description,
-        address=payload.address,
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    items: List[BulkItemResult]
+
+class ChangesOut(BaseModel):
+    cursor: int
+    resync: bool = False
+    has_more: bool = False
+    inserted: List[EventOut] = []
+    updated: List[EventOut] = []
+    deleted: List[int] = []
+
+# Precompiled serializers: handlers return bytes built from these instead of
+# letting FastAPI re-validate and re-encode the response model.
+EVENT_OUT = compile_adapter(EventOut)
+EVENT_LIST = compile_adapter(List[EventOut])
+PARTICIPANT_LIST = compile_adapter(List[ParticipantOut])
+CHANGES_OUT = compile_adapter(ChangesOut)
+BULK_RESULT = compile_adapter(BulkResult)
+SUMMARY_REPORT = compile_adapter(SummaryReport)
+SEARCH_OUT = compile_adapter(SearchOut)
+
+# Bulk endpoints: max items per request, and rows per multi-row INSERT so
+# statement size and driver buffers stay bounded for large batches.
+BULK_MAX_ITEMS = 10_000
+BULK_CHUNK = 1_000
+
+# ETag collections: "events" covers the listings, search and summary,
+# "event:<id>" one event together with its participants.  Both are versioned
+# by event_change (every write below records a change), so nothing has to be
+# invalidated after a commit, in this process or any other.
+EVENTS_KEY = "events"
+
+# Events created without coordinates are geocoded by this background job.
+GEOCODE_JOB = "geocode_event"
+
+# Events may not run longer than this.  Together with end_time > start_time it
+# bounds start_time for the active and historical listings, which is what lets
+# PostgreSQL prune the monthly start_time partitions.
+MAX_DURATION = timedelta(days=settings.EVENT_MAX_DURATION_DAYS)
+
+def _window_problem(start: datetime, end: datetime) -> Optional[str]:
+    if end <= start:
+        return "end_time must be after start_time"
+    if end - start > MAX_DURATION:
+        return f"events may last at most {settings.EVENT_MAX_DURATION_DAYS} days"
+    return None
+
+def _create_problem(payload: EventCreate) -> Optional[str]:
+    if (payload.lat is None) != (payload.lng is None):
+        return "give both lat and lng, or neither to geocode the address"
+    return _window_problem(payload.start_time, payload.end_time)
+
+def _geocode_payload(event_id: int, address: str) -> Dict[str, Any]:
+    return {"event_id": event_id, "address": address}
+
+def _event_key(event_id: int) -> str:
+    return f"event:{event_id}"
+
+def _listing_version(db: Session) -> Tuple[str, Optional[datetime]]:
+    """Version of the listings as ``db`` sees them, and the next time one of
+    them changes by itself (the earliest end_time still ahead)."""
+    now = datetime.now(timezone.utc)
+    seq, next_end = collection_version(db, now, now - MAX_DURATION)
+    return f"{seq}.{int(as_utc(next_end).timestamp() * 1e6) if next_end else 0}", next_end
+
+def _chunks(items: List[Any], size: int = BULK_CHUNK) -> Iterator[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _new_event_row(payload: EventCreate, user_id: int) -> Dict[str, Any]:
+    return dict(
+        payload.model_dump(),
         country_code="IL",
-        lat=payload.lat,
-        lng=payload.lng,
-        start_time=payload.start_time,
-        end_time=payload.end_time,
         min_confirmations_for_edit=3,
         is_locked_for_edit=False,
         created_by_user_id=user_id,
     )
-    db.add(ev)
+
+def _insert_ids(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """Multi-row INSERT ... RETURNING id, ids in the same order as ``rows``."""
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLAlchemy can't order RETURNING on SQLite and falls back to one
+        # statement per row; rowids within one INSERT ascend in VALUES order.
+        return sorted(db.scalars(insert(model).returning(model.id), rows).all())
+    return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all())
+
+def _validate_batch(items: List[Dict[str, Any]], model: type[BaseModel], check=None):
+    """Validate every item; returns ([(index, model)], [BulkItemResult for failures])."""
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    valid, failed = [], []
+    for i, item in enumerate(items):
+        try:
+            obj = model.model_validate(item)
+        except ValidationError as e:
+            failed.append(BulkItemResult(index=i, ok=False, errors=[{"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()]))
+            continue
+        problem = check(obj) if check else None
+        if problem:
+            failed.append(BulkItemResult(index=i, ok=False, errors=[{"loc": [], "msg": problem}]))
+        else:
+            valid.append((i, obj))
+    return valid, failed
+
+def _bulk_response(ids_by_index: Dict[int, int], failed: List[BulkItemResult], status_code: int = 200) -> Response:
+    items = failed + [BulkItemResult(index=i, ok=True, id=pk) for i, pk in ids_by_index.items()]
+    items.sort(key=lambda r: r.index)
+    return model_response(BULK_RESULT, BulkResult(created=len(ids_by_index), failed=len(failed), items=items), status_code=status_code)
+
+def _with_summary(query):
+    return query.add_entity(EventSummary).outerjoin(EventSummary, EventSummary.event_id == Event.id)
+
+def _summarised(ev: Event, summary: Optional[EventSummary]) -> EventOut:
+    out = EventOut.model_validate(ev)
+    if summary is not None:
+        out.confirmations, out.still_needed, out.status = summary.confirmations, summary.still_needed, summary.status
+    return out
+
+def _seconds_until(when: Optional[datetime]) -> Optional[float]:
+    if when is None:
+        return None
+    return (as_utc(when) - datetime.now(timezone.utc)).total_seconds()
+
+# ---------- Routes ----------
+
+@router.post("", response_model=EventOut, status_code=status.HTTP_201_CREATED)
+def create_event(payload: EventCreate, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> Response:
+    problem = _create_problem(payload)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+    row = _new_event_row(payload, user_id)
+    # INSERT ... RETURNING id; everything else in the response is already known
+    event_id = db.scalar(insert(Event).returning(Event.id), row)
+    record_change(db, [event_id], "insert")
+    if payload.lat is None:
+        enqueue(db, GEOCODE_JOB, _geocode_payload(event_id, payload.address), key=f"geocode:{event_id}")
     db.commit()
-    db.refresh(ev)
-    return EventOut.model_validate(ev)
+    out = EventOut(id=event_id, participants=[], **row)
+    return model_response(EVENT_OUT, out, status_code=status.HTTP_201_CREATED)
 
 @router.get("", response_model=List[EventOut])
-def list_events(db: Session = Depends(get_db)) -> List[EventOut]:
-    now = datetime.now(timezone.utc)
-    rows = db.query(Event).filter(Event.end_time >= now).order_by(Event.start_time.asc()).all()
-    return [EventOut.model_validate(r) for r in rows]
+def list_events(request: Request, db: Session = Depends(get_read_db)) -> Response:
+    version, next_end = _listing_version(db)
+    etag = make_etag(EVENTS_KEY, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    def build():
+        now = datetime.now(timezone.utc)
+        rows = (
+            _with_summary(db.query(Event))
+            .filter(Event.end_time >= now, Event.start_time >= now - MAX_DURATION)
+            .order_by(Event.start_time.asc())
+            .all()
+        )
+        return EVENT_LIST.dump_json([_summarised(ev, sm) for ev, sm in rows]), _seconds_until(next_end)
+
+    return bytes_response(response_cache.fetch(EVENTS_KEY, request, build, version=version), headers=etag_headers(etag))
 
 @router.get("/historical", response_model=List[EventOut])
-def list_historical(db: Session = Depends(get_db)) -> List[EventOut]:
-    now = datetime.now(timezone.utc)
-    rows = db.query(Event).filter(Event.end_time < now).order_by(Event.start_time.desc()).all()
-    return [EventOut.model_validate(r) for r in rows]
+def list_historical(
+    request: Request,
+    after: Optional[datetime] = Query(None, description="only events starting at or after this time"),
+    before: Optional[datetime] = Query(None, description="only events starting before this time"),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    version, next_end = _listing_version(db)
+    etag = make_etag(EVENTS_KEY, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    def build():
+        now = datetime.now(timezone.utc)
+        # start_time < now follows from end_time < now but is what the
+        # partitions are keyed on; after/before narrow it further
+        window = [Event.end_time < now, Event.start_time < min(now, as_utc(before or now))]
+        if after is not None:
+            window.append(Event.start_time >= as_utc(after))
+        rows = _with_summary(db.query(Event)).filter(*window).order_by(Event.start_time.desc()).all()
+        return EVENT_LIST.dump_json([_summarised(ev, sm) for ev, sm in rows]), _seconds_until(next_end)
+
+    return bytes_response(response_cache.fetch(EVENTS_KEY, request, build, version=version), headers=etag_headers(etag))
+
+@router.get("/summary", response_model=SummaryReport)
+def summary_report(request: Request, db: Session = Depends(get_read_db)) -> Response:
+    """Open/filled counts and people still needed across active events."""
+    version, next_end = _listing_version(db)
+    etag = make_etag(EVENTS_KEY, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    def build():
+        now = datetime.now(timezone.utc)
+        totals = report(db, now, now - MAX_DURATION)
+        return SUMMARY_REPORT.dump_json(SummaryReport(**vars(totals))), _seconds_until(next_end)
+
+    return bytes_response(response_cache.fetch(EVENTS_KEY, request, build, version=version), headers=etag_headers(etag))
+
+@router.get("/search", response_model=SearchOut)
+def search_events(
+    request: Request,
+    q: str = Query(..., min_length=3, max_length=200, description="words to find in title, address or description"),
+    when: str = Query("all", pattern="^(active|historical|all)$"),
+    after: Optional[datetime] = Query(None, description="only events starting at or after this time"),
+    before: Optional[datetime] = Query(None, description="only events starting before this time"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Ranked partial-match search, every word required; ``when`` selects the
+    active or historical listing's window."""
+    version, next_end = _listing_version(db)
+    etag = make_etag(EVENTS_KEY, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    def build():
+        now = datetime.now(timezone.utc)
+        window = []
+        if when == "active":
+            window += [Event.end_time >= now, Event.start_time >= now - MAX_DURATION]
+        elif when == "historical":
+            window += [Event.end_time < now, Event.start_time < now]
+        if after is not None:
+            window.append(Event.start_time >= as_utc(after))
+        if before is not None:
+            window.append(Event.start_time < as_utc(before))
+        try:
+            hits = search(db, q, *window, limit=limit)
+        except QueryTooShort as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        out = SearchOut(query=q, hits=[
+            SearchHit(
+                id=h.event.id, title=h.event.title, address=h.event.address, lat=h.event.lat, lng=h.event.lng,
+                start_time=h.event.start_time, end_time=h.event.end_time, rank=h.rank, highlights=h.highlights,
+            )
+            for h in hits
+        ])
+        return SEARCH_OUT.dump_json(out), None if when == "all" else _seconds_until(next_end)
+
+    return bytes_response(response_cache.fetch(EVENTS_KEY, request, build, version=version), headers=etag_headers(etag))
+
+@router.get("/changes", response_model=ChangesOut)
+def list_changes(
+    since: int = Query(0, ge=0, description="cursor from the previous response; 0 for a first sync"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    cs = changes_since(db, since, limit)
+    out = ChangesOut(
+        cursor=cs.cursor,
+        resync=cs.resync,
+        has_more=cs.has_more,
+        inserted=[EventOut.model_validate(e) for e in cs.inserted],
+        updated=[EventOut.model_validate(e) for e in cs.updated],
+        deleted=cs.deleted,
+    )
+    return model_response(CHANGES_OUT, out)
+
+@router.get("/{event_id}", response_model=EventOut)
+def get_event(event_id: int, request: Request, db: Session = Depends(get_read_db)) -> Response:
+    etag = make_etag(_event_key(event_id), event_version(db, event_id))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    row = _with_summary(db.query(Event)).filter(Event.id == event_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return model_response(EVENT_OUT, _summarised(*row), headers=etag_headers(etag))
+
+@router.get("/{event_id}/participants", response_model=List[ParticipantOut])
+def list_participants(event_id: int, request: Request, db: Session = Depends(get_read_db)) -> Response:
+    etag = make_etag(_event_key(event_id), event_version(db, event_id))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    if db.get(Event, event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    rows = db.query(Participant).filter(Participant.event_id == event_id).order_by(Participant.confirmed_at.asc()).all()
+    return model_response(PARTICIPANT_LIST, [ParticipantOut.model_validate(r) for r in rows], headers=etag_headers(etag))
 
 @router.post("/{event_id}/confirm", response_model=EventOut)
-def confirm_attendance(event_id: int, body: ConfirmBody, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> EventOut:
-    ev = db.get(Event, event_id)
-    if not ev:
+def confirm_attendance(event_id: int, body: ConfirmBody, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> Response:
+    # One round trip checks the event exists, reads the confirmation count from
+    # event_summary (plus the one being added) and returns the updated row.
+    # lock logic: once we have enough confirmations, allow edits
+    confirmations = func.coalesce(
+        select(EventSummary.confirmations).where(EventSummary.event_id == event_id).scalar_subquery(), 0
+    ) + 1
+    ev = db.scalar(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(is_locked_for_edit=confirmations < Event.min_confirmations_for_edit)
+        .returning(Event)
+        .execution_options(synchronize_session=False)
+    )
+    if ev is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    part = Participant(event_id=event_id, user_id=user_id, display_name=body.display_name, lat=body.lat, lng=body.lng)
-    db.add(part)
-    db.flush()
-    # lock logic: once we have enough confirmations, allow edits (or lock? per original requirement: allow edit after enough users confirm)
-    cnt = db.query(Participant).filter(Participant.event_id == event_id).count()
-    ev.is_locked_for_edit = False if cnt >= ev.min_confirmations_for_edit else True
-    db.add(ev)
+    db.execute(insert(Participant).values(
+        event_id=event_id, user_id=user_id, display_name=body.display_name, lat=body.lat, lng=body.lng,
+    ))
+    out = EventOut.model_validate(ev)  # loads participants, including the new one
+    record_change(db, [event_id], "update")
     db.commit()
-    db.refresh(ev)
-    return EventOut.model_validate(ev)
+    return model_response(EVENT_OUT, out)
 
-@router.patch("/{event_id}", response_model=EventOut)
-def edit_event(event_id: int, body: EventPatch, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> EventOut:
-    ev = db.get(Event, event_id)
-    if not ev:
+@router.post("/bulk", response_model=BulkResult, status_code=status.HTTP_201_CREATED)
+def create_events_bulk(items: List[Dict[str, Any]], db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> Response:
+    """Create many events in one transaction; invalid items are reported and skipped."""
+    valid, failed = _validate_batch(items, EventCreate, _create_problem)
+    ids_by_index: Dict[int, int] = {}
+    for chunk in _chunks(valid):
+        rows = [_new_event_row(p, user_id) for _, p in chunk]
+        ids = _insert_ids(db, Event, rows)
+        db.execute(insert(EventChange), [{"event_id": pk, "op": "insert"} for pk in ids])
+        enqueue_many(db, GEOCODE_JOB, [
+            (_geocode_payload(pk, p.address), f"geocode:{pk}") for (_, p), pk in zip(chunk, ids) if p.lat is None
+        ])
+        ids_by_index.update((i, pk) for (i, _), pk in zip(chunk, ids))
+    db.commit()
+    return _bulk_response(ids_by_index, failed, status_code=status.HTTP_201_CREATED)
+
+@router.post("/{event_id}/confirm/bulk", response_model=BulkResult)
+def confirm_attendance_bulk(event_id: int, items: List[Dict[str, Any]], db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> Response:
+    """Record many confirmations for one event in one transaction."""
+    valid, failed = _validate_batch(items, ConfirmBody)
+    min_conf = db.scalar(select(Event.min_confirmations_for_edit).where(Event.id == event_id))
+    if min_conf is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    # only allow edit once enough people confirmed (is_locked_for_edit == False)
-    if ev.is_locked_for_edit:
-        raise HTTPException(status_code=400, detail="Editing is locked until enough confirmations are received")
-    # author can edit; optionally enforce creator check
-    if ev.created_by_user_id and ev.created_by_user_id != user_id:
+    ids_by_index: Dict[int, int] = {}
+    for chunk in _chunks(valid):
+        rows = [dict(b.model_dump(), event_id=event_id, user_id=user_id) for _, b in chunk]
+        ids = _insert_ids(db, Participant, rows)
+        ids_by_index.update((i, pk) for (i, _), pk in zip(chunk, ids))
+    if ids_by_index:
+        cnt = db.scalar(select(EventSummary.confirmations).where(EventSummary.event_id == event_id)) or 0
+        db.execute(update(Event).where(Event.id == event_id).values(is_locked_for_edit=cnt < min_conf))
+        record_change(db, [event_id], "update")
+    db.commit()
+    return _bulk_response(ids_by_index, failed)
+
+@router.patch("/{event_id}", response_model=EventOut)
+def edit_event(event_id: int, body: EventPatch, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> Response:
+    # only allow edit once enough people confirmed (is_locked_for_edit == False);
+    # author can edit. Both rules live in the WHERE clause so the happy path is
+    # a single UPDATE ... RETURNING; the reason is only looked up on failure.
+    fields = body.model_dump(exclude_unset=True) or {"is_locked_for_edit": Event.is_locked_for_edit}
+    ev = db.scalar(
+        update(Event)
+        .where(
+            Event.id == event_id,
+            Event.is_locked_for_edit.is_(False),
+            or_(Event.created_by_user_id.is_(None), Event.created_by_user_id == user_id),
+        )
+        .values(**fields)
+        .returning(Event)
+        .execution_options(synchronize_session=False)
+    )
+    if ev is None:
+        current = db.get(Event, event_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Event not found")
+        if current.is_locked_for_edit:
+            raise HTTPException(status_code=400, detail="Editing is locked until enough confirmations are received")
         raise HTTPException(status_code=403, detail="Only the creator can edit the event")
-    for field, value in body.model_dump(exclude_unset=True).items():
-        setattr(ev, field, value)
-    db.add(ev)
+    # only a patch that moves the window is checked: events stored before the
+    # cap may be longer and must stay editable
+    problem = ("start_time" in fields or "end_time" in fields) and _window_problem(
+        as_utc(ev.start_time), as_utc(ev.end_time))
+    if problem:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=problem)
+    out = EventOut.model_validate(ev)
+    record_change(db, [event_id], "update")
+    if "address" in fields and "lat" not in fields and "lng" not in fields:
+        # the old coordinates stay until the new address is resolved
+        enqueue(db, GEOCODE_JOB, _geocode_payload(event_id, ev.address))
     db.commit()
-    db.refresh(ev)
-    return EventOut.model_validate(ev)
+    return model_response(EVENT_OUT, out)
+
+# ---------- Background jobs ----------
+
+def _geocode(address: str) -> Optional[tuple]:
+    from backend.services.geocode import geocode_il  # worker-only dependency (requests)
+
+    return geocode_il(address, raise_errors=True)  # network errors are retried
+
+# Nominatim's usage policy allows one request at a time
+@jobs.handler(GEOCODE_JOB, concurrency=1)
+def geocode_event(db: Session, job: Job) -> None:
+    """Fill in lat/lng for the address the event had when the job was queued;
+    an address changed since has its own job."""
+    event_id, address = job.payload["event_id"], job.payload["address"]
+    current = db.scalar(select(Event.address).where(Event.id == event_id))
+    if current != address:
+        return
+    found = _geocode(address)
+    if found is None:
+        return
+    db.execute(update(Event).where(Event.id == event_id, Event.address == address).values(lat=found[0], lng=found[1]))
+    record_change(db, [event_id], "update")
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.core.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
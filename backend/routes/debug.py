@@ -1,11 +1,74 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import os
+from dataclasses import asdict
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
-from backend.database import get_db
-from backend.users.models import User
+from backend.core.cache import response_cache
+from backend.core.profiling import recent_profiles
+from backend.core.sampler import MAX_HZ, MAX_SECONDS, ProfilerBusy, SamplingProfiler
+from backend.database import get_read_db, get_replicas
+from backend.security_simple import require_admin
+from backend.services import jobs
+from backend.models.user import User
 
 router = APIRouter(prefix="/debug", tags=["debug"])
 
 @router.get("/users_count")
-def users_count(db: Session = Depends(get_db)):
+def users_count(db: Session = Depends(get_read_db)):
     return {"count": db.scalar(select(func.count()).select_from(User))}
+
+@router.get("/cache")
+def cache_stats():
+    return response_cache.stats.snapshot()
+
+@router.get("/replicas", dependencies=[Depends(require_admin)])
+def replica_states():
+    replicas = get_replicas()
+    return replicas.states() if replicas else []
+
+@router.get("/jobs", dependencies=[Depends(require_admin)])
+def job_queue(window_minutes: float = Query(60.0, gt=0, le=24 * 60), db: Session = Depends(get_read_db)):
+    """Background jobs per kind: depth (queued, due, running, failed), age of
+    the oldest due job, and wait/run percentiles over the window."""
+    return {
+        "kinds": [asdict(s) for s in jobs.stats(db, timedelta(minutes=window_minutes))],
+        "recent_failures": jobs.recent_failures(db),
+    }
+
+@router.get("/sql-profiles", dependencies=[Depends(require_admin)])
+def sql_profiles():
+    return [
+        {k: v for k, v in p.as_dict().items() if k != "statements"}
+        for p in reversed(list(recent_profiles.values()))
+    ]
+
+@router.get("/sql-profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def sql_profile(profile_id: int):
+    profile = recent_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.as_dict()
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0, le=MAX_SECONDS),
+    hz: int = Query(100, ge=1, le=MAX_HZ),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    idle: bool = False,
+):
+    profiler = SamplingProfiler(hz=hz, include_idle=idle)
+    try:
+        profiler.start()
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    if format == "speedscope":
+        return profiler.speedscope(name=f"worker pid {os.getpid()}")
+    return PlainTextResponse(profiler.collapsed())
@@ -6,20 +6,27 @@ from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
-from bcrypt import hashpw, gensalt, checkpw
+
+from backend.core.metrics import AUTH_VERIFY
 
 # Pull secret from env (or default to a dev key); keep it stable across restarts in prod
 SECRET_KEY = os.getenv("SECRET_KEY") or os.getenv("JWT_SECRET") or "change-me-in-prod"
 TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
+# comma-separated user ids allowed on operational endpoints (/debug/*)
+ADMIN_USER_IDS = {int(x) for x in os.getenv("ADMIN_USER_IDS", "").split(",") if x.strip()}
 
 bearer = HTTPBearer(auto_error=False)
 
+# bcrypt is imported on first use: only signup/login need it, and keeping it
+# out of module import shortens cold start
 def hash_password(plain: str) -> str:
-    return hashpw(plain.encode("utf-8"), gensalt(rounds=12)).decode("utf-8")
+    import bcrypt
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=12)).decode("utf-8")
 
 def verify_password(plain: str, hashed: str) -> bool:
+    import bcrypt
     try:
-        return checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
     except Exception:
         return False
 
@@ -51,11 +58,19 @@ def get_current_user_id(
 ) -> int:
     if not creds or creds.scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    started = time.perf_counter()
     try:
         sub, _ = decode_access_token(creds.credentials)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    finally:
+        AUTH_VERIFY.observe(time.perf_counter() - started, ("hmac",))
     try:
         return int(sub)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid subject")
+
+def require_admin(user_id: int = Depends(get_current_user_id)) -> int:
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return user_id
@@ -0,0 +1,135 @@
+"""
+Event change log for delta sync (``GET /events/changes?since=<cursor>``).
+
+Every event/participant write appends an ``EventChange`` row in the same
+transaction, so ``seq`` is a monotonic cursor over the event collection.
+A poll returns the *current* state of each event touched after the cursor,
+collapsed to one entry per event, so replaying a page is idempotent.
+
+Sequence numbers are allocated before commit, so a slow transaction can
+commit a lower ``seq`` after a higher one became visible.  The cursor handed
+back therefore stops at the first change younger than ``SETTLE_SECONDS``;
+such changes are still returned and simply get re-sent on the next poll.
+
+Old entries are removed with ``prune_changes`` (run ``python -m
+backend.services.changes --keep-days 7`` from cron); a client whose cursor
+predates the oldest retained entry is told to do a full resync.  The newest
+entry is always kept, so the latest ``seq`` never goes back.
+
+The same log versions the conditional GETs (``backend.core.etag``):
+``collection_version`` for the listings and ``event_version`` for one event.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from backend.core.etag import as_utc
+from backend.models.event import Event, EventChange
+
+SETTLE_SECONDS = 2.0
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+
+def record_change(db: Session, event_ids: Iterable[int], op: str) -> None:
+    """Queue change rows on ``db``; they commit with the caller's write."""
+    for event_id in event_ids:
+        db.add(EventChange(event_id=event_id, op=op))
+
+
+def collection_version(db: Session, now: datetime, earliest_start: datetime) -> Tuple[int, Optional[datetime]]:
+    """(newest change seq, earliest ``end_time`` at or after ``now``) in one
+    round trip; ``earliest_start`` bounds ``start_time`` for partition pruning."""
+    seq = select(func.coalesce(func.max(EventChange.seq), 0)).scalar_subquery()
+    next_end = (
+        select(func.min(Event.end_time))
+        .where(Event.end_time >= now, Event.start_time >= earliest_start)
+        .scalar_subquery()
+    )
+    latest, ends = db.execute(select(seq, next_end)).one()
+    return latest, ends
+
+
+def event_version(db: Session, event_id: int) -> int:
+    """Newest change seq of one event.  Once its entries are pruned, minus the
+    oldest retained seq: that only grows, so an old value never comes back."""
+    own = select(func.max(EventChange.seq)).where(EventChange.event_id == event_id).scalar_subquery()
+    oldest = select(func.coalesce(func.min(EventChange.seq), 0)).scalar_subquery()
+    return db.scalar(select(func.coalesce(own, -oldest)))
+
+
+@dataclass
+class ChangeSet:
+    cursor: int
+    resync: bool = False
+    has_more: bool = False
+    inserted: List[Event] = field(default_factory=list)
+    updated: List[Event] = field(default_factory=list)
+    deleted: List[int] = field(default_factory=list)
+
+
+def changes_since(db: Session, since: int, limit: int = DEFAULT_LIMIT) -> ChangeSet:
+    limit = max(1, min(limit, MAX_LIMIT))
+    oldest, latest = db.execute(select(func.min(EventChange.seq), func.max(EventChange.seq))).one()
+    latest = latest or 0
+    # cursor older than retention (or from a different database): start over
+    if since > latest or (oldest is not None and since < oldest - 1):
+        return ChangeSet(cursor=latest, resync=True)
+
+    page = db.scalars(
+        select(EventChange).where(EventChange.seq > since).order_by(EventChange.seq.asc()).limit(limit + 1)
+    ).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    horizon = datetime.now(timezone.utc) - timedelta(seconds=SETTLE_SECONDS)
+    cursor = since
+    for change in page:
+        if as_utc(change.changed_at) > horizon:
+            break
+        cursor = change.seq
+
+    inserted_ids = {c.event_id for c in page if c.op == "insert"}
+    touched = list(dict.fromkeys(c.event_id for c in page))
+    rows = {ev.id: ev for ev in db.scalars(select(Event).where(Event.id.in_(touched)))} if touched else {}
+
+    result = ChangeSet(cursor=cursor, has_more=has_more)
+    for event_id in touched:
+        ev = rows.get(event_id)
+        if ev is None:
+            result.deleted.append(event_id)
+        elif event_id in inserted_ids:
+            result.inserted.append(ev)
+        else:
+            result.updated.append(ev)
+    return result
+
+
+def prune_changes(db: Session, older_than: datetime) -> int:
+    newest = select(func.max(EventChange.seq)).scalar_subquery()
+    res = db.execute(delete(EventChange).where(EventChange.changed_at < older_than, EventChange.seq < newest))
+    db.commit()
+    return res.rowcount or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prune the event change log")
+    parser.add_argument("--keep-days", type=float, default=7.0)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+
+    with SessionLocal() as db:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.keep_days)
+        print(f"pruned {prune_changes(db, cutoff)} change rows older than {cutoff.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,38 @@
 from __future__ import annotations
 
 import logging
+import threading
+from collections import OrderedDict
 import requests
 from typing import Optional
 
 # תיקון ה-import: הקונפיג יושב תחת core
 from ..core.config import settings
+from ..core.metrics import GEOCODE_CACHE
 
 log = logging.getLogger("geocode")
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 
-def geocode_il(address: str) -> Optional[tuple[float, float]]:
+# LRU of resolved addresses (including "not found"); network errors are not cached
+_CACHE_SIZE = 2048
+_cache: "OrderedDict[str, Optional[tuple[float, float]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def geocode_il(address: str, raise_errors: bool = False) -> Optional[tuple[float, float]]:
     """
     גיאוקוד כתובת בישראל באמצעות Nominatim.
     מחזיר (lat, lon) או None אם לא נמצא.
+    raise_errors: network/HTTP errors raise instead of returning None (the
+    geocode job retries them).
     """
+    key = " ".join(address.split()).lower()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            GEOCODE_CACHE.inc(("hit",))
+            return _cache[key]
+    GEOCODE_CACHE.inc(("miss",))
     try:
         params = {
             "q": f"{address}, Israel",
@@ -30,10 +47,16 @@ def geocode_il(address: str) -> Optional[tuple[float, float]]:
         data = resp.json()
         if not data:
             log.warning("geocode: no results for address=%s", address)
-            return None
-        lat = float(data[0]["lat"])
-        lon = float(data[0]["lon"])
-        return (lat, lon)
+            result = None
+        else:
+            result = (float(data[0]["lat"]), float(data[0]["lon"]))
     except Exception as e:
+        if raise_errors:
+            raise
         log.exception("geocode failed for address=%s: %s", address, e)
         return None
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
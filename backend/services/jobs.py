@@ -0,0 +1,452 @@
+"""
+Durable background jobs: request handlers enqueue, a worker runs them.
+
+``enqueue(db, kind, payload, key=...)`` inserts the job in the caller's
+transaction, so it exists exactly when the change that asked for it was
+committed; a job whose idempotency ``key`` is already queued (or done, until
+pruned) is not added again.  The handler then commits and returns at once.
+
+Workers claim due jobs with ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE
+SKIP LOCKED)``: concurrent workers neither block on nor take each other's
+rows (SQLite serialises writers instead).  A claimed job is leased for
+``LEASE_SECONDS`` (``run_at`` moves to the end of the lease); if its worker
+dies, the job becomes due again when the lease runs out.  So a handler may
+run twice: its database writes commit together with the job's completion
+(and are rolled back if the lease was lost meanwhile), anything external
+should be safe to repeat.
+
+A failing job is retried with exponential backoff and jitter until
+``max_attempts``, then marked ``failed``; ``PermanentError`` fails it at once.
+Handlers register per kind, with a concurrency limit per worker process::
+
+    @handler("geocode_event", concurrency=1)
+    def geocode_event(db: Session, job: Job) -> None: ...
+
+Handlers run in whichever process runs the worker, usually not the web
+process, so anything the API serves must change through the database: an
+event write records an ``event_change``, which moves the ETags and cached
+listings of every web process on (``backend.core.etag``).  ``on_commit`` is
+for effects local to the worker.
+
+Run a worker standalone, or inside the web process with JOBS_RUN_IN_APP=1::
+
+    python -m backend.services.jobs work --concurrency 4
+    python -m backend.services.jobs stats
+    python -m backend.services.jobs prune --days 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from backend.core.etag import as_utc
+from backend.core.metrics import REGISTRY
+from backend.models.job import Job
+
+logger = logging.getLogger("app.jobs")
+
+# modules whose @handler functions a standalone worker needs
+HANDLER_MODULES = ("backend.routers.events",)
+
+LEASE_SECONDS = 300.0
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 3600.0
+DEFAULT_MAX_ATTEMPTS = 5
+STATS_SAMPLE = 10_000
+
+JOBS_PROCESSED = REGISTRY.counter("jobs_processed_total", "Background jobs run, by outcome", ("kind", "outcome"))
+JOB_SECONDS = REGISTRY.histogram("job_run_seconds", "Background job run time", ("kind",))
+
+
+class PermanentError(Exception):
+    """Raised by a handler for a job that can never succeed; no retry."""
+
+
+@dataclass
+class Kind:
+    name: str
+    fn: Callable[[Session, Job], None]
+    concurrency: int
+
+
+KINDS: Dict[str, Kind] = {}
+
+
+def handler(name: str, concurrency: int = 4) -> Callable:
+    """Register the function running jobs of ``name``; at most
+    ``concurrency`` of them run at once in one worker process."""
+    def register(fn: Callable[[Session, Job], None]) -> Callable[[Session, Job], None]:
+        KINDS[name] = Kind(name, fn, concurrency)
+        return fn
+    return register
+
+
+def load_handlers() -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def backoff(attempt: int) -> float:
+    """Seconds before retry number ``attempt``: doubling, capped, jittered."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+# ---------- producer side ----------
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    key: Optional[str] = None,
+    delay: float = 0.0,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Optional[int]:
+    """Queue a job in the caller's transaction (one INSERT; the caller
+    commits).  Returns its id, or None if a job with ``key`` exists."""
+    now = _now()
+    values = dict(
+        kind=kind, payload=payload or {}, idempotency_key=key, status="queued", attempts=0,
+        max_attempts=max_attempts, run_at=now + timedelta(seconds=delay), created_at=now,
+    )
+    dialect = db.get_bind().dialect.name
+    if key is not None and dialect in ("postgresql", "sqlite"):
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(Job).values(**values)
+        stmt = stmt.on_conflict_do_nothing(index_elements=["idempotency_key"])
+    else:
+        stmt = insert(Job).values(**values)
+    return db.scalar(stmt.returning(Job.id))
+
+
+def enqueue_many(db: Session, kind: str, jobs: List[Tuple[Dict[str, Any], Optional[str]]],
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> None:
+    """``enqueue`` for many ``(payload, key)`` pairs in one executemany."""
+    if not jobs:
+        return
+    now = _now()
+    rows = [
+        dict(kind=kind, payload=payload, idempotency_key=key, status="queued", attempts=0,
+             max_attempts=max_attempts, run_at=now, created_at=now)
+        for payload, key in jobs
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(Job)
+        db.execute(stmt.on_conflict_do_nothing(index_elements=["idempotency_key"]), rows)
+    else:
+        db.execute(insert(Job), rows)
+
+
+def on_commit(db: Session, fn: Callable[[], None]) -> None:
+    """Call ``fn`` once ``db`` commits (e.g. from a handler, whose
+    transaction the worker commits).  ``fn`` runs in the worker's process."""
+    sa_event.listen(db, "after_commit", lambda _session: fn(), once=True)
+
+
+# ---------- worker side ----------
+
+def claim(db: Session, worker: str, kind: str, limit: int, lease: float = LEASE_SECONDS) -> List[Job]:
+    """Lease up to ``limit`` due jobs of ``kind`` to ``worker`` and commit."""
+    now = _now()
+    due = (
+        select(Job.id)
+        .where(Job.kind == kind, Job.status.in_(("queued", "running")), Job.run_at <= now)
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = db.scalars(
+        update(Job)
+        .where(Job.id.in_(due))
+        .values(status="running", attempts=Job.attempts + 1, locked_by=worker,
+                started_at=now, run_at=now + timedelta(seconds=lease))
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return list(jobs)
+
+
+def _settle(db: Session, job: Job, worker: str, **values: Any) -> bool:
+    """Update ``job`` if ``worker`` still holds its lease."""
+    res = db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == "running", Job.locked_by == worker)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return res.rowcount == 1
+
+
+def run_job(session_factory: Callable[[], Session], job: Job, worker: str) -> str:
+    """Run one claimed job; returns done | retry | failed | lost."""
+    kind = KINDS.get(job.kind)
+    started = time.perf_counter()
+    with session_factory() as db:
+        try:
+            if kind is None:
+                raise PermanentError(f"no handler for {job.kind!r}")
+            if job.attempts > job.max_attempts:
+                # claimed again after its last attempt's lease ran out
+                raise PermanentError("lease expired on the last attempt")
+            kind.fn(db, job)
+            if not _settle(db, job, worker, status="done", finished_at=_now(), last_error=None):
+                db.rollback()
+                outcome = "lost"
+            else:
+                db.commit()
+                outcome = "done"
+        except Exception as exc:
+            db.rollback()
+            error = f"{type(exc).__name__}: {exc}"[:2000]
+            if isinstance(exc, PermanentError) or job.attempts >= job.max_attempts:
+                values: Dict[str, Any] = dict(status="failed", finished_at=_now(), last_error=error)
+                outcome = "failed"
+                logger.error("job %s (%s) failed after %d attempt(s): %s", job.id, job.kind, job.attempts, error)
+            else:
+                delay = backoff(job.attempts)
+                values = dict(status="queued", run_at=_now() + timedelta(seconds=delay),
+                              locked_by=None, last_error=error)
+                outcome = "retry"
+                logger.warning("job %s (%s) attempt %d failed, retry in %.0fs: %s",
+                               job.id, job.kind, job.attempts, delay, error)
+            outcome = outcome if _settle(db, job, worker, **values) else "lost"
+            db.commit()
+    JOBS_PROCESSED.inc((job.kind, outcome))
+    JOB_SECONDS.observe(time.perf_counter() - started, (job.kind,))
+    return outcome
+
+
+class Worker:
+    """Claims due jobs and runs them on a thread pool, within the global
+    ``concurrency`` and each kind's own limit."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        name: Optional[str] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._running: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _free_slots(self, name: str) -> int:
+        with self._lock:
+            free = self.concurrency - sum(self._running.values())
+            return min(free, KINDS[name].concurrency - self._running[name])
+
+    def poll(self) -> List[Job]:
+        """Claim what fits in the free slots (the slots are taken)."""
+        claimed: List[Job] = []
+        with self.session_factory() as db:
+            for name in list(KINDS):
+                n = self._free_slots(name)
+                if n <= 0:
+                    continue
+                jobs = claim(db, self.name, name, n)
+                with self._lock:
+                    self._running[name] += len(jobs)
+                claimed.extend(jobs)
+        return claimed
+
+    def _run(self, job: Job) -> str:
+        try:
+            return run_job(self.session_factory, job, self.name)
+        finally:
+            with self._lock:
+                self._running[job.kind] -= 1
+            self._wake.set()
+
+    def drain(self) -> int:
+        """Run due jobs in this thread until none are left; returns how many ran."""
+        ran = 0
+        while True:
+            jobs = self.poll()
+            if not jobs:
+                return ran
+            for job in jobs:
+                self._run(job)
+            ran += len(jobs)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                jobs = self.poll()
+            except Exception:
+                logger.exception("job worker %s: claim failed", self.name)
+                jobs = []
+            for job in jobs:
+                self._pool.submit(self._run, job)
+            if not jobs:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self) -> None:
+        load_handlers()
+        self._pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self._loop, name=f"job-worker-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info("job worker %s started: concurrency %d, kinds %s", self.name, self.concurrency, sorted(KINDS))
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop claiming and wait for running jobs; unfinished ones are
+        picked up again when their lease ends."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+# ---------- dashboard ----------
+
+@dataclass
+class KindStats:
+    kind: str
+    queued: int = 0
+    due: int = 0
+    running: int = 0
+    failed: int = 0
+    # over the stats window (default the last hour)
+    done: int = 0
+    oldest_due_seconds: Optional[float] = None
+    wait_p50_seconds: Optional[float] = None
+    wait_p95_seconds: Optional[float] = None
+    run_p50_seconds: Optional[float] = None
+    run_p95_seconds: Optional[float] = None
+
+
+def _pick(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+def stats(db: Session, window: timedelta = timedelta(hours=1), now: Optional[datetime] = None) -> List[KindStats]:
+    """Queue depth and latency per kind.  Wait is enqueue to (last) start, so
+    it includes retry backoff; run is start to finish."""
+    now = now or _now()
+    out: Dict[str, KindStats] = {}
+
+    def row(kind: str) -> KindStats:
+        return out.setdefault(kind, KindStats(kind))
+
+    for kind, status, n in db.execute(
+        select(Job.kind, Job.status, func.count()).where(Job.status != "done").group_by(Job.kind, Job.status)
+    ):
+        setattr(row(kind), status, n)
+    for kind, n, oldest in db.execute(
+        select(Job.kind, func.count(), func.min(Job.run_at))
+        .where(Job.status == "queued", Job.run_at <= now)
+        .group_by(Job.kind)
+    ):
+        row(kind).due = n
+        row(kind).oldest_due_seconds = round((now - as_utc(oldest)).total_seconds(), 3)
+
+    waits: Dict[str, List[float]] = defaultdict(list)
+    runs: Dict[str, List[float]] = defaultdict(list)
+    for kind, created, started, finished in db.execute(
+        select(Job.kind, Job.created_at, Job.started_at, Job.finished_at)
+        .where(Job.status == "done", Job.finished_at >= now - window)
+        .order_by(Job.finished_at.desc())
+        .limit(STATS_SAMPLE)
+    ):
+        row(kind).done += 1
+        waits[kind].append((as_utc(started) - as_utc(created)).total_seconds())
+        runs[kind].append((as_utc(finished) - as_utc(started)).total_seconds())
+    for kind, s in out.items():
+        w, r = sorted(waits[kind]), sorted(runs[kind])
+        s.wait_p50_seconds, s.wait_p95_seconds = _pick(w, 0.5), _pick(w, 0.95)
+        s.run_p50_seconds, s.run_p95_seconds = _pick(r, 0.5), _pick(r, 0.95)
+    return sorted(out.values(), key=lambda s: s.kind)
+
+
+def recent_failures(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    rows = db.execute(
+        select(Job.id, Job.kind, Job.attempts, Job.finished_at, Job.last_error)
+        .where(Job.status == "failed")
+        .order_by(Job.finished_at.desc())
+        .limit(limit)
+    )
+    return [dict(r._mapping) for r in rows]
+
+
+def prune(db: Session, older_than: timedelta) -> int:
+    """Delete finished jobs older than ``older_than`` (their idempotency keys
+    become free again); the caller commits."""
+    res = db.execute(delete(Job).where(Job.status.in_(("done", "failed")), Job.finished_at < _now() - older_than))
+    return res.rowcount or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Background job worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+    work = sub.add_parser("work", help="run jobs until interrupted")
+    work.add_argument("--concurrency", type=int, default=4)
+    work.add_argument("--poll", type=float, default=1.0, help="seconds between polls when idle")
+    work.add_argument("--once", action="store_true", help="run what is due, then exit")
+    sub.add_parser("stats", help="queue depth and latency per kind")
+    pr = sub.add_parser("prune", help="delete finished jobs")
+    pr.add_argument("--days", type=float, default=7.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from backend.database import SessionLocal
+
+    if args.command == "stats":
+        with SessionLocal() as db:
+            print(json.dumps([asdict(s) for s in stats(db)], indent=2))
+    elif args.command == "prune":
+        with SessionLocal() as db:
+            n = prune(db, timedelta(days=args.days))
+            db.commit()
+        print(f"deleted {n} finished jobs")
+    else:
+        load_handlers()
+        worker = Worker(SessionLocal, concurrency=args.concurrency, poll_interval=args.poll)
+        if args.once:
+            print(f"ran {worker.drain()} jobs")
+            return
+        worker.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Monthly range partitions for ``event`` (by ``start_time``) and ``participant``
+(by ``confirmed_at``) on PostgreSQL.
+
+The tables are converted by the ``pg_monthly_partitions`` migration; this
+module keeps them healthy afterwards:
+
+* ``ensure_partitions`` creates the partitions for the current month and the
+  next ``months_ahead``, so inserts never land in the ``_default`` catch-all.
+  Rows that already sit in the default partition for a new month are moved
+  into it first (PostgreSQL refuses to attach a range the default overlaps).
+* ``apply_retention`` detaches partitions that ended more than ``keep_months``
+  ago and moves them to the ``archive`` schema (or drops them): a catalog
+  change per month instead of a DELETE over millions of rows.  Detaching
+  fires no row triggers, so their rows are taken out of ``event_summary``
+  explicitly (``_release_summaries``); ``python -m backend.services.summary``
+  stays clean after a retention run.  The removals are appended to
+  ``event_change`` as well (``_record_changes``), so delta sync reports them
+  and the listing ETags move on.
+
+Run from cron / boot (``scripts/start.sh`` calls ``ensure``)::
+
+    python -m backend.services.partitions ensure --months-ahead 3
+    python -m backend.services.partitions retain --keep-months 24 [--drop]
+    python -m backend.services.partitions list
+
+On other databases (SQLite in development and tests) every command is a no-op.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# table -> partition key; databases built from the PostgreSQL baseline call the
+# physical event table "events", so both names are checked
+PARTITIONED: Dict[str, str] = {"event": "start_time", "events": "start_time", "participant": "confirmed_at"}
+# column naming the event a row counts towards in event_summary / event_change
+SUMMARY_EVENT_ID: Dict[str, str] = {"event": "id", "events": "id", "participant": "event_id"}
+# event_change op for the events a detached partition takes rows from
+CHANGE_OP: Dict[str, str] = {"event": "delete", "events": "delete", "participant": "update"}
+ARCHIVE_SCHEMA = "archive"
+DEFAULT_MONTHS_AHEAD = 3
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def month_start(when: datetime) -> datetime:
+    when = when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+    return when.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def parse_bound(bound: str) -> Optional[tuple]:
+    """``FOR VALUES FROM ('2025-01-01 00:00:00+00') TO (...)`` -> (lower, upper);
+    None for the DEFAULT partition."""
+    m = _BOUND.search(bound)
+    if not m:
+        return None
+    return tuple(datetime.fromisoformat(v).astimezone(timezone.utc) for v in m.groups())
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    kind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}
+    ).scalar()
+    return kind == "p"
+
+
+def _exists(conn: Connection, table: str) -> bool:
+    return bool(conn.execute(text("SELECT to_regclass(:t) IS NOT NULL"), {"t": table}).scalar())
+
+
+def list_partitions(conn: Connection, table: str) -> List[Partition]:
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:t) ORDER BY 1"
+    ), {"t": table})
+    out = []
+    for name, bound in rows:
+        bounds = parse_bound(bound)
+        if bounds:
+            out.append(Partition(name, *bounds))
+    return sorted(out, key=lambda p: p.lower)
+
+
+def _create_month(conn: Connection, table: str, key: str, month: datetime) -> None:
+    name = partition_name(table, month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FROM ('{lower}') TO ('{upper}')"
+    default = f"{table}_default"
+    stray = _exists(conn, default) and conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {key} >= :lo AND {key} < :hi)"
+    ), {"lo": lower, "hi": upper}).scalar()
+    if not stray:
+        conn.exec_driver_sql(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+        return
+    # move the month's rows out of the default partition, then attach
+    conn.exec_driver_sql(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE {key} >= :lo AND {key} < :hi RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), {"lo": lower, "hi": upper})
+    affected = conn.exec_driver_sql(f"SELECT DISTINCT {SUMMARY_EVENT_ID[table]} FROM {name}").scalars().all()
+    conn.exec_driver_sql(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    # the DELETE fired the summary triggers but the INSERT into the
+    # not-yet-attached table did not; recount what moved
+    if affected and _exists(conn, "event_summary"):
+        from backend.services.summary import rebuild
+
+        rebuild(conn, affected)
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = DEFAULT_MONTHS_AHEAD,
+                      now: Optional[datetime] = None) -> List[str]:
+    """Create missing partitions from this month through ``months_ahead``."""
+    created: List[str] = []
+    first = month_start(now or datetime.now(timezone.utc))
+    for table, key in PARTITIONED.items():
+        if not is_partitioned(conn, table):
+            continue
+        have = {p.lower for p in list_partitions(conn, table)}
+        for i in range(months_ahead + 1):
+            month = add_months(first, i)
+            if month not in have:
+                _create_month(conn, table, key, month)
+                created.append(partition_name(table, month))
+    return created
+
+
+def _release_summaries(conn: Connection, table: str, partition: str) -> None:
+    """Do for a detached ``partition`` what the DELETE triggers would have:
+    drop the summaries of its events, or subtract its confirmations."""
+    key = SUMMARY_EVENT_ID[table]
+    if table == "participant":
+        conn.exec_driver_sql(
+            "UPDATE event_summary SET confirmations = event_summary.confirmations - gone.n "
+            f"FROM (SELECT {key} AS event_id, count(*) AS n FROM {partition} GROUP BY {key}) AS gone "
+            "WHERE event_summary.event_id = gone.event_id"
+        )
+    else:
+        conn.exec_driver_sql(f"DELETE FROM event_summary WHERE event_id IN (SELECT {key} FROM {partition})")
+
+
+def _record_changes(conn: Connection, table: str, partition: str) -> None:
+    """Log what record_change would have for a detached ``partition``: its
+    events are deleted, or lost confirmations."""
+    key = SUMMARY_EVENT_ID[table]
+    conn.exec_driver_sql(
+        "INSERT INTO event_change (event_id, op, changed_at) "
+        f"SELECT DISTINCT {key}, '{CHANGE_OP[table]}', CURRENT_TIMESTAMP FROM {partition}"
+    )
+
+
+def apply_retention(conn: Connection, keep_months: int, drop: bool = False,
+                    now: Optional[datetime] = None) -> List[str]:
+    """Detach partitions whose whole range is older than ``keep_months``;
+    archive them (``ARCHIVE_SCHEMA``) or drop them."""
+    if keep_months < 1:
+        raise ValueError("keep_months must be at least 1")
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -keep_months)
+    removed: List[str] = []
+    summaries: Optional[bool] = None
+    changes: Optional[bool] = None
+    for table in PARTITIONED:
+        if not is_partitioned(conn, table):
+            continue
+        if summaries is None:
+            summaries = _exists(conn, "event_summary")
+            changes = _exists(conn, "event_change")
+        for part in list_partitions(conn, table):
+            if part.upper > cutoff:
+                break
+            conn.exec_driver_sql(f"ALTER TABLE {table} DETACH PARTITION {part.name}")
+            if summaries:
+                _release_summaries(conn, table, part.name)
+            if changes:
+                _record_changes(conn, table, part.name)
+            if drop:
+                conn.exec_driver_sql(f"DROP TABLE {part.name}")
+            else:
+                conn.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+                conn.exec_driver_sql(f"ALTER TABLE {part.name} SET SCHEMA {ARCHIVE_SCHEMA}")
+            removed.append(part.name)
+    return removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly event/participant partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ensure = sub.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    retain = sub.add_parser("retain", help="detach and archive (or drop) old partitions")
+    retain.add_argument("--keep-months", type=int, required=True)
+    retain.add_argument("--drop", action="store_true", help="drop instead of moving to the archive schema")
+    sub.add_parser("list", help="show partitions and their ranges")
+    args = parser.parse_args()
+
+    from backend.database import get_engine
+
+    with get_engine().begin() as conn:
+        if not any(is_partitioned(conn, t) for t in PARTITIONED):
+            print("no partitioned tables (not PostgreSQL, or migration not applied); nothing to do")
+            return
+        if args.command == "ensure":
+            created = ensure_partitions(conn, args.months_ahead)
+            print(f"created {len(created)} partitions: {', '.join(created) or '-'}")
+        elif args.command == "retain":
+            removed = apply_retention(conn, args.keep_months, drop=args.drop)
+            action = "dropped" if args.drop else f"archived to {ARCHIVE_SCHEMA}"
+            print(f"{action} {len(removed)} partitions: {', '.join(removed) or '-'}")
+        else:
+            for table in PARTITIONED:
+                for part in list_partitions(conn, table):
+                    print(f"{part.name:28} {part.lower:%Y-%m-%d} .. {part.upper:%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    main()
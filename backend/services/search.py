@@ -0,0 +1,188 @@
+"""
+Event search for ``GET /events/search``: partial matches on title, address
+and description, in any script (Hebrew included), ranked and highlighted.
+
+* PostgreSQL: a pg_trgm GIN index over ``search_document()``, i.e.
+  ``title || ' ' || address || ' ' || description`` (the ``pg_event_search``
+  migration).  Every query term must occur in that document (``ILIKE
+  '%term%'``, answered from the index); hits are ranked by ``word_similarity``
+  weighted title > address > description.
+* SQLite: an FTS5 table with the trigram tokenizer, kept in sync by triggers
+  (both declared with the model); ranked by the columns each word is found
+  in, with the same weights.
+
+Only the newest ``CANDIDATES`` matches in the window are ranked (by start
+time on PostgreSQL, by id - i.e. reporting order - on SQLite), so a word
+found in half the table costs about what a rare one does; older hits of a
+common word need more words or a narrower window.  This is what keeps a query
+well under 50 ms over a million historical events.
+
+Trigram indexes cannot serve terms shorter than three characters, so those
+are dropped from multi-word queries and a query without any longer term is
+rejected.  Highlighting is done here on the returned page only, with the text
+HTML-escaped first so ``<mark>`` is the only markup in the result.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from sqlalchemy import ColumnElement, Engine, case, column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from backend.models.event import SQLITE_SEARCH, Event, search_document
+
+MIN_TERM = 3
+MAX_TERMS = 8
+SNIPPET_CHARS = 80
+# matches ranked per query: the newest ones in the window
+CANDIDATES = 1000
+# a match in the title counts most, then the address, then the description
+WEIGHTS = {"title": 3, "address": 2, "description": 1}
+
+_fts_ready: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+_fts = table("event_fts", column("rowid"))
+_fts_ref = literal_column("event_fts")
+
+
+class QueryTooShort(ValueError):
+    pass
+
+
+@dataclass
+class Hit:
+    event: Event
+    rank: float
+    highlights: Dict[str, str] = field(default_factory=dict)
+
+
+def terms_of(q: str) -> List[str]:
+    terms = list(dict.fromkeys(t for t in q.split() if len(t) >= MIN_TERM))[:MAX_TERMS]
+    if not terms:
+        raise QueryTooShort(f"search needs a term of at least {MIN_TERM} characters")
+    return terms
+
+
+def ensure_sqlite_index(engine: Engine) -> None:
+    """Create the FTS5 table and triggers if missing and index existing rows
+    (databases created before search existed; create_all makes them).
+
+    Runs on its own connection, not the caller's session: a commit there
+    would count as the reader's write and pin them to the primary.
+    """
+    if engine in _fts_ready:
+        return
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'event_fts'").first()
+        if not exists:
+            for ddl in SQLITE_SEARCH:
+                conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql("INSERT INTO event_fts (event_fts) VALUES ('rebuild')")
+    _fts_ready.add(engine)
+
+
+def _like(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _pg_query(terms: List[str], q: str, window):
+    doc = search_document()
+    newest = (
+        select(Event.id, Event.start_time)
+        .where(*[doc.ilike(_like(t), escape="\\") for t in terms], *window)
+        .order_by(Event.start_time.desc())
+        .limit(CANDIDATES)
+        .subquery("newest")
+    )
+    rank = sum(w * func.word_similarity(q, getattr(Event, col)) for col, w in WEIGHTS.items())
+    return (
+        select(Event, rank.label("rank"))
+        # start_time too, so a partitioned event is probed in one partition
+        .join(newest, (newest.c.id == Event.id) & (newest.c.start_time == Event.start_time))
+        .order_by(rank.desc(), Event.start_time.desc())
+    )
+
+
+def _sqlite_query(terms: List[str], window):
+    # each term quoted: a phrase (substring, with trigrams) rather than FTS syntax
+    match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+    # FTS5 yields rowids newest first and stops after CANDIDATES
+    newest = (
+        select(Event.id)
+        .join(_fts, _fts.c.rowid == Event.id)
+        .where(_fts_ref.op("MATCH")(match), *window)
+        .order_by(_fts.c.rowid.desc())
+        .limit(CANDIDATES)
+        .subquery("newest")
+    )
+    # not bm25(): its per-phrase document counts walk every match in the
+    # table, which is most of the time for a common word
+    rank = sum(
+        w * case((func.instr(func.lower(getattr(Event, col)), t.lower()) > 0, 1), else_=0)
+        for t in terms
+        for col, w in WEIGHTS.items()
+    )
+    return (
+        select(Event, rank.label("rank"))
+        .join(newest, newest.c.id == Event.id)
+        .order_by(rank.desc(), Event.start_time.desc())
+    )
+
+
+def statement(dialect: str, q: str, *window: ColumnElement[bool]):
+    """(Event, rank) rows matching ``q`` and ``window``, best first."""
+    terms = terms_of(q)
+    return _sqlite_query(terms, window) if dialect == "sqlite" else _pg_query(terms, q, window)
+
+
+def search(db: Session, q: str, *window: ColumnElement[bool], limit: int = 20) -> List[Hit]:
+    """Ranked hits for ``q`` among the events matching ``window`` (conditions
+    on Event, e.g. the listings' start/end time bounds)."""
+    terms = terms_of(q)
+    engine = db.get_bind()
+    if engine.dialect.name == "sqlite":
+        ensure_sqlite_index(engine)
+    rows = db.execute(statement(engine.dialect.name, q, *window).limit(limit)).all()
+    pattern = _pattern(terms)
+    return [
+        Hit(ev, float(rank), {
+            "title": highlight(ev.title, pattern),
+            "address": highlight(ev.address, pattern),
+            "description": snippet(ev.description, pattern),
+        })
+        for ev, rank in rows
+    ]
+
+
+# ---------- highlighting ----------
+
+def _pattern(terms: List[str]) -> "re.Pattern[str]":
+    # longest first so overlapping terms mark the longer span
+    return re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+
+
+def highlight(text: str, pattern: "re.Pattern[str]") -> str:
+    out, pos = [], 0
+    for m in pattern.finditer(text):
+        out.append(html.escape(text[pos:m.start()]))
+        out.append(f"<mark>{html.escape(m.group())}</mark>")
+        pos = m.end()
+    out.append(html.escape(text[pos:]))
+    return "".join(out)
+
+
+def snippet(text: str, pattern: "re.Pattern[str]", width: int = SNIPPET_CHARS) -> str:
+    """About ``width`` characters around the first match, highlighted."""
+    m = pattern.search(text)
+    if len(text) <= width:
+        return highlight(text, pattern)
+    start = max(0, (m.start() if m else 0) - width // 3)
+    end = min(len(text), start + width)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    return prefix + highlight(text[start:end], pattern) + suffix
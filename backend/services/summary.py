@@ -0,0 +1,138 @@
+"""
+Per-event confirmation summary (``event_summary``) and its consistency check.
+
+The table is written only by database triggers (see ``models/event.py``);
+this module reads it for listings and reports, and compares it with the base
+tables.  Drift means a trigger was missing or disabled (e.g. rows copied in
+with ``session_replication_role = replica``)::
+
+    python -m backend.services.summary            # report drift, exit 1 if any
+    python -m backend.services.summary --repair   # rebuild the drifted rows
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from backend.models.event import Event, EventSummary, Participant
+
+
+@dataclass
+class Drift:
+    event_id: int
+    problem: str  # missing | orphan | confirmations | required_attendees
+    stored: Optional[int] = None
+    actual: Optional[int] = None
+
+
+def _actual():
+    """(event_id, confirmations, required_attendees) computed from the base tables."""
+    counts = (
+        select(Participant.event_id, func.count().label("n"))
+        .group_by(Participant.event_id)
+        .subquery()
+    )
+    return (
+        select(Event.id.label("event_id"), func.coalesce(counts.c.n, 0).label("confirmations"), Event.required_attendees)
+        .outerjoin(counts, counts.c.event_id == Event.id)
+        .subquery()
+    )
+
+
+def find_drift(db: Session) -> List[Drift]:
+    actual = _actual()
+    found: List[Drift] = []
+    rows = db.execute(
+        select(actual, EventSummary.confirmations, EventSummary.required_attendees, EventSummary.event_id)
+        .outerjoin(EventSummary, EventSummary.event_id == actual.c.event_id)
+    )
+    for event_id, confirmations, required, stored_conf, stored_req, summary_id in rows:
+        if summary_id is None:
+            found.append(Drift(event_id, "missing"))
+        elif stored_conf != confirmations:
+            found.append(Drift(event_id, "confirmations", stored_conf, confirmations))
+        elif stored_req != required:
+            found.append(Drift(event_id, "required_attendees", stored_req, required))
+    orphans = db.scalars(
+        select(EventSummary.event_id).where(~EventSummary.event_id.in_(select(Event.id)))
+    )
+    found.extend(Drift(event_id, "orphan") for event_id in orphans)
+    return found
+
+
+def rebuild(db: Union[Session, Connection], event_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute summary rows (all, or ``event_ids``) from the base tables;
+    the caller commits."""
+    actual = _actual()
+    source = select(actual.c.event_id, actual.c.confirmations, actual.c.required_attendees)
+    if event_ids is not None:
+        ids = list(event_ids)
+        db.execute(delete(EventSummary).where(EventSummary.event_id.in_(ids)))
+        source = source.where(actual.c.event_id.in_(ids))
+    else:
+        db.execute(delete(EventSummary))
+    res = db.execute(
+        insert(EventSummary).from_select(["event_id", "confirmations", "required_attendees"], source)
+    )
+    return res.rowcount or 0
+
+
+@dataclass
+class Report:
+    events: int
+    open: int
+    filled: int
+    confirmations: int
+    still_needed: int
+
+
+def report(db: Session, now: datetime, earliest_start: datetime) -> Report:
+    """Totals over active events, straight from the summary table."""
+    row = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((EventSummary.status == "open", 1), else_=0)), 0),
+            func.coalesce(func.sum(EventSummary.confirmations), 0),
+            func.coalesce(func.sum(EventSummary.still_needed), 0),
+        )
+        .select_from(EventSummary)
+        .join(Event, Event.id == EventSummary.event_id)
+        .where(Event.end_time >= now, Event.start_time >= earliest_start)
+    ).one()
+    events, open_, confirmations, still_needed = (int(v) for v in row)
+    return Report(events, open_, events - open_, confirmations, still_needed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check event_summary against event/participant")
+    parser.add_argument("--repair", action="store_true", help="rebuild the rows that drifted")
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+
+    with SessionLocal() as db:
+        drift = find_drift(db)
+        for d in drift:
+            detail = f" stored={d.stored} actual={d.actual}" if d.stored is not None else ""
+            print(f"event {d.event_id}: {d.problem}{detail}")
+        if not drift:
+            print("event_summary is consistent")
+            return
+        if args.repair:
+            rebuilt = rebuild(db, {d.event_id for d in drift})
+            db.commit()
+            print(f"rebuilt {rebuilt} summary rows")
+        else:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Responder location trails for after-action review, bounded in memory.
+
+Each responder's trail is a fixed array of ``CAPACITY`` 12-byte records
+(float32 lat/lng, int32 epoch seconds), so it costs ``CAPACITY * 12`` bytes
+however long the responder is tracked.  When the array fills, its older
+half is thinned: Douglas-Peucker within ``TOLERANCE_M`` keeps the shape
+(straight stretches collapse to their ends, turns stay), and if more than a
+quarter of the capacity is still left, the survivors are spread evenly over
+that stretch.  Recent movement stays at full resolution, older movement gets
+coarser with every compaction, and each compaction frees at least a quarter
+of the array.  Points older than the newest one already recorded are
+dropped (late resends).
+
+``TrailStore.flush`` writes every point recorded since the previous flush
+to ``location_trail`` rows, one per responder, delta-coded and
+zlib-compressed (``encode``); points are only stored thinned if a compaction
+got to them first.  Trails flushed in full and idle for ``IDLE_SECONDS`` are
+then dropped from memory (``evict_idle``).  The prototype flushes every
+``TRAIL_FLUSH_SECONDS``; with flushing off it calls
+``evict_idle(unflushed=True)`` on a timer instead, so responders who stopped
+reporting do not stay in memory for good.  Stored trails are read back with
+``history``::
+
+    python -m backend.services.trails show USERNAME [--since ISO] [--until ISO]
+    python -m backend.services.trails prune --days 90
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import struct
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from backend.models.trail import LocationTrail
+
+CAPACITY = 512
+TOLERANCE_M = 15.0
+IDLE_SECONDS = 24 * 3600
+M_PER_DEG = 111_320.0
+
+RECORD = np.dtype([("lat", "<f4"), ("lng", "<f4"), ("t", "<i4")])
+_HEADER = struct.Struct("<BI")  # codec version, point count
+_CODEC = 1
+
+
+# ---------- thinning ----------
+
+def simplify(points: np.ndarray, tolerance_m: float = TOLERANCE_M) -> np.ndarray:
+    """Indices of ``points`` kept by Douglas-Peucker (the ends always are)."""
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+    scale = M_PER_DEG * math.cos(math.radians(float(points["lat"][0])))
+    x = points["lng"].astype(np.float64) * scale
+    y = points["lat"].astype(np.float64) * M_PER_DEG
+    keep = np.zeros(n, bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        dx, dy = x[j] - x[i], y[j] - y[i]
+        px, py = x[i + 1:j] - x[i], y[i + 1:j] - y[i]
+        seg = math.hypot(dx, dy)
+        # distance to the chord (to point i if the ends coincide)
+        d = np.abs(px * dy - py * dx) / seg if seg else np.hypot(px, py)
+        k = int(np.argmax(d))
+        if d[k] > tolerance_m:
+            m = i + 1 + k
+            keep[m] = True
+            stack.append((i, m))
+            stack.append((m, j))
+    return np.flatnonzero(keep)
+
+
+def _spread(indices: np.ndarray, target: int) -> np.ndarray:
+    """``target`` of ``indices``, evenly spaced, first and last included."""
+    if len(indices) <= target:
+        return indices
+    return indices[np.unique(np.linspace(0, len(indices) - 1, target).round().astype(np.intp))]
+
+
+class Trail:
+    __slots__ = ("points", "n", "pending")
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self.points = np.zeros(capacity, RECORD)
+        self.n = 0
+        self.pending = 0  # trailing points not flushed yet
+
+    @property
+    def last_t(self) -> Optional[int]:
+        return int(self.points["t"][self.n - 1]) if self.n else None
+
+    def append(self, lat: float, lng: float, t: int) -> bool:
+        if self.n and t < self.points["t"][self.n - 1]:
+            return False
+        if self.n == len(self.points):
+            self.compact()
+        self.points[self.n] = (lat, lng, t)
+        self.n += 1
+        self.pending += 1
+        return True
+
+    def compact(self) -> None:
+        half = self.n // 2
+        keep = _spread(simplify(self.points[:half]), max(2, len(self.points) // 4))
+        first_pending = self.n - self.pending
+        kept = self.points[keep]
+        rest = self.points[half:self.n].copy()
+        m = len(kept)
+        self.points[:m] = kept
+        self.points[m:m + len(rest)] = rest
+        # pending points in the thinned half that survived, plus the rest
+        pending_kept = m - int(np.searchsorted(keep, first_pending)) if first_pending < half else 0
+        self.pending = pending_kept + min(len(rest), self.pending)
+        self.n = m + len(rest)
+
+    def window(self, since: Optional[int] = None, until: Optional[int] = None) -> np.ndarray:
+        """Copy of the points with ``since <= t <= until``."""
+        t = self.points["t"][:self.n]
+        lo = int(np.searchsorted(t, since, "left")) if since is not None else 0
+        hi = int(np.searchsorted(t, until, "right")) if until is not None else self.n
+        return self.points[lo:hi].copy()
+
+
+# ---------- storage format ----------
+
+def encode(points: np.ndarray) -> bytes:
+    """Columns as int32 (microdegrees, seconds), delta-coded, then zlib."""
+    cols = (
+        np.round(points["lat"].astype(np.float64) * 1e6).astype("<i4"),
+        np.round(points["lng"].astype(np.float64) * 1e6).astype("<i4"),
+        points["t"].astype("<i4"),
+    )
+    body = b"".join(np.diff(c, prepend=np.int32(0)).astype("<i4").tobytes() for c in cols)
+    return _HEADER.pack(_CODEC, len(points)) + zlib.compress(body, 6)
+
+
+def decode(blob: bytes) -> np.ndarray:
+    codec, n = _HEADER.unpack_from(blob)
+    if codec != _CODEC:
+        raise ValueError(f"unknown trail codec {codec}")
+    cols = np.frombuffer(zlib.decompress(blob[_HEADER.size:]), "<i4").reshape(3, n).cumsum(axis=1, dtype=np.int64)
+    out = np.empty(n, RECORD)
+    out["lat"], out["lng"], out["t"] = cols[0] / 1e6, cols[1] / 1e6, cols[2]
+    return out
+
+
+def _at(t: int) -> datetime:
+    return datetime.fromtimestamp(int(t), timezone.utc)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # naive times are UTC, as everywhere in the prototype
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+# ---------- the store ----------
+
+class TrailStore:
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self.capacity = capacity
+        self.trails: Dict[str, Trail] = {}
+        self.lock = threading.Lock()
+
+    def record(self, username: str, lat: float, lng: float, at: float) -> bool:
+        """Append a point; False if it is older than the trail's last one."""
+        with self.lock:
+            trail = self.trails.get(username)
+            if trail is None:
+                trail = self.trails[username] = Trail(self.capacity)
+            return trail.append(lat, lng, int(at))
+
+    def trail(self, username: str, since: Optional[float] = None, until: Optional[float] = None) -> Optional[np.ndarray]:
+        with self.lock:
+            trail = self.trails.get(username)
+            if trail is None:
+                return None
+            return trail.window(None if since is None else math.ceil(since), None if until is None else int(until))
+
+    def nbytes(self) -> int:
+        with self.lock:
+            return sum(t.points.nbytes for t in self.trails.values())
+
+    def flush(self, session_factory: Callable[[], Session], now: Optional[float] = None) -> int:
+        """Store what was recorded since the last flush; returns points written.
+
+        The database write happens outside the lock; if it fails, the points
+        stay pending for the next flush.
+        """
+        with self.lock:
+            batch: List[Tuple[str, np.ndarray]] = []
+            for name, trail in self.trails.items():
+                if trail.pending:
+                    batch.append((name, trail.points[trail.n - trail.pending:trail.n].copy()))
+                    trail.pending = 0
+        try:
+            if batch:
+                with session_factory() as db:
+                    db.add_all([
+                        LocationTrail(username=name, start_at=_at(pts["t"][0]), end_at=_at(pts["t"][-1]),
+                                      points=len(pts), data=encode(pts))
+                        for name, pts in batch
+                    ])
+                    db.commit()
+        except Exception:
+            with self.lock:
+                for name, pts in batch:
+                    trail = self.trails.get(name)
+                    if trail is not None:
+                        trail.pending = min(trail.n, trail.pending + len(pts))
+            raise
+        self.evict_idle(now)
+        return sum(len(pts) for _, pts in batch)
+
+    def evict_idle(self, now: Optional[float] = None, unflushed: bool = False) -> int:
+        """Drop trails with no point for ``IDLE_SECONDS``; returns how many.
+
+        Trails with points not flushed yet are kept unless ``unflushed`` (for
+        a store that is never flushed, where they would otherwise stay forever).
+        """
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        with self.lock:
+            idle = [name for name, t in self.trails.items()
+                    if (unflushed or not t.pending) and (t.last_t is None or now - t.last_t > IDLE_SECONDS)]
+            for name in idle:
+                del self.trails[name]
+        return len(idle)
+
+
+def history(db: Session, username: str, since: Optional[datetime] = None,
+            until: Optional[datetime] = None) -> np.ndarray:
+    """Stored points of ``username`` with ``since <= time <= until``, oldest first."""
+    since, until = _utc(since), _utc(until)
+    stmt = select(LocationTrail.data).where(LocationTrail.username == username).order_by(LocationTrail.start_at, LocationTrail.id)
+    if since is not None:
+        stmt = stmt.where(LocationTrail.end_at >= since)
+    if until is not None:
+        stmt = stmt.where(LocationTrail.start_at <= until)
+    chunks = [decode(blob) for blob in db.scalars(stmt)]
+    points = np.concatenate(chunks) if chunks else np.empty(0, RECORD)
+    t = points["t"]
+    mask = np.ones(len(points), bool)
+    if since is not None:
+        mask &= t >= since.timestamp()
+    if until is not None:
+        mask &= t <= until.timestamp()
+    return points[mask]
+
+
+def prune(db: Session, older_than: datetime) -> int:
+    res = db.execute(delete(LocationTrail).where(LocationTrail.end_at < older_than))
+    db.commit()
+    return res.rowcount or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stored responder location trails")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="print a responder's stored trail as JSON lines")
+    show.add_argument("username")
+    show.add_argument("--since", type=datetime.fromisoformat)
+    show.add_argument("--until", type=datetime.fromisoformat)
+    p = sub.add_parser("prune", help="delete chunks that ended more than --days ago")
+    p.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    from backend.database import SessionLocal
+
+    with SessionLocal() as db:
+        if args.command == "show":
+            for lat, lng, t in history(db, args.username, args.since, args.until).tolist():
+                print(json.dumps({"lat": round(lat, 5), "lng": round(lng, 5), "timestamp": _at(t).isoformat()}))
+        else:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+            print(f"pruned {prune(db, cutoff)} trail chunks older than {cutoff.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
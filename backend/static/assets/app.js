@@ -29,21 +29,32 @@ window.addEventListener('hashchange', router);
 window.addEventListener('load', () => {
   router();
   // WebSocket notifications -> Browser Notification API
-  let ws = new WebSocket((location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + '/ws/events');
-  ws.onmessage = (ev) => {
-    try {
-      const d = JSON.parse(ev.data);
-      if (d.type === 'attendance_confirmed') {
-        if (Notification && Notification.permission !== 'denied') {
-          Notification.requestPermission().then(() => {
-            new Notification('אישור הגעה חדש', { body: `${d.display_name} אישר הגעה לאירוע ${d.event_id}` });
-          });
-        } else {
-          console.log('New attendance:', d);
+  // Reconnects resume from the last seen seq; the server replays what we missed
+  // or sends a snapshot, in which case the current view is simply re-rendered.
+  let epoch = null, lastSeq = null;
+  const connect = () => {
+    const resume = epoch ? `?epoch=${epoch}&last_seq=${lastSeq}` : '';
+    let ws = new WebSocket((location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + '/ws/events' + resume);
+    ws.onclose = () => setTimeout(connect, 2000);
+    ws.onmessage = (ev) => {
+      try {
+        const d = JSON.parse(ev.data);
+        if (d.type === 'hello') { if (d.epoch !== epoch) { epoch = d.epoch; lastSeq = d.seq; } return; }
+        if (d.seq) lastSeq = d.seq;
+        if (d.type === 'snapshot') { router(); return; }
+        if (d.type === 'attendance_confirmed') {
+          if (Notification && Notification.permission !== 'denied') {
+            Notification.requestPermission().then(() => {
+              new Notification('אישור הגעה חדש', { body: `${d.display_name} אישר הגעה לאירוע ${d.event_id}` });
+            });
+          } else {
+            console.log('New attendance:', d);
+          }
         }
-      }
-    } catch(e){ console.log(e); }
+      } catch(e){ console.log(e); }
+    };
   };
+  connect();
 });
 
 function card(title, bodyEl){
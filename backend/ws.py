@@ -1,32 +1,350 @@
-from typing import Set
+"""
+WebSocket fan-out with sequence numbers and resume-after-reconnect.
+
+Every published message gets a per-topic ``seq`` and is kept (already
+encoded) in a bounded ring buffer.  On connect the server sends
+``{"type": "hello", "epoch": ..., "seq": ...}``; a reconnecting client passes
+the ``epoch`` and ``last_seq`` it saw and receives only the messages it
+missed.  If the gap is larger than the buffer, or the server restarted (new
+epoch), it gets a single ``{"type": "snapshot", ...}`` built by the topic's
+snapshot provider instead.
+
+Wire formats are negotiated per connection (``Sec-WebSocket-Protocol:
+zufar.msgpack`` or ``?format=msgpack``):
+
+* ``json``    - text frames, full keys (the default, what browsers get)
+* ``msgpack`` - binary MessagePack frames with short keys and numeric
+  message types; the ``hello`` frame keeps long keys and carries the
+  ``keys``/``types`` tables needed to expand everything after it
+
+Each published message is encoded at most once per format and the same
+frame object goes to every subscriber and into the replay buffer.
+
+Sync code (route handlers in the threadpool, background jobs) publishes with
+``hub.publish_nowait``: the message is handed to a queue owned by the event
+loop and sent by a dispatcher task there, so the caller never waits for a
+socket.  The queue is bounded; when it is full the message still gets its
+``seq`` and a place in the replay buffer but is not pushed live, and clients
+recover it through the usual resume on the ``seq`` gap.  Each socket send is
+capped at ``WS_SEND_TIMEOUT`` seconds; a socket that cannot keep up is
+dropped and closed with 1013 (try again later), so its client reconnects and
+resumes instead of stalling everyone -- or waiting on a socket that may carry
+half a frame.
+Per-message compression is left to the transport: uvicorn's websockets
+implementation negotiates permessage-deflate with clients that offer it.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
 from fastapi import WebSocket
-from asyncio import Lock
 
-connections: Set[WebSocket] = set()
-_lock = Lock()
+from .core.metrics import REGISTRY
+from .core.responses import dumps
+
+try:  # optional; without it clients asking for msgpack get json
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+REPLAY_BUFFER = int(os.getenv("WS_REPLAY_BUFFER", "1000"))
+PUBLISH_QUEUE = int(os.getenv("WS_PUBLISH_QUEUE", "10000"))
+SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+CLOSE_TIMEOUT = 1.0
+DEFAULT_TOPIC = "events"
+
+logger = logging.getLogger("app.ws")
+
+PUBLISH_LATENCY = REGISTRY.histogram(
+    "ws_publish_latency_seconds", "From publish_nowait until every socket was sent the message", ("topic",))
+PUBLISH_OVERFLOW = REGISTRY.counter(
+    "ws_publish_overflow_total", "Messages only buffered for resume because the publish queue was full", ("topic",))
+SEND_DROPPED = REGISTRY.counter(
+    "ws_send_dropped_total", "Subscribers dropped after a failed or timed-out send", ("topic",))
+
+# ---------- wire formats ----------
+
+SUBPROTOCOLS = {"zufar.json": "json", "zufar.msgpack": "msgpack"}
+FORMATS = ("json", "msgpack") if msgpack is not None else ("json",)
+
+# long -> short field names for msgpack frames; unknown keys pass unchanged
+SHORT_KEYS = {
+    "type": "t", "seq": "s", "data": "d", "id": "i", "title": "ti", "severity": "sv",
+    "datetime": "dt", "status": "st", "people_required": "pr", "people_count": "pc",
+    "casualties_count": "cc", "confirmed_by": "cb", "confirmed_at": "ca", "username": "u",
+    "lat": "la", "lng": "lo", "timestamp": "ts", "event_id": "e", "events": "ev", "locations": "lc",
+}
+MESSAGE_TYPES = {
+    "hello": 0, "snapshot": 1, "new_event": 2, "event_update": 3, "event_confirmed": 4,
+    "location_update": 5, "participant_status": 6, "dispatch_offer": 7,
+}
+# values keyed by data (e.g. locations by username) keep their keys
+_OPAQUE = {"locations"}
+
+Payload = Union[str, bytes]
+
+
+def _shorten(value: Any) -> Any:
+    # hot path for location streams: only recurse into containers
+    kind = type(value)
+    if kind is dict:
+        out = {}
+        for k, v in value.items():
+            vk = type(v)
+            out[SHORT_KEYS.get(k, k)] = _shorten(v) if (vk is dict or vk is list or vk is tuple) and k not in _OPAQUE else v
+        return out
+    if kind is list or kind is tuple:
+        return [_shorten(v) for v in value]
+    return value
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"cannot serialize {type(value).__name__}")
+
+
+def encode(message: Dict[str, Any], fmt: str) -> Payload:
+    if fmt == "msgpack":
+        compact = _shorten(message)
+        if "type" in message:
+            compact["t"] = MESSAGE_TYPES.get(message["type"], message["type"])
+        return msgpack.packb(compact, default=_msgpack_default)
+    return dumps(message).decode("utf-8")
+
+
+def hello_frame(message: Dict[str, Any], fmt: str) -> Payload:
+    if fmt == "msgpack":
+        # types as a list indexed by code (integer map keys trip strict decoders)
+        tables = {"keys": {v: k for k, v in SHORT_KEYS.items()}, "types": sorted(MESSAGE_TYPES, key=MESSAGE_TYPES.get)}
+        return msgpack.packb({**message, "format": fmt, **tables}, default=_msgpack_default)
+    return dumps({**message, "format": fmt}).decode("utf-8")
+
+
+def negotiate_format(ws: WebSocket, requested: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """(format, subprotocol to accept) from the query value or offered subprotocols."""
+    for offered in ws.scope.get("subprotocols", []):
+        fmt = SUBPROTOCOLS.get(offered)
+        if fmt in FORMATS:
+            return fmt, offered
+    return (requested if requested in FORMATS else "json"), None
+
+
+class Frame:
+    """One published message, encoded lazily and at most once per format."""
+
+    __slots__ = ("seq", "message", "_encoded")
+
+    def __init__(self, seq: int, message: Dict[str, Any]) -> None:
+        self.seq = seq
+        self.message = message
+        self._encoded: Dict[str, Payload] = {}
+
+    def encoded(self, fmt: str) -> Payload:
+        payload = self._encoded.get(fmt)
+        if payload is None:
+            payload = self._encoded[fmt] = encode(self.message, fmt)
+        return payload
 
-async def register(ws: WebSocket):
-    await ws.accept()
-    async with _lock:
-        connections.add(ws)
+
+class Topic:
+    def __init__(self, name: str, buffer_size: int):
+        self.name = name
+        self.seq = 0
+        self.buffer: Deque[Frame] = deque(maxlen=buffer_size)
+        self.subscribers: Dict[WebSocket, str] = {}  # socket -> wire format
+        self.snapshot: Optional[Callable[[], Any]] = None
+        # serialises publish vs. subscribe so a resuming client never sees
+        # live messages interleaved with (or ahead of) its replay
+        self.lock = asyncio.Lock()
+
+    def record(self, message: Dict[str, Any]) -> Frame:
+        """Stamp ``message`` with the next seq and keep it for resume."""
+        self.seq += 1
+        frame = Frame(self.seq, {"seq": self.seq, **message})
+        self.buffer.append(frame)
+        return frame
+
+    def missed_since(self, last_seq: int) -> Optional[list]:
+        """Frames after ``last_seq``, or None if they were evicted."""
+        if last_seq > self.seq:
+            return None
+        if last_seq == self.seq:
+            return []
+        if not self.buffer or self.buffer[0].seq > last_seq + 1:
+            return None
+        return [frame for frame in self.buffer if frame.seq > last_seq]
+
+
+class Hub:
+    def __init__(self, buffer_size: int = REPLAY_BUFFER, queue_size: int = PUBLISH_QUEUE):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.topics: Dict[str, Topic] = {}
+        # (loop, queue) the dispatcher runs on; set by bind()
+        self._dispatch_to: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = None
+        # publishes while no loop is serving (nobody can be subscribed then)
+        self._offline_lock = threading.Lock()
+        # closes of dropped sockets still in flight (the loop keeps only weak refs)
+        self._closing: set = set()
+
+    def topic(self, name: str = DEFAULT_TOPIC) -> Topic:
+        t = self.topics.get(name)
+        if t is None:
+            t = self.topics[name] = Topic(name, self.buffer_size)
+        return t
+
+    def set_snapshot(self, name: str, provider: Callable[[], Any]) -> None:
+        self.topic(name).snapshot = provider
+
+    async def publish(self, name: str, message: Dict[str, Any]) -> int:
+        t = self.topic(name)
+        async with t.lock:
+            # encoded once per format; the same frame goes to every socket and the buffer
+            frame = t.record(message)
+            subscribers = list(t.subscribers.items())
+            sent = await asyncio.gather(*(_send(ws, frame.encoded(fmt)) for ws, fmt in subscribers))
+            for (ws, _), ok in zip(subscribers, sent):
+                if not ok:
+                    t.subscribers.pop(ws, None)
+                    SEND_DROPPED.inc((name,))
+                    self._drop(ws)
+            return t.seq
+
+    def _drop(self, ws: WebSocket) -> None:
+        # closed off the publish path: a stuck socket may take CLOSE_TIMEOUT
+        task = asyncio.get_running_loop().create_task(_close(ws))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    # ---- non-blocking publishing from any thread ----
+
+    def bind(self) -> None:
+        """Start the dispatcher on the running loop (idempotent).
+
+        Called at startup and by ``subscribe``, so the loop serving the
+        sockets is the one that sends to them.
+        """
+        loop = asyncio.get_running_loop()
+        if self._dispatch_to is not None and self._dispatch_to[0] is loop:
+            return
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._dispatch_to = (loop, queue)
+        loop.create_task(self._dispatch(queue))
+
+    def publish_nowait(self, name: str, message: Dict[str, Any]) -> None:
+        """Publish from any thread without waiting for delivery."""
+        target = self._dispatch_to
+        if target is not None and target[0].is_running():
+            try:
+                target[0].call_soon_threadsafe(self._enqueue, target[1], (name, message, time.perf_counter()))
+                return
+            except RuntimeError:  # the loop closed meanwhile
+                pass
+        # no loop serving sockets, so no subscribers: just keep it for resume
+        with self._offline_lock:
+            self.topic(name).record(message)
+
+    def queued(self) -> int:
+        target = self._dispatch_to
+        return target[1].qsize() if target is not None else 0
+
+    def _enqueue(self, queue: asyncio.Queue, item: Tuple[str, Dict[str, Any], float]) -> None:
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # on the loop thread, so this cannot interleave with a publish's record()
+            self.topic(item[0]).record(item[1])
+            PUBLISH_OVERFLOW.inc((item[0],))
+
+    async def _dispatch(self, queue: asyncio.Queue) -> None:
+        while True:
+            name, message, queued_at = await queue.get()
+            try:
+                await self.publish(name, message)
+            except Exception:
+                logger.exception("ws publish to %s failed", name)
+            PUBLISH_LATENCY.observe(time.perf_counter() - queued_at, (name,))
+
+    async def subscribe(
+        self,
+        ws: WebSocket,
+        name: str = DEFAULT_TOPIC,
+        last_seq: Optional[int] = None,
+        epoch: Optional[str] = None,
+        fmt: str = "json",
+    ) -> None:
+        """Send hello, then the replay or snapshot, then start live delivery."""
+        self.bind()
+        t = self.topic(name)
+        async with t.lock:
+            await _send(ws, hello_frame({"type": "hello", "topic": name, "epoch": self.epoch, "seq": t.seq}, fmt))
+            if last_seq is not None:
+                missed = t.missed_since(last_seq) if epoch in (None, self.epoch) else None
+                if missed is None:
+                    data = t.snapshot() if t.snapshot else None
+                    await _send(ws, encode({"type": "snapshot", "seq": t.seq, "data": data}, fmt))
+                else:
+                    for frame in missed:
+                        await _send(ws, frame.encoded(fmt))
+            t.subscribers[ws] = fmt
+
+    async def unsubscribe(self, ws: WebSocket, name: Optional[str] = None) -> None:
+        for t in ([self.topic(name)] if name else list(self.topics.values())):
+            t.subscribers.pop(ws, None)
+
+
+async def _send(ws: WebSocket, payload: Payload) -> bool:
+    try:
+        if isinstance(payload, bytes):
+            await asyncio.wait_for(ws.send_bytes(payload), SEND_TIMEOUT)
+        else:
+            await asyncio.wait_for(ws.send_text(payload), SEND_TIMEOUT)
+        return True
+    except Exception:
+        return False
+
+
+async def _close(ws: WebSocket) -> None:
+    try:
+        await asyncio.wait_for(ws.close(code=1013), CLOSE_TIMEOUT)
+    except Exception:
+        logger.info("dropped websocket did not close cleanly", exc_info=True)
+
+
+hub = Hub()
+
+REGISTRY.gauge("ws_connections", "Open WebSocket subscriptions", ("topic",)).set_function(
+    lambda: {(name,): len(t.subscribers) for name, t in list(hub.topics.items())})
+REGISTRY.gauge("ws_replay_buffer_messages", "Messages held for resume", ("topic",)).set_function(
+    lambda: {(name,): len(t.buffer) for name, t in list(hub.topics.items())})
+REGISTRY.gauge("ws_publish_queue_depth", "Messages waiting for the ws dispatcher").set_function(
+    lambda: {(): hub.queued()})
+
+# ---- original single-topic helpers, now backed by the hub ----
+
+async def register(ws: WebSocket, last_seq: Optional[int] = None, epoch: Optional[str] = None,
+                   format: Optional[str] = None):
+    fmt, subprotocol = negotiate_format(ws, format)
+    await ws.accept(subprotocol=subprotocol)
+    await hub.subscribe(ws, DEFAULT_TOPIC, last_seq=last_seq, epoch=epoch, fmt=fmt)
 
 async def unregister(ws: WebSocket):
-    async with _lock:
-        if ws in connections:
-            connections.remove(ws)
+    await hub.unsubscribe(ws, DEFAULT_TOPIC)
 
 async def broadcast(payload: dict):
-    dead = []
-    for ws in list(connections):
-        try:
-            await ws.send_json(payload)
-        except Exception:
-            dead.append(ws)
-    for ws in dead:
-        await unregister(ws)
+    await hub.publish(DEFAULT_TOPIC, payload)
 
-# helper for sync contexts (routers) - schedule send later
+# for sync contexts (routers, jobs): returns at once, the dispatcher sends
 def broadcast_event(payload: dict):
-    # Lazy import to avoid circular
-    import anyio
-    anyio.from_thread.run(broadcast, payload)
\ No newline at end of file
+    hub.publish_nowait(DEFAULT_TOPIC, payload)
@@ -0,0 +1,84 @@
+"""
+Cold-start cost of building the API, measured with ``python -X importtime``.
+
+Each run is a fresh interpreter that builds the app and serves one request,
+which is what a Render cold start pays before the first responder gets an
+answer::
+
+    python -m benchmarks.bench_coldstart
+    python -m benchmarks.bench_coldstart --runs 10 --top 25
+    python -m benchmarks.bench_coldstart --stmt "import casualty_management_app"
+
+Prints the median wall time, the total import time and the most expensive
+top-level imports (self + children, as reported by importtime).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+DEFAULT_STMT = (
+    "from fastapi.testclient import TestClient\n"
+    "from backend.app import create_app\n"
+    "TestClient(create_app()).get('/healthz')\n"
+)
+
+
+def _parse(stderr: str) -> Tuple[int, List[Tuple[int, str]]]:
+    """Total microseconds and (cumulative, module) for top-level imports."""
+    total = 0
+    top: List[Tuple[int, str]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, raw_name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        # importtime indents nested imports by two spaces per level
+        if len(raw_name) - len(raw_name.lstrip(" ")) <= 1:
+            top.append((int(cumulative), raw_name.strip()))
+    return total, top
+
+
+def run_once(stmt: str) -> Tuple[float, int, List[Tuple[int, str]]]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", stmt],
+                          capture_output=True, text=True, env=env)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    total, top = _parse(proc.stderr)
+    return wall, total, top
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start import-time benchmark")
+    parser.add_argument("--stmt", default=DEFAULT_STMT, help="python source to run in the fresh interpreter")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    walls, totals = [], []
+    tops: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        wall, total, top = run_once(args.stmt)
+        walls.append(wall)
+        totals.append(total)
+        for cumulative, name in top:
+            tops.setdefault(name, []).append(cumulative)
+
+    print(f"{args.runs} runs | wall p50 {statistics.median(walls) * 1e3:.0f} ms | "
+          f"imports p50 {statistics.median(totals) / 1e3:.0f} ms")
+    ranked = sorted(((statistics.median(v), k) for k, v in tops.items()), reverse=True)[: args.top]
+    for cumulative, name in ranked:
+        print(f"{cumulative / 1e3:9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Bytes on the wire vs. CPU per response for each coding and level.
+
+The payload is a realistic ``GET /events`` body (EventOut rows with
+participants) encoded with the same orjson path the API uses::
+
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --events 2000 --repeat 50
+
+Columns: compressed size, ratio, CPU per response (process time, so it is
+what the worker pays) and transfer time at a 3G-like 750 kbit/s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.core.compression import available, compress
+from backend.core.responses import dumps
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+LINK_BITS_PER_S = 750_000
+
+
+def _payload(n: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": i,
+            "title": f"Event {i}",
+            "description": "Road accident with several casualties, responders requested on site",
+            "address": f"Herzl {i % 200}, Tel Aviv",
+            "country_code": "IL",
+            "start_time": (now + timedelta(minutes=i)).isoformat(),
+            "end_time": (now + timedelta(minutes=i + 120)).isoformat(),
+            "lat": 32.0 + i * 1e-4,
+            "lng": 34.8 + i * 1e-4,
+            "is_locked_for_edit": i % 3 != 0,
+            "participants": [
+                {"id": i * 10 + j, "display_name": f"responder {j}", "confirmed_at": now.isoformat()}
+                for j in range(i % 4)
+            ],
+        })
+    return dumps(rows)
+
+
+def _cpu_per_call(data: bytes, encoding: str, level: int, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        compress(data, encoding, level)
+    return (time.process_time() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response compression benchmark")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = _payload(args.events)
+    wire = lambda size: size * 8 / LINK_BITS_PER_S * 1e3  # noqa: E731
+    print(f"/events body with {args.events} events: {len(data) / 1024:.1f} KiB, "
+          f"{wire(len(data)):.0f} ms at 750 kbit/s uncompressed")
+    print(f"{'coding':>6} {'level':>5} {'bytes':>9} {'ratio':>6} {'cpu/resp':>10} {'3G ms':>7}")
+    for encoding in available():
+        for level in LEVELS[encoding]:
+            size = len(compress(data, encoding, level))
+            cpu = _cpu_per_call(data, encoding, level, args.repeat)
+            print(f"{encoding:>6} {level:>5} {size:>9} {len(data) / size:>6.1f} "
+                  f"{cpu * 1e3:>8.2f}ms {wire(size):>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Search latency (backend/services/search.py) over a large historical table.
+
+Fills the database up to ``--rows`` events (default one million) spread over
+the past years, with Hebrew and English titles and addresses, then times each
+query through ``search()`` directly, so the response cache is not involved::
+
+    python -m benchmarks.bench_search --database-url postgresql+psycopg2://localhost/zufar_bench
+    python -m benchmarks.bench_search --rows 200000     # throwaway SQLite file
+
+The target is p95 under 50 ms per query.  Filling is one-off (rows already
+present count towards ``--rows``); the database should be disposable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from backend.models.base import Base
+import backend.models.user  # noqa: F401 ensure model registration
+from backend.models.event import Event
+from backend.services.search import search
+
+TARGET_MS = 50.0
+BATCH = 10_000
+
+WHAT = ["Flood", "Fire", "Gas leak", "Power outage", "Road accident", "Collapsed wall", "Missing person",
+        "הצפה", "שריפה", "דליפת גז", "הפסקת חשמל", "תאונת דרכים", "קריסת קיר", "נעדר"]
+WHERE = ["basement", "school", "market", "bus station", "parking lot",
+         "מרתף", "בית ספר", "שוק", "תחנה מרכזית", "חניון"]
+STREETS = ["Herzl", "Jaffa", "Allenby", "Ben Yehuda", "Dizengoff", "הרצל", "יפו", "אלנבי", "בן יהודה", "דיזנגוף"]
+CITIES = ["Tel Aviv", "Jerusalem", "Haifa", "Beersheba", "תל אביב", "ירושלים", "חיפה", "באר שבע"]
+DETAILS = ["volunteers needed to help residents", "bring water and blankets", "police on site",
+           "נדרשים מתנדבים לעזרה לתושבים", "להביא מים ושמיכות", "משטרה במקום"]
+
+QUERIES = ["flood", "הצפ", "gas leak", "דליפת", "herzl", "ירושל", "dizengoff market", "שמיכות", "accident haifa",
+           "nothing like this"]
+
+
+def _rows(n: int, now: datetime, rng: random.Random):
+    for _ in range(n):
+        start = now - timedelta(minutes=rng.randrange(60, 60 * 24 * 365 * 3))
+        yield dict(
+            title=f"{rng.choice(WHAT)} {rng.choice(WHERE)}",
+            description=f"{rng.choice(DETAILS)}; {rng.choice(DETAILS)}",
+            address=f"{rng.choice(STREETS)} {rng.randrange(1, 200)}, {rng.choice(CITIES)}",
+            lat=31 + rng.random(), lng=34.5 + rng.random(),
+            start_time=start, end_time=start + timedelta(hours=rng.randrange(1, 12)),
+        )
+
+
+def fill(engine, rows: int) -> int:
+    with Session(engine) as db:
+        have = db.scalar(select(func.count()).select_from(Event))
+    missing = max(0, rows - have)
+    rng, now = random.Random(42), datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        batch = []
+        for row in _rows(missing, now, rng):
+            batch.append(row)
+            if len(batch) == BATCH:
+                conn.execute(insert(Event), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Event), batch)
+    return missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event search latency benchmark")
+    parser.add_argument("--database-url", default="sqlite:///./bench_search.db")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20, help="runs per query")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    added = fill(engine, args.rows)
+    if added:
+        print(f"added {added} events in {time.perf_counter() - started:.1f}s")
+
+    now = datetime.now(timezone.utc)
+    window = (Event.end_time < now, Event.start_time < now)  # ?when=historical
+    print(f"{engine.dialect.name}, {args.rows} events, {args.iterations} runs per query")
+    worst = 0.0
+    with Session(engine) as db:
+        search(db, "warm up", *window)
+        for q in QUERIES:
+            samples = []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                hits = search(db, q, *window)
+                samples.append((time.perf_counter() - start) * 1e3)
+            samples.sort()
+            p95 = samples[int(0.95 * (len(samples) - 1))]
+            worst = max(worst, p95)
+            print(f"{q:>20}: p50 {statistics.median(samples):7.2f} ms | p95 {p95:7.2f} ms | hits {len(hits)}")
+    print(f"worst p95 {worst:.2f} ms ({'within' if worst <= TARGET_MS else 'over'} the {TARGET_MS:.0f} ms target)")
+
+
+if __name__ == "__main__":
+    main()
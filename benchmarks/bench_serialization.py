@@ -0,0 +1,106 @@
+"""
+Microbenchmark: share of request CPU spent serialising event listings.
+
+Compares FastAPI's default ``response_model`` path (re-validate the returned
+models, ``jsonable_encoder``, stdlib ``json``) with the precompiled
+``TypeAdapter.dump_json`` path used by ``backend/routers/events.py``.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_serialization --events 200 --participants 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from fastapi.utils import create_model_field
+
+from backend.core.responses import model_response
+from backend.routers.events import EVENT_LIST, EventOut, ParticipantOut
+
+
+def _sample(n_events: int, n_participants: int) -> List[EventOut]:
+    now = datetime.now(timezone.utc)
+    out = []
+    for i in range(n_events):
+        out.append(EventOut(
+            id=i,
+            title=f"event {i}",
+            description="multi casualty incident, responders needed on site " * 2,
+            address=f"{i} Herzl St, Tel Aviv",
+            country_code="IL",
+            lat=32.0 + i * 1e-4,
+            lng=34.7 + i * 1e-4,
+            start_time=now,
+            end_time=now + timedelta(hours=2),
+            min_confirmations_for_edit=3,
+            is_locked_for_edit=False,
+            created_by_user_id=1,
+            participants=[
+                ParticipantOut(id=j, display_name=f"responder {j}", user_id=j, lat=32.0, lng=34.7, confirmed_at=now)
+                for j in range(n_participants)
+            ],
+        ))
+    return out
+
+
+def _per_call(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--participants", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    models = _sample(args.events, args.participants)
+    field = create_model_field("Response_list_events", List[EventOut], mode="serialization")
+
+    def legacy_serialise() -> bytes:
+        # Same steps as fastapi.routing.serialize_response, minus the event loop.
+        value, errors = field.validate(models, {}, loc=("response",))
+        assert not errors
+        return JSONResponse(field.serialize(value)).body
+
+    def fast_serialise() -> bytes:
+        return EVENT_LIST.dump_json(models)
+
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=List[EventOut])
+    def legacy() -> List[EventOut]:
+        return models
+
+    @app.get("/fast", response_model=List[EventOut])
+    def fast():
+        return model_response(EVENT_LIST, models)
+
+    client = TestClient(app)
+    assert client.get("/legacy").json() == client.get("/fast").json()
+
+    print(f"payload: {args.events} events x {args.participants} participants, "
+          f"{len(fast_serialise())} bytes")
+    for name, ser, path in (("before", legacy_serialise, "/legacy"), ("after", fast_serialise, "/fast")):
+        ser_s = _per_call(ser, args.iterations)
+        req_s = _per_call(lambda: client.get(path), args.iterations)
+        print(f"{name:>6}: request {req_s * 1e3:8.3f} ms | serialisation {ser_s * 1e3:8.3f} ms "
+              f"| share {ser_s / req_s:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
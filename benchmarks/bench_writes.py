@@ -0,0 +1,99 @@
+"""
+Latency and DB round trips per write endpoint in backend/routers/events.py.
+
+Runs the router in-process against a real database, so numbers include the
+network hop to Postgres:
+
+    python -m benchmarks.bench_writes --database-url postgresql+psycopg2://localhost/zufar_bench
+    python -m benchmarks.bench_writes            # throwaway SQLite file
+
+The database should be disposable; tables are created if missing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import get_db
+from backend.models.base import Base
+import backend.models.user  # noqa: F401 ensure model registration
+import backend.models.event  # noqa: F401 ensure model registration
+from backend.routers import events as events_router
+from backend.security_simple import create_access_token
+
+
+def _payload(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "title": f"bench {i}",
+        "description": "benchmark event",
+        "address": "Herzl 1, Tel Aviv",
+        "start_time": now.isoformat(),
+        "end_time": (now + timedelta(hours=2)).isoformat(),
+        "lat": 32.0,
+        "lng": 34.8,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write-path latency benchmark")
+    parser.add_argument("--database-url", default="sqlite:///./bench_writes.db")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    connect_args = {"check_same_thread": False} if args.database_url.startswith("sqlite") else {}
+    engine = create_engine(args.database_url, connect_args=connect_args)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    trips = [0]
+    event.listen(engine, "before_cursor_execute", lambda *a: trips.__setitem__(0, trips[0] + 1))
+    event.listen(engine, "commit", lambda *a: trips.__setitem__(0, trips[0] + 1))
+
+    app = FastAPI()
+    app.include_router(events_router.router)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token('1')}"}
+    target = client.post("/events", json=_payload(0), headers=headers).json()["id"]
+
+    cases = {
+        "create": lambda i: client.post("/events", json=_payload(i), headers=headers),
+        "confirm": lambda i: client.post(f"/events/{target}/confirm", json={"display_name": f"r{i}"}, headers=headers),
+        "patch": lambda i: client.patch(f"/events/{target}", json={"title": f"t{i}"}, headers=headers),
+    }
+    print(f"{engine.dialect.name}, {args.iterations} iterations")
+    for name, call in cases.items():
+        samples = []
+        trips[0] = 0
+        for i in range(args.iterations):
+            start = time.perf_counter()
+            resp = call(i)
+            samples.append(time.perf_counter() - start)
+            # patch is rejected (400) while the event is still locked
+            assert resp.status_code < 500, resp.text
+        samples.sort()
+        p95 = samples[int(0.95 * (len(samples) - 1))]
+        print(f"{name:>8}: p50 {statistics.median(samples) * 1e3:7.2f} ms | p95 {p95 * 1e3:7.2f} ms "
+              f"| round trips/request {trips[0] / args.iterations:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Reproducible end-to-end benchmark suite with JSON baselines.
+
+Scenarios (all in-process through the real ASGI stack, like bench_writes):
+
+* ``events.*``  create / list (warm and cold cache) / confirm / patch on
+  backend/routers/events.py
+* ``auth.*``    signup and login on backend/routers/auth.py (bcrypt bound)
+* ``proto.*``   the prototype's create / join / update_required / tracking
+  flows in casualty_management_app.py
+* ``ws.fanout`` one tracking update delivered to N WebSocket clients;
+  latency is until the last client has the frame
+
+Each scenario reports throughput and p50/p95/p99.  Run against a disposable
+database; ``--fresh`` drops and recreates the tables first, which keeps
+table sizes (and so the numbers) comparable between runs::
+
+    python -m benchmarks.suite --fresh                           # SQLite file
+    python -m benchmarks.suite --fresh --database-url postgresql+psycopg2://localhost/zufar_bench
+    python -m benchmarks.suite --fresh --compare benchmarks/results/sqlite-abc1234.json
+
+Results go to ``benchmarks/results/<dialect>-<commit>.json``.  ``--compare``
+prints the change per scenario against an earlier file and, with
+``--fail-on-regression``, exits 1 when p95 or throughput got worse than
+``--tolerance`` percent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.cache import response_cache
+from backend.database import get_db
+from backend.models.base import Base
+import backend.models.user  # noqa: F401 ensure model registration
+import backend.models.event  # noqa: F401 ensure model registration
+from backend.routers import auth as auth_router
+from backend.routers import events as events_router
+from backend.security_simple import create_access_token
+
+import casualty_management_app as proto
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ---------- measurement ----------
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))]
+
+
+def summarize(samples: List[float], wall: float, units: int) -> dict:
+    s = sorted(samples)
+    return {
+        "n": len(s),
+        "throughput_per_s": round(units / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(_percentile(s, 0.50) * 1e3, 3),
+        "p95_ms": round(_percentile(s, 0.95) * 1e3, 3),
+        "p99_ms": round(_percentile(s, 0.99) * 1e3, 3),
+    }
+
+
+def measure(call: Callable[[int], object], iterations: int, concurrency: int = 1, fanout: int = 1) -> dict:
+    """Time ``call(i)`` for i in range(iterations); ``fanout`` scales throughput
+    when one call delivers several units of work (e.g. WS frames)."""
+
+    def timed(i: int) -> float:
+        start = time.perf_counter()
+        resp = call(i)
+        elapsed = time.perf_counter() - start
+        status = getattr(resp, "status_code", 200)
+        if status >= 500:
+            raise RuntimeError(f"request {i} failed with {status}: {getattr(resp, 'text', '')[:200]}")
+        return elapsed
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        samples = [timed(i) for i in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, range(iterations)))
+    return summarize(samples, time.perf_counter() - started, iterations * fanout)
+
+
+# ---------- scenarios ----------
+
+def _event_payload(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "title": f"bench {i}",
+        "description": "benchmark event",
+        "address": "Herzl 1, Tel Aviv",
+        "start_time": now.isoformat(),
+        "end_time": (now + timedelta(hours=2)).isoformat(),
+        "lat": 32.0,
+        "lng": 34.8,
+    }
+
+
+def _api_client(database_url: str, fresh: bool = False) -> TestClient:
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    if fresh:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(events_router.router)
+    app.include_router(auth_router.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.state.dialect = engine.dialect.name
+    return TestClient(app)
+
+
+def run_api(client: TestClient, args, results: Dict[str, dict]) -> None:
+    headers = {"Authorization": f"Bearer {create_access_token('1')}"}
+    n, c = args.iterations, args.concurrency
+
+    results["events.create"] = measure(
+        lambda i: client.post("/events", json=_event_payload(i), headers=headers), n, c)
+    results["events.list"] = measure(lambda i: client.get("/events"), n, c)
+
+    def cold_list(i: int):
+        response_cache.invalidate(events_router.EVENTS_KEY)
+        return client.get("/events")
+
+    results["events.list_cold"] = measure(cold_list, n, 1)
+
+    # one target per confirm so the lock threshold is crossed realistically,
+    # then patch targets that are already unlocked
+    targets = [client.post("/events", json=_event_payload(i), headers=headers).json()["id"] for i in range(n)]
+    results["events.confirm"] = measure(
+        lambda i: client.post(f"/events/{targets[i]}/confirm", json={"display_name": f"r{i}"}, headers=headers), n, c)
+    for target in targets:
+        for extra in ("second", "third"):
+            client.post(f"/events/{target}/confirm", json={"display_name": extra}, headers=headers)
+    results["events.patch"] = measure(
+        lambda i: client.patch(f"/events/{targets[i]}", json={"title": f"t{i}"}, headers=headers), n, c)
+
+    run = uuid.uuid4().hex[:8]
+    password = "bench-secret-1"
+    results["auth.signup"] = measure(
+        lambda i: client.post("/auth/signup", json={
+            "full_name": f"Bench {i}", "email": f"bench-{run}-{i}@example.com", "password": password}),
+        args.auth_iterations, c)
+    results["auth.login"] = measure(
+        lambda i: client.post("/auth/login", json={"email": f"bench-{run}-{i}@example.com", "password": password}),
+        args.auth_iterations, c)
+
+
+def run_prototype(args, results: Dict[str, dict]) -> None:
+    n, c = args.iterations, args.concurrency
+    proto.events.clear()
+    proto.user_locations.clear()
+    with TestClient(proto.app) as client:
+        created = []
+
+        def create(i: int):
+            resp = client.post("/events/create", json={
+                "title": f"proto {i}", "description": "bench", "reporter": "MDA", "severity": "high",
+                "datetime": datetime.now(timezone.utc).isoformat(), "lat": 32.0, "lng": 34.8,
+                "people_required": n + 1, "casualties_count": 1,
+            })
+            created.append(resp.json()["id"])
+            return resp
+
+        results["proto.create"] = measure(create, n, c)
+        target = created[0]
+        results["proto.join"] = measure(
+            lambda i: client.post("/events/join", json={"event_id": target, "username": f"u{i}"}), n, c)
+        results["proto.update_required"] = measure(
+            lambda i: client.patch("/events/update_required", json={"event_id": target, "new_required": n + 2 + i}), n, c)
+        results["proto.tracking"] = measure(
+            lambda i: client.post("/tracking/update", json={"username": f"u{i % 50}", "lat": 32.0, "lng": 34.8}), n, c)
+
+        with ExitStack() as stack:
+            sockets = [stack.enter_context(client.websocket_connect("/ws/events")) for _ in range(args.ws_clients)]
+            for ws in sockets:
+                ws.receive_json()  # hello
+
+            def fanout(i: int):
+                resp = client.post("/tracking/update", json={"username": "fanout", "lat": 32.0, "lng": 34.8})
+                for ws in sockets:
+                    ws.receive_text()
+                return resp
+
+            results["ws.fanout"] = measure(fanout, args.ws_iterations, 1, fanout=args.ws_clients)
+
+
+# ---------- baselines ----------
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Print per-scenario deltas; return the scenarios that regressed."""
+    regressions = []
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('dialect')}), tolerance {tolerance:.0f}%")
+    print(f"{'scenario':<22}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'per s':>18}")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<22}{'(new)':>18}")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s"):
+            delta = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{now[key]:.2f} ({delta:+.0f}%)")
+        p95_worse = before["p95_ms"] and (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 > tolerance
+        tput_worse = before["throughput_per_s"] and \
+            (before["throughput_per_s"] - now["throughput_per_s"]) / before["throughput_per_s"] * 100 > tolerance
+        flag = "  REGRESSION" if p95_worse or tput_worse else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<22}" + "".join(f"{cell:>18}" for cell in cells) + flag)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite")
+    parser.add_argument("--database-url", default="sqlite:///./bench_suite.db")
+    parser.add_argument("--fresh", action="store_true", help="drop and recreate tables first")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--auth-iterations", type=int, default=20, help="signup/login are bcrypt bound")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--ws-iterations", type=int, default=100)
+    parser.add_argument("--only", choices=("api", "proto"), help="run one group of scenarios")
+    parser.add_argument("--out", help="result file (default benchmarks/results/<dialect>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed p95/throughput change in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    client = _api_client(args.database_url, args.fresh)
+    results: Dict[str, dict] = {}
+    if args.only in (None, "api"):
+        run_api(client, args, results)
+    if args.only in (None, "proto"):
+        run_prototype(args, results)
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "dialect": client.app.state.dialect,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "ws_clients": args.ws_clients,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    print(f"{report['meta']['dialect']} @ {report['meta']['commit']}, concurrency {args.concurrency}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['throughput_per_s']:>9.1f}/s | p50 {r['p50_ms']:8.2f} ms | "
+              f"p95 {r['p95_ms']:8.2f} ms | p99 {r['p99_ms']:8.2f} ms")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['meta']['dialect']}-{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {out}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(report, json.load(fh), args.tolerance)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
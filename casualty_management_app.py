@@ -16,6 +16,13 @@ Key features implemented:
 * Join an event: responders can accept the call to join an event. When
   the number of responders reaches the required count, the event is
   automatically closed.
+* Automatic dispatch: a new (or reopened) event is offered to the
+  responders with the best estimated arrival time, in waves, until it
+  fills (see backend/services/dispatch.py).
+* Location trails: every tracking update is kept in a bounded per-user
+  trail (``/tracking/{username}/trail``), flushed to the database every
+  ``TRAIL_FLUSH_SECONDS`` when set; trails idle for a day are dropped from
+  memory either way (see backend/services/trails.py).
 * Update the required number of responders, with automatic reopening of
   closed events when the requirement increases.
 * Confirm an event (e.g. by an admin or operations centre).
@@ -33,13 +40,29 @@ environmental constraints. These can be added by integrating with
 appropriate mobile or web technologies.
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket
 from pydantic import BaseModel, Field
-from typing import Dict, List
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
 import uuid
 
-app = FastAPI(title="ZufaRav Casualty Management Prototype")
+from fastapi.responses import ORJSONResponse
+
+from backend.core.compression import CompressionMiddleware
+from backend.services.dispatch import Dispatcher
+from backend.services.trails import TrailStore
+from backend.ws import hub, negotiate_format
+
+# Models below have a field called ``datetime``; inside a class body that name
+# would shadow the type, so annotate with this alias instead.
+DateTime = datetime
+
+app = FastAPI(title="ZufaRav Casualty Management Prototype", default_response_class=ORJSONResponse)
+# /events/list grows with every event; compress it (and any large reply)
+app.add_middleware(CompressionMiddleware)
 
 # ----------------------------------------------------------------------------
 # In‑memory data stores. In a production system these would be backed by a
@@ -77,7 +100,9 @@ class EventRecord(BaseModel):
 events: Dict[str, EventRecord] = {}
 user_locations: Dict[str, Dict[str, float | str]] = {}
 
-connected_websockets: List[WebSocket] = []
+# WebSocket topic for all real-time updates; see backend/ws.py for the
+# sequence numbers, replay buffer and resume handshake.
+WS_TOPIC = "events"
 
 # ----------------------------------------------------------------------------
 # API Models exposed to clients
@@ -87,7 +112,7 @@ class CreateEventRequest(BaseModel):
     description: str = Field(..., description="Brief description of the event")
     reporter: str = Field(..., description="Who reported the event (e.g. police, MDA)")
     severity: str = Field(..., description="Severity level of the event")
-    datetime: datetime = Field(..., description="Scheduled or occurred time of the event")
+    datetime: DateTime = Field(..., description="Scheduled or occurred time of the event")
     lat: float = Field(..., description="Latitude coordinate of the event location")
     lng: float = Field(..., description="Longitude coordinate of the event location")
     people_required: int = Field(1, description="Number of responders required for the event")
@@ -125,13 +150,86 @@ def broadcast(message: dict) -> None:
     """
     Broadcast a JSON serialisable message to all connected WebSocket clients.
 
-    Exceptions are caught and silenced; dead connections are removed.
+    The hub stamps the message with a sequence number, encodes it once for
+    every socket and keeps it in the replay buffer for reconnecting clients.
+    Called from sync handlers, which run in the worker threadpool; this only
+    queues the message, so the handler returns without waiting on sockets.
     """
-    for ws in connected_websockets.copy():
+    hub.publish_nowait(WS_TOPIC, message)
+
+def _summary(e: EventRecord) -> EventSummary:
+    return EventSummary(
+        id=e.id,
+        title=e.title,
+        severity=e.severity,
+        datetime=e.datetime,
+        status=e.status,
+        people_required=e.people_required,
+        people_count=len(e.participants),
+        casualties_count=e.casualties_count,
+    )
+
+def ws_snapshot() -> dict:
+    """Full state sent to a client whose resume gap exceeds the buffer."""
+    return {
+        "events": [_summary(e).model_dump() for e in list(events.values())],
+        "locations": dict(user_locations),
+    }
+
+hub.set_snapshot(WS_TOPIC, ws_snapshot)
+
+# Ranks responders for new events from their latest tracked positions;
+# roles come from the user registry below.
+dispatcher = Dispatcher(role_of=lambda username: users[username].role if username in users else None)
+# how often to check for events whose dispatch wave went unanswered
+WAVE_CHECK_SECONDS = 5.0
+
+def offer(event_id: str, usernames: List[str]) -> None:
+    """Tell the chosen responders (clients filter on their username)."""
+    if usernames:
+        broadcast({"type": "dispatch_offer", "data": {"event_id": event_id, "usernames": usernames}})
+
+# Per-user location history; flushed to the location_trail table (created by
+# the migrations) every TRAIL_FLUSH_SECONDS, 0 = keep in memory only; then idle
+# trails are dropped every TRAIL_SWEEP_SECONDS instead.
+trails = TrailStore()
+TRAIL_FLUSH_SECONDS = float(os.getenv("TRAIL_FLUSH_SECONDS", "0"))
+TRAIL_SWEEP_SECONDS = 3600.0
+log = logging.getLogger("prototype")
+
+def _trail_session():
+    from backend.database import SessionLocal
+
+    return SessionLocal()
+
+async def _flush_trails() -> None:
+    while True:
+        await asyncio.sleep(TRAIL_FLUSH_SECONDS)
         try:
-            app.loop.create_task(ws.send_json(message))
+            await asyncio.to_thread(trails.flush, _trail_session)
         except Exception:
-            connected_websockets.remove(ws)
+            log.exception("location trail flush failed; points kept for the next one")
+
+async def _sweep_trails() -> None:
+    while True:
+        await asyncio.sleep(TRAIL_SWEEP_SECONDS)
+        trails.evict_idle(unflushed=True)
+
+async def _next_waves() -> None:
+    while True:
+        await asyncio.sleep(WAVE_CHECK_SECONDS)
+        for event_id, usernames in dispatcher.tick().items():
+            offer(event_id, usernames)
+
+def on_startup() -> None:
+    """Start the ws dispatcher (the first subscriber would too), the
+    dispatch wave timer and the trail flushes (or idle-trail sweeps)."""
+    hub.bind()
+    loop = asyncio.get_running_loop()
+    loop.create_task(_next_waves())
+    loop.create_task(_flush_trails() if TRAIL_FLUSH_SECONDS > 0 else _sweep_trails())
+
+app.add_event_handler("startup", on_startup)
 
 @app.post("/events/create", response_model=EventSummary)
 def create_event(request: CreateEventRequest) -> EventSummary:
@@ -151,36 +249,31 @@ def create_event(request: CreateEventRequest) -> EventSummary:
         created_at=datetime.utcnow(),
     )
     events[event_id] = record
-    summary = EventSummary(
-        id=record.id,
-        title=record.title,
-        severity=record.severity,
-        datetime=record.datetime,
-        status=record.status,
-        people_required=record.people_required,
-        people_count=len(record.participants),
-        casualties_count=record.casualties_count,
-    )
+    summary = _summary(record)
     # Notify clients
-    broadcast({"type": "new_event", "data": summary.dict()})
+    broadcast({"type": "new_event", "data": summary.model_dump()})
+    offer(event_id, dispatcher.open(event_id, record.lat, record.lng, record.people_required))
     return summary
 
 @app.get("/events/list", response_model=List[EventSummary])
 def list_events() -> List[EventSummary]:
     """Return summaries of all events."""
-    return [
-        EventSummary(
-            id=e.id,
-            title=e.title,
-            severity=e.severity,
-            datetime=e.datetime,
-            status=e.status,
-            people_required=e.people_required,
-            people_count=len(e.participants),
-            casualties_count=e.casualties_count,
-        )
-        for e in events.values()
-    ]
+    return [_summary(e) for e in events.values()]
+
+@app.get("/events/{event_id}/nearest")
+def nearest_responders(event_id: str, limit: int = 10) -> List[dict]:
+    """The responders dispatch would pick for an event, best first, with
+    distance, bearing from the event and estimated arrival time."""
+    event = events.get(event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    ranked = dispatcher.rank(event.lat, event.lng, max(1, min(limit, 100)), exclude=event.participants)
+    return [{
+        "username": c.username,
+        "distance_km": round(c.distance_km, 3),
+        "bearing_deg": round(c.bearing_deg, 1),
+        "eta_seconds": round(c.eta_seconds),
+    } for c in ranked]
 
 @app.post("/events/join")
 def join_event(request: JoinEventRequest) -> dict:
@@ -200,6 +293,7 @@ def join_event(request: JoinEventRequest) -> dict:
         raise HTTPException(status_code=400, detail="User already joined this event")
     # Register the participant with initial status
     event.participants[request.username] = "dispatched"
+    dispatcher.joined(event.id, request.username)
     # Close event if threshold met
     if len(event.participants) >= event.people_required:
         event.status = "closed"
@@ -213,6 +307,13 @@ def join_event(request: JoinEventRequest) -> dict:
     return {"msg": f"{request.username} joined event {event.title}",
             "status": event.participants[request.username]}
 
+def _redispatch(event: EventRecord) -> None:
+    """Resume (or stop) dispatching after the required count changed."""
+    if event.status == "active":
+        offer(event.id, dispatcher.open(event.id, event.lat, event.lng, event.people_required, event.participants))
+    else:
+        dispatcher.close(event.id)
+
 @app.patch("/events/update_required")
 def update_required(request: UpdateRequiredRequest) -> dict:
     """
@@ -230,6 +331,7 @@ def update_required(request: UpdateRequiredRequest) -> dict:
         event.status = "active"
     else:
         event.status = "closed"
+    _redispatch(event)
     broadcast({"type": "event_update", "data": {
         "id": event.id,
         "status": event.status,
@@ -258,6 +360,14 @@ def confirm_event(request: ConfirmEventRequest) -> dict:
 def update_location(loc: LocationUpdate) -> dict:
     """Update a responder’s location."""
     timestamp = loc.timestamp.isoformat() if loc.timestamp else datetime.utcnow().isoformat()
+    seen = loc.timestamp or datetime.utcnow()
+    # naive timestamps are UTC, like the ones generated here
+    at = (seen if seen.tzinfo else seen.replace(tzinfo=timezone.utc)).timestamp()
+    # a late resend (older than the trail's last point) must not move the
+    # responder back, neither for dispatch nor on the clients' maps
+    if not trails.record(loc.username, loc.lat, loc.lng, at):
+        return {"msg": f"Ignored an out-of-date location for {loc.username}"}
+    dispatcher.locate(loc.username, loc.lat, loc.lng, at)
     user_locations[loc.username] = {
         "lat": loc.lat,
         "lng": loc.lng,
@@ -271,6 +381,25 @@ def update_location(loc: LocationUpdate) -> dict:
     }})
     return {"msg": f"Location updated for {loc.username}"}
 
+@app.get("/tracking/{username}/trail")
+def location_trail(username: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> dict:
+    """
+    Recent path of a responder, oldest first. The latest stretch is at full
+    resolution; older parts are thinned to keep memory per user bounded, so
+    use the stored history (``python -m backend.services.trails show``) for
+    a full after-action review.
+    """
+    bounds = [None if t is None else (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
+              for t in (since, until)]
+    points = trails.trail(username, *bounds)
+    if points is None:
+        raise HTTPException(status_code=404, detail="No trail for this user")
+    return {"username": username, "points": [
+        {"lat": round(lat, 5), "lng": round(lng, 5),  # float32: ~1 m
+         "timestamp": datetime.fromtimestamp(t, timezone.utc).isoformat()}
+        for lat, lng, t in points.tolist()
+    ]}
+
 @app.get("/reports/summary")
 def report_summary() -> dict:
     """
@@ -336,6 +465,7 @@ def register_user(user: User) -> dict:
     if user.username in users:
         raise HTTPException(status_code=400, detail="User already exists")
     users[user.username] = user
+    dispatcher.refresh(user.username)
     return {"msg": f"User {user.username} registered as {user.role}"}
 
 @app.get("/users/list", response_model=List[User])
@@ -357,6 +487,7 @@ def update_participant_status(req: ParticipantStatusUpdate) -> dict:
     if req.username not in event.participants:
         raise HTTPException(status_code=404, detail="User not part of event")
     event.participants[req.username] = req.new_status
+    dispatcher.set_status(req.username, req.new_status)
     broadcast({"type": "participant_status", "data": {
         "event_id": event.id,
         "username": req.username,
@@ -383,6 +514,7 @@ def update_casualties(req: CasualtiesUpdate) -> dict:
         event.status = "active"
     else:
         event.status = "closed"
+    _redispatch(event)
     broadcast({"type": "event_update", "data": {
         "id": event.id,
         "status": event.status,
@@ -396,18 +528,36 @@ def update_casualties(req: CasualtiesUpdate) -> dict:
             "people_required": event.people_required}
 
 @app.websocket("/ws/events")
-async def websocket_endpoint(ws: WebSocket) -> None:
+async def websocket_endpoint(
+    ws: WebSocket,
+    last_seq: Optional[int] = None,
+    epoch: Optional[str] = None,
+    format: Optional[str] = None,
+) -> None:
     """
     Accept WebSocket connections for real‑time event updates. Clients
     receive broadcast messages whenever events are created, updated or
     confirmed. A client must send messages periodically to keep the
     connection alive, but these messages are ignored.
+
+    Every message carries a ``seq``. After a reconnect, pass the ``epoch``
+    from the last ``hello`` and the last ``seq`` received
+    (``/ws/events?epoch=...&last_seq=N``) to get only the missed messages,
+    or a ``snapshot`` message when too much was missed.
+
+    High-frequency consumers can ask for binary MessagePack frames with
+    short keys via the ``zufar.msgpack`` subprotocol (or ``?format=msgpack``);
+    the ``hello`` frame then carries the key and type tables.
     """
-    await ws.accept()
-    connected_websockets.append(ws)
+    fmt, subprotocol = negotiate_format(ws, format)
+    await ws.accept(subprotocol=subprotocol)
+    await hub.subscribe(ws, WS_TOPIC, last_seq=last_seq, epoch=epoch, fmt=fmt)
     try:
         while True:
-            await ws.receive_text()  # Keep the connection alive
-    except WebSocketDisconnect:
-        if ws in connected_websockets:
-            connected_websockets.remove(ws)
+            # Keep the connection alive; what clients send, text or binary
+            # frames, is ignored
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        await hub.unsubscribe(ws, WS_TOPIC)
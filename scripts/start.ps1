@@ -22,6 +22,9 @@ if (Test-Path ".env") {
 Write-Host '=== Running Alembic migrations ==='
 python -m alembic upgrade head
 
+Write-Host '=== Creating upcoming partitions ==='
+python -m backend.services.partitions ensure
+
 Write-Host '=== Starting API ==='
 $port = if ($env:PORT) { $env:PORT } else { 8000 }
 uvicorn backend.app:app --host 0.0.0.0 --port $port
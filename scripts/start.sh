@@ -19,5 +19,9 @@ fi
 echo "=== Running Alembic migrations ==="
 python -m alembic upgrade head
 
+echo "=== Creating upcoming partitions ==="
+python -m backend.services.partitions ensure
+
 echo "=== Starting API ==="
-exec uvicorn backend.app:app --host 0.0.0.0 --port "${PORT:-8000}"
+# websockets implementation so permessage-deflate is negotiated for /ws clients
+exec uvicorn backend.app:app --host 0.0.0.0 --port "${PORT:-8000}" --ws websockets --ws-per-message-deflate true
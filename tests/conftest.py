@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.cache import MemoryBackend, ResponseCache
+from backend.database import get_db
+from backend.models.base import Base
+import backend.models.user  # noqa: F401 ensure model registration
+import backend.models.event  # noqa: F401 ensure model registration
+from backend.routers import events as events_router
+from backend.security_simple import create_access_token
+
+
+def event_payload(start=None, hours=1, **overrides):
+    """A valid ``POST /events`` body starting at ``start`` (default now) and
+    lasting ``hours``; ``overrides`` replace or add fields."""
+    start = start or datetime.now(timezone.utc)
+    body = {
+        "title": "Incident",
+        "description": "Volunteers needed",
+        "address": "Allenby 1, Tel Aviv",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=hours)).isoformat(),
+        "lat": 32.07,
+        "lng": 34.77,
+    }
+    body.update(overrides)
+    return body
+
+
+@pytest.fixture()
+def engine():
+    # StaticPool: the threadpool running sync handlers must see the same in-memory DB
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture()
+def response_cache(monkeypatch):
+    cache = ResponseCache(MemoryBackend(maxsize=64))
+    monkeypatch.setattr(events_router, "response_cache", cache)
+    return cache
+
+
+@pytest.fixture()
+def events_client(engine, response_cache):
+    TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(events_router.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture()
+def auth_headers():
+    return {"Authorization": f"Bearer {create_access_token('1')}"}
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from backend.app import create_app
+from backend.core.config import Settings
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, backend.app, backend.database as d\n"
+        "heavy = ['jose', 'passlib', 'bcrypt', 'backend.routers.events', 'casualty_management_app']\n"
+        "print([m for m in heavy if m in sys.modules], d._engine)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[] None"
+
+
+def test_optional_routers_follow_settings():
+    class Custom(Settings):
+        ENABLE_DEBUG_ROUTES = True
+        ENABLE_PROTOTYPE = True
+
+    default_paths = {r.path for r in create_app().routes}
+    assert "/events" in default_paths and "/auth/signup" in default_paths
+    assert not any(p.startswith("/debug") or p == "/prototype" for p in default_paths)
+
+    client = TestClient(create_app(Custom()))
+    assert client.get("/healthz").json() == {"ok": True}
+    assert client.get("/debug/cache").status_code == 200
+    assert client.get("/prototype/events/list").status_code == 200
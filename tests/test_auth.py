@@ -2,6 +2,7 @@ import os
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from backend.app import app
@@ -10,7 +11,8 @@ import backend.models.user  # noqa: F401 ensure model registration
 
 # Configure a test database (SQLite in-memory)
 SQLALCHEMY_DATABASE_URL = "sqlite://"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# StaticPool: the threadpool running sync handlers must see the same in-memory DB
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create all tables
@@ -56,3 +58,19 @@ def test_signup_and_login_flow():
     })
     assert resp3.status_code == 200
     assert resp3.json().get("access_token")
+
+
+def test_login_ignores_email_case():
+    resp = client.post("/auth/signup", json={
+        "full_name": "Case Test",
+        "email": "Case.Test@Example.com",
+        "password": "secret123"
+    })
+    assert resp.status_code == 200, resp.text
+    assert client.post("/auth/signup", json={
+        "full_name": "Case Again",
+        "email": "case.test@example.com",
+        "password": "secret123"
+    }).status_code == 400
+    resp2 = client.post("/auth/login", json={"email": "CASE.TEST@example.COM", "password": "secret123"})
+    assert resp2.status_code == 200
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.core.compression import CompressionMiddleware, available
+
+BIG = [{"id": i, "title": f"event {i}", "address": "Herzl 1, Tel Aviv"} for i in range(200)]
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return BIG
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        def rows():
+            for row in BIG:
+                yield (str(row) + "\n").encode()
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 5000), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/png")
+    def png():
+        return Response(b"\x89PNG" + b"\0" * 5000, media_type="image/png")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("encoding", available())
+def test_large_json_is_compressed_with_negotiated_encoding(encoding):
+    client = _client()
+    plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+    resp = client.get("/big", headers={"Accept-Encoding": encoding})
+    assert resp.headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert int(resp.headers["content-length"]) < len(plain.content) / 3
+    assert resp.json() == plain.json() == BIG
+    assert "content-encoding" not in plain.headers and "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_streaming_response_is_compressed_incrementally():
+    client = _client()
+    resp = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    assert resp.text.splitlines() == [str(row) for row in BIG]
+
+
+def test_small_and_already_encoded_and_binary_pass_through():
+    client = _client()
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers and "vary" not in small.headers
+
+    encoded = client.get("/encoded", headers={"Accept-Encoding": "br, gzip"})
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.text == "x" * 5000
+
+    png = client.get("/png", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in png.headers
@@ -0,0 +1,147 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import casualty_management_app as proto
+from backend.services import dispatch
+from backend.services.dispatch import Dispatcher, haversine_km
+from backend.services.positions import PositionTable
+from backend.services.trails import TrailStore
+from backend.ws import Hub
+
+
+class Clock:
+    now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ranking_matches_brute_force_by_distance():
+    rng = random.Random(3)
+    engine = Dispatcher()
+    for i in range(2000):
+        engine.locate(f"r{i}", 32.0 + rng.gauss(0, 0.2), 34.8 + rng.gauss(0, 0.2))
+    for _ in range(50):
+        lat, lng = 32.0 + rng.gauss(0, 0.4), 34.8 + rng.gauss(0, 0.4)
+        expected = sorted(haversine_km(lat, lng, *engine.positions.position(name)) for name in engine.positions.rows)
+        assert [c.distance_km for c in engine.rank(lat, lng, 6)] == pytest.approx(expected[:6], abs=1e-3)
+    # nobody within MAX_RADIUS_KM
+    assert engine.rank(29.55, 34.95, 5) == []
+
+
+def test_measure_matches_scalar_math_and_rows_are_reused():
+    rng = random.Random(5)
+    engine = Dispatcher()
+    engine.positions = PositionTable(capacity=4)  # grows while filling
+    points = {f"r{i}": (31.5 + rng.random(), 34.5 + rng.random()) for i in range(50)}
+    for name, (lat, lng) in points.items():
+        engine.locate(name, lat, lng)
+    engine.forget("r7")
+    engine.locate("new", 32.0, 35.0)
+    assert engine.positions.rows["new"] == 7 and engine.positions.size == 50
+
+    names, km, bearing, eta = engine.measure(32.0, 34.8)
+    assert len(names) == 50 and "r7" not in names
+    for name, d, b, e in zip(names, km, bearing, eta):
+        lat, lng = engine.positions.position(name)
+        assert d == pytest.approx(haversine_km(32.0, 34.8, lat, lng), abs=1e-3)
+        assert e == pytest.approx(dispatch.eta_seconds(haversine_km(32.0, 34.8, lat, lng)), abs=0.1)
+        # initial bearing, scalar formula
+        p1, p2, dl = math.radians(32.0), math.radians(lat), math.radians(lng - 34.8)
+        expected = math.degrees(math.atan2(math.sin(dl) * math.cos(p2),
+                                           math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dl))) % 360
+        assert min(abs(b - expected), 360 - abs(b - expected)) < 0.01
+
+
+def test_load_role_and_staleness():
+    clock = Clock()
+    roles = {"admin": "admin", "desk": "dispatcher"}
+    engine = Dispatcher(role_of=roles.get, clock=clock)
+    for name in ("near", "admin", "desk", "far", "old"):
+        engine.locate(name, 32.0, 34.8)
+    engine.locate("far", 32.02, 34.8)  # ~2.2 km
+    engine.locate("old", 32.0, 34.8, at=clock.now - dispatch.STALE_SECONDS - 1)
+
+    assert [c.username for c in engine.rank(32.0, 34.8, 5)] == ["near", "far", "desk"]
+    engine.joined("other-event", "near")  # busy: ranked behind a free responder farther away
+    assert [c.username for c in engine.rank(32.0, 34.8, 5)] == ["far", "desk", "near"]
+    engine.joined("third-event", "near")  # at MAX_LOAD
+    assert "near" not in [c.username for c in engine.rank(32.0, 34.8, 5)]
+    engine.set_status("near", "completed")
+    assert "near" in [c.username for c in engine.rank(32.0, 34.8, 5)]
+
+
+def test_waves_until_filled():
+    clock = Clock()
+    engine = Dispatcher(clock=clock)
+    for i in range(30):
+        engine.locate(f"r{i:02}", 32.0 + i * 0.001, 34.8)
+
+    first = engine.open("e1", 32.0, 34.8, required=4)
+    assert first == ["r00", "r01", "r02", "r03", "r04", "r05"]  # 4 missing x OVERSUBSCRIBE
+    engine.joined("e1", "r01")
+    engine.joined("e1", "r04")
+    assert engine.tick() == {}  # wave still fresh
+    clock.now += dispatch.WAVE_SECONDS
+    assert engine.tick() == {"e1": ["r06", "r07", "r08"]}  # never the same responder twice
+    for name in ("r06", "r08"):
+        engine.joined("e1", name)
+    clock.now += dispatch.WAVE_SECONDS
+    assert engine.tick() == {} and "e1" not in engine.dispatches
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    hub = Hub()
+    monkeypatch.setattr(proto, "hub", hub)
+    monkeypatch.setattr(proto, "events", {})
+    monkeypatch.setattr(proto, "users", {})
+    monkeypatch.setattr(proto, "dispatcher", Dispatcher(role_of=lambda u: proto.users[u].role if u in proto.users else None))
+    return TestClient(proto.app)
+
+
+def test_new_event_is_offered_to_nearest_responders(client):
+    for name, lat in (("close", 32.001), ("closer", 32.0001), ("away", 32.3)):
+        client.post("/tracking/update", json={"username": name, "lat": lat, "lng": 34.8})
+    client.post("/users/register", json={"username": "closer", "role": "admin"})
+
+    with client.websocket_connect("/ws/events") as ws:
+        ws.receive_json()  # hello
+        resp = client.post("/events/create", json={
+            "title": "t", "description": "d", "reporter": "police", "severity": "high",
+            "datetime": datetime.utcnow().isoformat(), "lat": 32.0, "lng": 34.8, "people_required": 1,
+        })
+        event_id = resp.json()["id"]
+        assert ws.receive_json()["type"] == "new_event"
+        offer = ws.receive_json()
+        assert offer["type"] == "dispatch_offer"
+        assert offer["data"] == {"event_id": event_id, "usernames": ["close", "away"]}
+
+    nearest = client.get(f"/events/{event_id}/nearest").json()
+    assert [r["username"] for r in nearest] == ["close", "away"]
+    assert nearest[0]["distance_km"] == pytest.approx(0.111, abs=1e-3) and nearest[0]["bearing_deg"] == 0.0
+
+    client.post("/events/join", json={"event_id": event_id, "username": "close"})
+    assert event_id not in proto.dispatcher.dispatches
+    client.patch("/events/update_required", json={"event_id": event_id, "new_required": 2})
+    # reopened: dispatching resumes for the one missing responder
+    assert proto.dispatcher.dispatches[event_id].offered == {"away": 1}
+
+
+def test_late_resend_does_not_move_the_responder_back(client, monkeypatch):
+    monkeypatch.setattr(proto, "trails", TrailStore())
+    monkeypatch.setattr(proto, "user_locations", {})
+    now = datetime.utcnow()
+    client.post("/tracking/update", json={"username": "medic", "lat": 32.1, "lng": 34.8, "timestamp": now.isoformat()})
+    seq = proto.hub.topic().seq
+    client.post("/tracking/update", json={"username": "medic", "lat": 31.5, "lng": 34.8,
+                                          "timestamp": (now - timedelta(minutes=1)).isoformat()})
+    lat, _ = proto.dispatcher.positions.position("medic")
+    assert lat == pytest.approx(32.1, abs=1e-4)
+    # nor on the map: no location_update goes out
+    assert proto.user_locations["medic"]["lat"] == 32.1
+    assert proto.hub.topic().seq == seq
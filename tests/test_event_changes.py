@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend.services import changes
+from conftest import event_payload
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(monkeypatch):
+    monkeypatch.setattr(changes, "SETTLE_SECONDS", 0.0)
+
+
+def test_changes_since_cursor(events_client, auth_headers):
+    a = events_client.post("/events", json=event_payload(title="A"), headers=auth_headers).json()
+    events_client.post("/events", json=event_payload(title="B"), headers=auth_headers)
+
+    first = events_client.get("/events/changes", params={"since": 0}).json()
+    assert [e["title"] for e in first["inserted"]] == ["A", "B"]
+    assert first["updated"] == [] and first["deleted"] == []
+    assert first["resync"] is False
+
+    events_client.post(f"/events/{a['id']}/confirm", json={"display_name": "Moshe"}, headers=auth_headers)
+    delta = events_client.get("/events/changes", params={"since": first["cursor"]}).json()
+    assert delta["inserted"] == []
+    assert [e["id"] for e in delta["updated"]] == [a["id"]]
+    assert delta["updated"][0]["participants"][0]["display_name"] == "Moshe"
+
+    idle = events_client.get("/events/changes", params={"since": delta["cursor"]}).json()
+    assert idle["cursor"] == delta["cursor"]
+    assert idle["inserted"] == idle["updated"] == idle["deleted"] == []
+
+
+def test_paging_and_resync_after_prune(events_client, auth_headers, engine):
+    for i in range(3):
+        events_client.post("/events", json=event_payload(title=f"E{i}"), headers=auth_headers)
+
+    page = events_client.get("/events/changes", params={"since": 0, "limit": 2}).json()
+    assert page["has_more"] is True and len(page["inserted"]) == 2
+    rest = events_client.get("/events/changes", params={"since": page["cursor"], "limit": 2}).json()
+    assert rest["has_more"] is False and [e["title"] for e in rest["inserted"]] == ["E2"]
+
+    events_client.post("/events", json=event_payload(title="late"), headers=auth_headers)
+    with Session(engine) as db:
+        # the newest entry is kept, so the latest seq never goes back
+        assert changes.prune_changes(db, datetime.now(timezone.utc) + timedelta(seconds=1)) == 3
+
+    stale = events_client.get("/events/changes", params={"since": page["cursor"]}).json()
+    assert stale["resync"] is True
+    assert stale["inserted"] == []
+    assert stale["cursor"] == 4
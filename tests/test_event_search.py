@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.services.search import _pattern, highlight, snippet
+from conftest import event_payload
+
+
+def _create(client, headers, **kw):
+    resp = client.post("/events", json=event_payload(**kw), headers=headers)
+    assert resp.status_code == 201, resp.text
+    return resp.json()["id"]
+
+
+def _hits(client, **params):
+    resp = client.get("/events/search", params=params)
+    assert resp.status_code == 200, resp.text
+    return resp.json()["hits"]
+
+
+def test_partial_matches_in_english_and_hebrew(events_client, auth_headers):
+    flood = _create(events_client, auth_headers, title="Basement flooding", address="Herzl 5, Haifa")
+    fire = _create(events_client, auth_headers, title="שריפה בדירה", address="רחוב הרצל 12, ירושלים")
+    _create(events_client, auth_headers, title="Power outage")
+
+    assert [h["id"] for h in _hits(events_client, q="flood")] == [flood]
+    assert [h["id"] for h in _hits(events_client, q="שריפ")] == [fire]
+    assert [h["id"] for h in _hits(events_client, q="הרצל")] == [fire]
+    assert [h["id"] for h in _hits(events_client, q="HERZL")] == [flood]
+    assert _hits(events_client, q="flood ירושלים") == []  # every word must match
+
+
+def test_title_match_ranks_above_description(events_client, auth_headers):
+    in_description = _create(events_client, auth_headers, title="Road blocked", description="tree fell after the storm")
+    in_title = _create(events_client, auth_headers, title="Storm damage", description="roof tiles")
+
+    hits = _hits(events_client, q="storm")
+    assert [h["id"] for h in hits] == [in_title, in_description]
+    assert hits[0]["rank"] > hits[1]["rank"]
+
+
+def test_highlights_are_escaped(events_client, auth_headers):
+    _create(events_client, auth_headers, title="<b>Gas</b> leak", description="smell of gas " + "x" * 200)
+
+    hit, = _hits(events_client, q="gas")
+    assert hit["highlights"]["title"] == "&lt;b&gt;<mark>Gas</mark>&lt;/b&gt; leak"
+    assert hit["highlights"]["description"].startswith("smell of <mark>gas</mark>")
+    assert hit["highlights"]["description"].endswith("…")
+
+
+def test_time_window_filters(events_client, auth_headers):
+    now = datetime.now(timezone.utc)
+    active = _create(events_client, auth_headers, title="Flood on Jaffa road", start=now - timedelta(hours=1), hours=2)
+    past = _create(events_client, auth_headers, title="Flood in the old city", start=now - timedelta(days=40))
+
+    assert [h["id"] for h in _hits(events_client, q="flood", when="active")] == [active]
+    assert [h["id"] for h in _hits(events_client, q="flood", when="historical")] == [past]
+    after = (now - timedelta(days=1)).isoformat()
+    assert [h["id"] for h in _hits(events_client, q="flood", after=after)] == [active]
+
+
+def test_index_follows_edits(events_client, auth_headers):
+    event_id = _create(events_client, auth_headers, title="Flat tyre")
+    assert _hits(events_client, q="tyre")  # first search builds the index
+
+    resp = events_client.patch(f"/events/{event_id}", json={"title": "Car accident"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert _hits(events_client, q="tyre") == []
+    assert [h["id"] for h in _hits(events_client, q="accident")] == [event_id]
+
+
+def test_short_terms(events_client, auth_headers):
+    event_id = _create(events_client, auth_headers, title="Fire at the mall")
+    assert [h["id"] for h in _hits(events_client, q="at mall")] == [event_id]  # "at" ignored
+    assert events_client.get("/events/search", params={"q": "a b c"}).status_code == 422
+
+
+def test_snippet_windows_long_text():
+    pattern = _pattern(["needle"])
+    text = "a" * 100 + " needle " + "b" * 100
+    out = snippet(text, pattern, width=40)
+    assert out.startswith("…") and out.endswith("…") and "<mark>needle</mark>" in out
+    assert highlight("Needle & thread", pattern) == "<mark>Needle</mark> &amp; thread"
@@ -0,0 +1,68 @@
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from backend.models.event import Event, EventSummary, Participant
+from backend.services import summary
+from conftest import event_payload
+
+
+def _row(engine, event_id):
+    with Session(engine) as db:
+        s = db.get(EventSummary, event_id)
+        return s and (s.confirmations, s.still_needed, s.status)
+
+
+def test_triggers_keep_counts_current(events_client, auth_headers, engine):
+    event_id = events_client.post("/events", json=event_payload(), headers=auth_headers).json()["id"]
+    assert _row(engine, event_id) == (0, 1, "open")
+
+    events_client.post(f"/events/{event_id}/confirm", json={"display_name": "Dana"}, headers=auth_headers)
+    assert _row(engine, event_id) == (1, 0, "filled")
+    events_client.post(f"/events/{event_id}/confirm/bulk", json=[{"display_name": f"v{i}"} for i in range(4)],
+                       headers=auth_headers)
+    assert _row(engine, event_id) == (5, 0, "filled")
+
+    with Session(engine) as db:
+        db.execute(update(Event).where(Event.id == event_id).values(required_attendees=8))
+        db.execute(delete(Participant).where(Participant.display_name == "v0"))
+        db.commit()
+    assert _row(engine, event_id) == (4, 4, "open")
+
+    with Session(engine) as db:
+        db.delete(db.get(Event, event_id))
+        db.commit()
+    assert _row(engine, event_id) is None
+
+
+def test_listings_and_report_read_the_summary(events_client, auth_headers):
+    first = events_client.post("/events", json=event_payload(title="Fire"), headers=auth_headers).json()["id"]
+    events_client.post("/events", json=event_payload(title="Quake"), headers=auth_headers)
+    events_client.post(f"/events/{first}/confirm", json={"display_name": "Noa"}, headers=auth_headers)
+
+    listed = {e["title"]: e for e in events_client.get("/events").json()}
+    assert (listed["Fire"]["confirmations"], listed["Fire"]["status"]) == (1, "filled")
+    assert (listed["Quake"]["still_needed"], listed["Quake"]["status"]) == (1, "open")
+    assert events_client.get(f"/events/{first}").json()["confirmations"] == 1
+
+    assert events_client.get("/events/summary").json() == {
+        "events": 2, "open": 1, "filled": 1, "confirmations": 1, "still_needed": 1,
+    }
+
+
+def test_consistency_check_finds_and_repairs_drift(events_client, auth_headers, engine):
+    ids = [events_client.post("/events", json=event_payload(), headers=auth_headers).json()["id"] for _ in range(3)]
+    events_client.post(f"/events/{ids[0]}/confirm", json={"display_name": "Omer"}, headers=auth_headers)
+
+    with Session(engine) as db:
+        assert summary.find_drift(db) == []
+        db.execute(update(EventSummary).where(EventSummary.event_id == ids[0]).values(confirmations=7))
+        db.execute(delete(EventSummary).where(EventSummary.event_id == ids[1]))
+        db.add(EventSummary(event_id=999, confirmations=0, required_attendees=1))
+        db.commit()
+
+        drift = {(d.event_id, d.problem) for d in summary.find_drift(db)}
+        assert drift == {(ids[0], "confirmations"), (ids[1], "missing"), (999, "orphan")}
+        assert summary.rebuild(db, [ids[0], ids[1], 999]) == 2
+        db.commit()
+        assert summary.find_drift(db) == []
+    assert _row(engine, ids[0]) == (1, 0, "filled")
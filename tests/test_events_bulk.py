@@ -0,0 +1,42 @@
+from sqlalchemy import event
+
+from conftest import event_payload
+
+
+def test_bulk_create_reports_per_item_results(events_client, auth_headers, engine):
+    inserts = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cur, stmt, *a: inserts.append(stmt) if stmt.startswith("INSERT INTO event ") else None)
+
+    items = [event_payload(title=f"feed {i}") for i in range(250)]
+    items[7] = event_payload(hours=-1, title="backwards")
+    items[9] = {"title": ""}
+    resp = events_client.post("/events/bulk", json=items, headers=auth_headers)
+    assert resp.status_code == 201, resp.text
+    body = resp.json()
+    assert body["created"] == 248 and body["failed"] == 2
+    assert [r["index"] for r in body["items"]] == list(range(250))
+    assert body["items"][7]["ok"] is False and "end_time" in body["items"][7]["errors"][0]["msg"]
+    assert body["items"][9]["ok"] is False
+    ids = [r["id"] for r in body["items"] if r["ok"]]
+    assert len(set(ids)) == 248
+    assert len(inserts) == 1
+
+    listed = events_client.get("/events").json()
+    assert {e["id"]: e["title"] for e in listed}[ids[0]] == "feed 0"
+
+
+def test_bulk_confirm_updates_lock_once(events_client, auth_headers):
+    ev = events_client.post("/events", json=event_payload(title="scene"), headers=auth_headers).json()
+    items = [{"display_name": f"r{i}"} for i in range(4)] + [{"display_name": ""}]
+    resp = events_client.post(f"/events/{ev['id']}/confirm/bulk", json=items, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["created"] == 4 and resp.json()["failed"] == 1
+
+    detail = events_client.get(f"/events/{ev['id']}").json()
+    assert len(detail["participants"]) == 4
+    assert detail["is_locked_for_edit"] is False
+
+    assert events_client.post("/events/999/confirm/bulk", json=items, headers=auth_headers).status_code == 404
+    too_many = [{"display_name": "x"}] * 10_001
+    assert events_client.post(f"/events/{ev['id']}/confirm/bulk", json=too_many, headers=auth_headers).status_code == 413
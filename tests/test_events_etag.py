@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from backend.models.event import Event
+from backend.services.changes import record_change
+from conftest import event_payload
+
+
+def test_listing_revalidates_with_one_version_lookup(events_client, auth_headers, engine):
+    created = events_client.post("/events", json=event_payload(), headers=auth_headers)
+    assert created.status_code == 201, created.text
+
+    first = events_client.get("/events")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"events-')
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+    again = events_client.get("/events", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert len(statements) == 1 and "event_change" in statements[0]
+
+    # a confirmation changes the listing, so the old tag no longer matches
+    event_id = created.json()["id"]
+    resp = events_client.post(f"/events/{event_id}/confirm", json={"display_name": "Avi"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    after = events_client.get("/events", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert after.json()[0]["participants"][0]["display_name"] == "Avi"
+
+
+def test_detail_and_participants_share_per_event_etag(events_client, auth_headers):
+    a = events_client.post("/events", json=event_payload(title="A"), headers=auth_headers).json()
+    b = events_client.post("/events", json=event_payload(title="B"), headers=auth_headers).json()
+
+    detail = events_client.get(f"/events/{a['id']}")
+    assert detail.status_code == 200
+    etag = detail.headers["etag"]
+    assert events_client.get(f"/events/{a['id']}/participants", headers={"If-None-Match": etag}).status_code == 304
+
+    # writes to another event leave this one's tag alone
+    events_client.post(f"/events/{b['id']}/confirm", json={"display_name": "Dana"}, headers=auth_headers)
+    assert events_client.get(f"/events/{a['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    events_client.post(f"/events/{a['id']}/confirm", json={"display_name": "Dana"}, headers=auth_headers)
+    resp = events_client.get(f"/events/{a['id']}/participants", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert [p["display_name"] for p in resp.json()] == ["Dana"]
+
+
+def test_listing_tag_expires_when_an_event_ends(events_client, auth_headers):
+    now = datetime.now(timezone.utc)
+    events_client.post("/events", json=event_payload(
+        now - timedelta(hours=1), end_time=(now + timedelta(milliseconds=300)).isoformat(),
+    ), headers=auth_headers)
+    first = events_client.get("/events")
+    assert len(first.json()) == 1
+
+    time.sleep(0.4)
+    resp = events_client.get("/events", headers={"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+def test_write_from_another_process_changes_the_tags(events_client, auth_headers, engine):
+    event_id = events_client.post("/events", json=event_payload(), headers=auth_headers).json()["id"]
+    listing = events_client.get("/events").headers["etag"]
+    detail = events_client.get(f"/events/{event_id}").headers["etag"]
+
+    # another worker (or the job worker) commits; nothing in this process hears of it
+    with Session(engine) as db:
+        db.execute(update(Event).where(Event.id == event_id).values(title="Renamed"))
+        record_change(db, [event_id], "update")
+        db.commit()
+
+    resp = events_client.get("/events", headers={"If-None-Match": listing})
+    assert resp.status_code == 200
+    assert resp.json()[0]["title"] == "Renamed"  # not the cached body either
+    resp = events_client.get(f"/events/{event_id}", headers={"If-None-Match": detail})
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "Renamed"
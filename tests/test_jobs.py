@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.models.event import Event
+from backend.models.job import Job
+from backend.routers import events as events_router
+from backend.services import jobs
+
+
+@pytest.fixture()
+def factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture()
+def kinds(monkeypatch):
+    registry = {}
+    monkeypatch.setattr(jobs, "KINDS", registry)
+    return registry
+
+
+def _job(factory, job_id):
+    with factory() as db:
+        return db.get(Job, job_id)
+
+
+def _make_due(factory, job_id):
+    with factory() as db:
+        db.execute(update(Job).where(Job.id == job_id).values(run_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        db.commit()
+
+
+def test_idempotency_key_queues_once(factory):
+    with factory() as db:
+        first = jobs.enqueue(db, "noop", {"n": 1}, key="k1")
+        again = jobs.enqueue(db, "noop", {"n": 2}, key="k1")
+        jobs.enqueue_many(db, "noop", [({"n": 3}, "k1"), ({"n": 4}, "k2"), ({"n": 5}, None)])
+        db.commit()
+        assert first is not None and again is None
+        assert db.scalar(select(func.count()).select_from(Job)) == 3
+
+
+def test_worker_runs_and_reports(factory, kinds):
+    seen = []
+
+    @jobs.handler("record")
+    def record(db, job):
+        seen.append(job.payload["n"])
+
+    with factory() as db:
+        for n in range(3):
+            jobs.enqueue(db, "record", {"n": n})
+        db.commit()
+        assert jobs.stats(db)[0].due == 3
+
+    assert jobs.Worker(factory).drain() == 3
+    assert sorted(seen) == [0, 1, 2]
+    with factory() as db:
+        s, = jobs.stats(db)
+        assert (s.kind, s.queued, s.due, s.done) == ("record", 0, 0, 3)
+        assert s.wait_p95_seconds is not None and s.run_p95_seconds is not None
+
+
+def test_failures_back_off_then_fail(factory, kinds):
+    calls = []
+
+    @jobs.handler("flaky")
+    def flaky(db, job):
+        calls.append(job.attempts)
+        raise RuntimeError("upstream down")
+
+    with factory() as db:
+        job_id = jobs.enqueue(db, "flaky", max_attempts=3)
+        db.commit()
+    worker = jobs.Worker(factory)
+    worker.drain()
+    job = _job(factory, job_id)
+    assert (job.status, job.attempts, job.last_error) == ("queued", 1, "RuntimeError: upstream down")
+    assert job.run_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)  # backing off
+    assert worker.drain() == 0
+
+    for _ in range(2):
+        _make_due(factory, job_id)
+        worker.drain()
+    assert calls == [1, 2, 3]
+    assert _job(factory, job_id).status == "failed"
+    with factory() as db:
+        assert [f["id"] for f in jobs.recent_failures(db)] == [job_id]
+
+
+def test_permanent_error_and_unknown_kind_fail_at_once(factory, kinds):
+    @jobs.handler("bad")
+    def bad(db, job):
+        raise jobs.PermanentError("malformed payload")
+
+    with factory() as db:
+        bad_id = jobs.enqueue(db, "bad")
+        db.commit()
+    jobs.Worker(factory).drain()
+    assert _job(factory, bad_id).status == "failed"
+
+    with factory() as db:
+        orphan_id = jobs.enqueue(db, "nobody-handles-this")
+        db.commit()
+        (orphan,) = jobs.claim(db, "w", "nobody-handles-this", 1)
+    assert jobs.run_job(factory, orphan, "w") == "failed"
+
+
+def test_expired_lease_is_taken_over_and_stale_worker_rolled_back(factory, kinds):
+    @jobs.handler("rename")
+    def rename(db, job):
+        db.execute(update(Event).where(Event.id == job.payload["id"]).values(title=job.locked_by))
+
+    now = datetime.now(timezone.utc)
+    with factory() as db:
+        db.add(Event(id=1, title="t", description="d", address="a", start_time=now, end_time=now + timedelta(hours=1)))
+        job_id = jobs.enqueue(db, "rename", {"id": 1})
+        db.commit()
+    with factory() as db:
+        (stale,) = jobs.claim(db, "a", "rename", 1, lease=0)  # worker a stalls past its lease
+    with factory() as db:
+        (fresh,) = jobs.claim(db, "b", "rename", 1)
+    assert fresh.id == stale.id == job_id and fresh.attempts == 2
+
+    assert jobs.run_job(factory, fresh, "b") == "done"
+    assert jobs.run_job(factory, stale, "a") == "lost"
+    with factory() as db:
+        assert db.get(Event, 1).title == "b"
+
+
+def test_poll_respects_per_kind_limit(factory, kinds):
+    jobs.handler("slow", concurrency=1)(lambda db, job: None)
+    jobs.handler("fast", concurrency=5)(lambda db, job: None)
+    with factory() as db:
+        for _ in range(3):
+            jobs.enqueue(db, "slow")
+            jobs.enqueue(db, "fast")
+        db.commit()
+    claimed = jobs.Worker(factory, concurrency=3).poll()
+    assert sorted(j.kind for j in claimed) == ["fast", "fast", "slow"]
+
+
+def test_event_without_coordinates_is_geocoded_in_background(events_client, auth_headers, factory, monkeypatch):
+    looked_up = []
+
+    def fake_geocode(address):
+        looked_up.append(address)
+        return (32.08, 34.78)
+
+    monkeypatch.setattr(events_router, "_geocode", fake_geocode)
+    now = datetime.now(timezone.utc)
+    resp = events_client.post("/events", headers=auth_headers, json={
+        "title": "Flood", "description": "d", "address": "Dizengoff 50, Tel Aviv",
+        "start_time": now.isoformat(), "end_time": (now + timedelta(hours=1)).isoformat(),
+    })
+    assert resp.status_code == 201, resp.text
+    event_id = resp.json()["id"]
+    assert resp.json()["lat"] is None and looked_up == []  # nothing done in the request
+    listing = events_client.get("/events").headers["etag"]
+    detail = events_client.get(f"/events/{event_id}").headers["etag"]
+
+    assert jobs.Worker(factory).drain() == 1
+    assert looked_up == ["Dizengoff 50, Tel Aviv"]
+    # the job's change record moves the tags on, wherever the worker runs
+    resp = events_client.get(f"/events/{event_id}", headers={"If-None-Match": detail})
+    assert resp.status_code == 200 and resp.json()["lat"] == 32.08
+    resp = events_client.get("/events", headers={"If-None-Match": listing})
+    assert resp.status_code == 200 and resp.json()[0]["lng"] == 34.78
+
+    # one coordinate without the other is rejected
+    resp = events_client.post("/events", headers=auth_headers, json={
+        "title": "x", "description": "d", "address": "a", "lat": 32.0,
+        "start_time": now.isoformat(), "end_time": (now + timedelta(hours=1)).isoformat(),
+    })
+    assert resp.status_code == 400
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.core.metrics import MetricsMiddleware, Registry, install_db_hooks
+from backend.routers.metrics import router as metrics_router
+
+
+def test_sharded_counters_and_histograms_sum_across_threads():
+    reg = Registry()
+    hits = reg.counter("hits_total", "hits", ("route",))
+    lat = reg.histogram("lat_seconds", "latency", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            hits.inc(("/events",))
+            lat.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = reg.render()
+    assert 'hits_total{route="/events"} 4000' in text
+    assert 'lat_seconds_bucket{le="0.1"} 0' in text
+    assert 'lat_seconds_bucket{le="1"} 4000' in text
+    assert 'lat_seconds_bucket{le="+Inf"} 4000' in text
+    assert "lat_seconds_count 4000" in text
+
+
+def test_requests_are_measured_per_route_with_db_usage(events_client):
+    install_db_hooks()
+    app = events_client.app
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    assert events_client.get("/events/12345").status_code == 404
+    text = events_client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/events/{event_id}",status="404"}' in text
+    assert 'db_queries_per_request_bucket{route="/events/{event_id}",le="1"}' in text
+    assert "http_requests_in_flight" in text
+
+
+def test_failed_statements_leave_nothing_on_the_pooled_connection(engine):
+    install_db_hooks()
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert not conn.info.get("metrics_start")
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from backend.models.event import Event, EventSummary
+from backend.services import partitions, summary
+from conftest import event_payload
+
+
+def test_month_arithmetic_and_names():
+    month = partitions.month_start(datetime(2025, 11, 17, 8, 30, tzinfo=timezone.utc))
+    assert month == datetime(2025, 11, 1, tzinfo=timezone.utc)
+    assert partitions.add_months(month, 2) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert partitions.add_months(month, -11) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert partitions.partition_name("event", month) == "event_p2025_11"
+
+
+def test_parse_bound():
+    lower, upper = partitions.parse_bound("FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2025-02-01 02:00:00+02')")
+    assert lower == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert upper == datetime(2025, 2, 1, tzinfo=timezone.utc)
+    assert partitions.parse_bound("DEFAULT") is None
+
+
+def test_maintenance_is_a_noop_without_partitioned_tables(engine):
+    with engine.begin() as conn:
+        assert partitions.ensure_partitions(conn) == []
+        assert partitions.apply_retention(conn, keep_months=12) == []
+
+
+def test_event_duration_is_capped(events_client, auth_headers):
+    now = datetime.now(timezone.utc)
+    too_long = events_client.post("/events", json=event_payload(now, hours=24 * 31, title="Drill"), headers=auth_headers)
+    assert too_long.status_code == 400 and "at most" in too_long.json()["detail"]
+
+    created = events_client.post("/events", json=event_payload(now, title="Drill"), headers=auth_headers).json()
+    stretched = events_client.patch(
+        f"/events/{created['id']}", json={"end_time": (now + timedelta(days=40)).isoformat()}, headers=auth_headers
+    )
+    assert stretched.status_code == 400
+    # rolled back: the stored end_time is unchanged
+    assert events_client.get(f"/events/{created['id']}").json()["end_time"][:19] == created["end_time"][:19]
+
+
+def test_events_longer_than_the_cap_stay_editable(events_client, auth_headers, engine):
+    now = datetime.now(timezone.utc)
+    with Session(engine) as db:  # stored before the cap existed
+        legacy = Event(title="Evacuation", description="Long running", address="Herzl 1, Rishon LeZion",
+                       start_time=now, end_time=now + timedelta(days=60))
+        db.add(legacy)
+        db.commit()
+        event_id = legacy.id
+
+    renamed = events_client.patch(f"/events/{event_id}", json={"title": "Evacuation (north)"}, headers=auth_headers)
+    assert renamed.status_code == 200, renamed.text
+    moved = events_client.patch(
+        f"/events/{event_id}", json={"end_time": (now + timedelta(days=50)).isoformat()}, headers=auth_headers
+    )
+    assert moved.status_code == 400
+
+
+def test_historical_window(events_client, auth_headers):
+    now = datetime.now(timezone.utc)
+    for days in (3, 40, 70):
+        events_client.post("/events", json=event_payload(now - timedelta(days=days), title=f"{days}d ago"), headers=auth_headers)
+
+    titles = lambda resp: [e["title"] for e in resp.json()]  # noqa: E731
+    assert titles(events_client.get("/events/historical")) == ["3d ago", "40d ago", "70d ago"]
+    after = (now - timedelta(days=50)).isoformat()
+    before = (now - timedelta(days=10)).isoformat()
+    assert titles(events_client.get("/events/historical", params={"after": after})) == ["3d ago", "40d ago"]
+    assert titles(events_client.get("/events/historical", params={"after": after, "before": before})) == ["40d ago"]
+
+
+class _Recorder:
+    """Stands in for a PostgreSQL connection; records the DDL/DML issued."""
+
+    def __init__(self):
+        self.sql = []
+
+    def exec_driver_sql(self, sql):
+        self.sql.append(sql)
+
+
+def test_retention_releases_summaries_before_dropping(monkeypatch):
+    old = partitions.Partition("{}_p2020_01", datetime(2020, 1, 1, tzinfo=timezone.utc),
+                               datetime(2020, 2, 1, tzinfo=timezone.utc))
+    monkeypatch.setattr(partitions, "is_partitioned", lambda conn, table: table in ("event", "participant"))
+    monkeypatch.setattr(partitions, "_exists", lambda conn, table: True)
+    monkeypatch.setattr(partitions, "list_partitions",
+                        lambda conn, table: [partitions.Partition(old.name.format(table), old.lower, old.upper)])
+    conn = _Recorder()
+
+    removed = partitions.apply_retention(conn, keep_months=12, drop=True, now=datetime(2025, 6, 1, tzinfo=timezone.utc))
+    assert removed == ["event_p2020_01", "participant_p2020_01"]
+    assert conn.sql[0] == "ALTER TABLE event DETACH PARTITION event_p2020_01"
+    assert conn.sql[1] == "DELETE FROM event_summary WHERE event_id IN (SELECT id FROM event_p2020_01)"
+    # the listing ETags and delta sync see the archived events go
+    assert conn.sql[2] == ("INSERT INTO event_change (event_id, op, changed_at) "
+                           "SELECT DISTINCT id, 'delete', CURRENT_TIMESTAMP FROM event_p2020_01")
+    assert conn.sql[3] == "DROP TABLE event_p2020_01"
+    assert conn.sql[4] == "ALTER TABLE participant DETACH PARTITION participant_p2020_01"
+    assert conn.sql[5].startswith("UPDATE event_summary SET confirmations = event_summary.confirmations - gone.n")
+    assert "FROM participant_p2020_01 GROUP BY event_id" in conn.sql[5]
+    assert conn.sql[6] == ("INSERT INTO event_change (event_id, op, changed_at) "
+                           "SELECT DISTINCT event_id, 'update', CURRENT_TIMESTAMP FROM participant_p2020_01")
+    assert conn.sql[7] == "DROP TABLE participant_p2020_01"
+
+
+def test_released_summaries_match_the_base_tables(events_client, auth_headers, engine):
+    start = datetime.now(timezone.utc)
+    gone = events_client.post("/events", json=event_payload(start, title="archived"), headers=auth_headers).json()["id"]
+    kept = events_client.post("/events", json=event_payload(start, title="kept"), headers=auth_headers).json()["id"]
+    for event_id in (gone, kept, kept):
+        events_client.post(f"/events/{event_id}/confirm", json={"display_name": "Noa"}, headers=auth_headers)
+    etag = events_client.get("/events").headers["etag"]
+
+    # what a detach amounts to: the rows move to a standalone table and no
+    # DELETE trigger fires
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE event_p2020_01 AS SELECT * FROM event WHERE id = {gone}")
+        conn.exec_driver_sql(
+            f"CREATE TABLE participant_p2020_01 AS SELECT * FROM participant WHERE event_id = {kept} LIMIT 1")
+        conn.exec_driver_sql("DROP TRIGGER trg_event_summary_delete")
+        conn.exec_driver_sql("DROP TRIGGER trg_participant_summary_delete")
+        conn.exec_driver_sql("DELETE FROM participant WHERE id IN (SELECT id FROM participant_p2020_01)")
+        conn.exec_driver_sql(f"DELETE FROM event WHERE id = {gone}")
+
+        partitions._release_summaries(conn, "event", "event_p2020_01")
+        partitions._release_summaries(conn, "participant", "participant_p2020_01")
+        partitions._record_changes(conn, "event", "event_p2020_01")
+        partitions._record_changes(conn, "participant", "participant_p2020_01")
+
+    with Session(engine) as db:
+        assert summary.find_drift(db) == []
+        assert db.get(EventSummary, gone) is None
+        assert db.get(EventSummary, kept).confirmations == 1
+
+    listing = events_client.get("/events", headers={"If-None-Match": etag})
+    assert listing.status_code == 200
+    assert [e["id"] for e in listing.json()] == [kept]
@@ -0,0 +1,76 @@
+"""Hot queries must be served by an index, never a full table scan.
+
+Runs against SQLite by default; set EXPLAIN_DATABASE_URL to a PostgreSQL URL
+to check the same shapes there (the schema is created in a scratch schema).
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from backend.core.explain import explain, full_scans
+from backend.models.base import Base
+from backend.models.event import Event, EventChange, EventSummary, Participant
+from backend.models.user import User
+from backend.services.search import statement as search_statement
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+HOT_QUERIES = {
+    # GET /events and /events/historical
+    "events.active": select(Event).where(Event.end_time >= NOW, Event.start_time >= NOW - timedelta(days=30)).order_by(Event.start_time.asc()),
+    "events.historical": select(Event).where(Event.end_time < NOW, Event.start_time < NOW).order_by(Event.start_time.desc()),
+    "events.next_end": select(func.min(Event.end_time)).where(Event.end_time >= NOW),
+    "events.window": select(Event).where(Event.end_time >= NOW, Event.end_time < NOW + timedelta(days=1)),
+    "events.bbox": select(Event).where(Event.lat.between(31.7, 31.9), Event.lng.between(35.1, 35.3)),
+    "events.by_author": select(Event).where(Event.created_by_user_id == 1),
+    # GET /events/search?when=historical (dialect-specific SQL)
+    "events.search": lambda dialect: search_statement(dialect, "flood haifa", Event.end_time < NOW, Event.start_time < NOW),
+    # GET /events/{id}/participants and the confirm recount
+    "participants.by_event": select(Participant).where(Participant.event_id == 1).order_by(Participant.confirmed_at.asc()),
+    "participants.count": select(func.count()).select_from(Participant).where(Participant.event_id == 1),
+    "participants.by_user": select(Participant).where(Participant.user_id == 1),
+    "summary.by_event": select(EventSummary.confirmations).where(EventSummary.event_id == 1),
+    # POST /auth/login
+    "users.login": select(User).where(func.lower(User.email) == "ran@example.com"),
+    # GET /events/changes
+    "changes.since": select(EventChange).where(EventChange.seq > 10).order_by(EventChange.seq.asc()).limit(100),
+}
+
+
+@pytest.fixture(scope="module")
+def conn():
+    url = os.getenv("EXPLAIN_DATABASE_URL")
+    if url:
+        eng = create_engine(url)
+        with eng.connect() as c:
+            c.exec_driver_sql("CREATE SCHEMA IF NOT EXISTS explain_check")
+            c.exec_driver_sql("SET search_path TO explain_check")
+            Base.metadata.create_all(c)
+            c.commit()
+            yield c
+            c.exec_driver_sql("DROP SCHEMA explain_check CASCADE")
+            c.commit()
+        eng.dispose()
+        return
+    eng = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(eng)
+    with eng.connect() as c:
+        yield c
+    eng.dispose()
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(conn, name):
+    stmt = HOT_QUERIES[name]
+    if callable(stmt):
+        stmt = stmt(conn.dialect.name)
+    scans = full_scans(conn, stmt)
+    assert not scans, f"{name} scans {scans}:\n" + "\n".join(explain(conn, stmt))
+
+
+def test_harness_flags_unindexed_filters(conn):
+    # description has no index: the check must notice
+    assert full_scans(conn, select(Event).where(Event.description == "x")) == ["event"]
@@ -0,0 +1,128 @@
+"""Read routing against two local databases: a primary and its "replicas".
+
+Nothing replicates between the files, so which database answered a read is
+visible in the data it returns.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend import database
+from backend.core.replicas import ReplicaSet, Stickiness
+from backend.models.base import Base
+from backend.models.event import Event
+from backend.routers import events as events_router
+from backend.security_simple import create_access_token
+from conftest import event_payload
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _db(path, title=None):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    if title:
+        now = datetime.now(timezone.utc)
+        with engine.begin() as conn:
+            conn.execute(insert(Event), [dict(
+                title=title, description="seed", address="Jaffa 1, Jerusalem", lat=31.78, lng=35.22,
+                start_time=now, end_time=now + timedelta(hours=1),
+            )])
+    return engine
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def routed(tmp_path, monkeypatch, response_cache, clock):
+    primary = _db(tmp_path / "primary.db", "primary")
+    monkeypatch.setattr(database, "_engine", primary)
+    monkeypatch.setattr(database, "_SessionLocal", sessionmaker(bind=primary, autoflush=False, expire_on_commit=False))
+    monkeypatch.setattr(database, "stickiness", Stickiness(window=5.0, clock=clock))
+
+    def configure(**engines):
+        replicas = ReplicaSet(engines, retry_seconds=30.0, clock=clock)
+        monkeypatch.setattr(database, "_replicas", replicas)
+        return replicas
+
+    app = FastAPI()
+    app.include_router(events_router.router)
+    return TestClient(app), configure
+
+
+def _title(client, headers=None, event_id=1):
+    resp = client.get(f"/events/{event_id}", headers=headers or {})
+    return resp.json()["title"] if resp.status_code == 200 else resp.status_code
+
+
+def test_reads_rotate_over_replicas(routed, tmp_path):
+    client, configure = routed
+    configure(r1=_db(tmp_path / "r1.db", "replica 1"), r2=_db(tmp_path / "r2.db", "replica 2"))
+    assert [_title(client) for _ in range(4)] == ["replica 1", "replica 2", "replica 1", "replica 2"]
+
+
+def test_writer_reads_own_write_until_window_ends(routed, tmp_path, clock):
+    client, configure = routed
+    configure(r1=_db(tmp_path / "r1.db", "replica 1"))
+    writer = {"Authorization": f"Bearer {create_access_token('1')}"}
+    other = {"Authorization": f"Bearer {create_access_token('2')}"}
+    created = client.post("/events", headers=writer, json=event_payload(title="fresh"))
+    assert created.status_code == 201, created.text
+    event_id = created.json()["id"]
+
+    assert _title(client, writer, event_id) == "fresh"  # primary
+    assert _title(client, other, event_id) == 404  # replica has not seen it
+    clock.now += 6
+    assert _title(client, writer, event_id) == 404  # window over: back on the replica
+
+
+def test_unhealthy_replica_is_skipped_then_retried(routed, tmp_path, clock):
+    client, configure = routed
+    replicas = configure(dead=create_engine(f"sqlite:///{tmp_path}/missing/dir/x.db"),
+                         r1=_db(tmp_path / "r1.db", "replica 1"))
+    assert [_title(client) for _ in range(3)] == ["replica 1"] * 3
+    dead = replicas.states()[0]
+    assert (dead["healthy"], dead["failures"]) == (False, 1)
+
+    clock.now += 31  # retry is due: tried again on use, fails again
+    assert _title(client) == "replica 1"
+    assert replicas.states()[0]["failures"] == 2
+
+
+def test_all_replicas_down_falls_back_to_primary(routed, tmp_path):
+    client, configure = routed
+    configure(dead=create_engine(f"sqlite:///{tmp_path}/missing/dir/x.db"))
+    assert _title(client) == "primary"
+
+
+def test_cached_listing_keeps_read_your_writes(routed, tmp_path):
+    client, configure = routed
+    configure(r1=_db(tmp_path / "r1.db", "replica 1"))  # never sees the write below
+    writer = {"Authorization": f"Bearer {create_access_token('1')}"}
+    other = {"Authorization": f"Bearer {create_access_token('2')}"}
+    created = client.post("/events", headers=writer, json=event_payload(title="fresh"))
+    assert created.status_code == 201, created.text
+
+    # another reader fills the cache from the lagging replica first
+    lagging = client.get("/events", headers=other)
+    assert [e["title"] for e in lagging.json()] == ["replica 1"]
+
+    own = client.get("/events", headers=writer)
+    assert "fresh" in [e["title"] for e in own.json()]
+    assert own.headers["etag"] != lagging.headers["etag"]
+    # the replica's tag does not confirm the writer's stale copy either
+    again = client.get("/events", headers={**writer, "If-None-Match": lagging.headers["etag"]})
+    assert again.status_code == 200 and "fresh" in [e["title"] for e in again.json()]
@@ -0,0 +1,41 @@
+import time
+
+from sqlalchemy import event
+
+from backend.core.cache import MemoryBackend
+from conftest import event_payload
+
+
+def test_listing_served_from_cache_until_a_write(events_client, auth_headers, engine, response_cache):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+
+    assert events_client.get("/events").json() == []
+    misses = len(statements)
+    assert misses > 0
+    assert events_client.get("/events").json() == []
+    assert len(statements) == misses + 1  # only the version lookup
+
+    events_client.post("/events", json=event_payload(title="Fresh"), headers=auth_headers)
+    assert [e["title"] for e in events_client.get("/events").json()] == ["Fresh"]
+
+    # query strings are part of the key
+    events_client.get("/events?page=2")
+    stats = response_cache.stats.snapshot()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["hit_latency"]["p50_ms"] is not None
+
+
+def test_memory_backend_evicts_lru_and_expired_entries():
+    backend = MemoryBackend(maxsize=2)
+    backend.set("a", b"1", ttl=60)
+    backend.set("b", b"2", ttl=60)
+    assert backend.get("a") == b"1"
+    backend.set("c", b"3", ttl=60)
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+
+    backend.set("short", b"x", ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("short") is None
@@ -0,0 +1,48 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import security_simple
+from backend.routes.debug import router as debug_router
+
+
+def busy_loop_for_profile(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(debug_router)
+    return TestClient(app)
+
+
+def test_profile_endpoint_is_admin_only(auth_headers, monkeypatch):
+    monkeypatch.setattr(security_simple, "ADMIN_USER_IDS", set())
+    client = _client()
+    assert client.get("/debug/profile?seconds=0.01").status_code == 401
+    assert client.get("/debug/profile?seconds=0.01", headers=auth_headers).status_code == 403
+
+
+def test_profile_samples_busy_thread(auth_headers, monkeypatch):
+    monkeypatch.setattr(security_simple, "ADMIN_USER_IDS", {1})
+    client = _client()
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop_for_profile, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        collapsed = client.get("/debug/profile?seconds=0.3&hz=200", headers=auth_headers)
+        scope = client.get("/debug/profile?seconds=0.2&format=speedscope", headers=auth_headers).json()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert collapsed.status_code == 200
+    line = next(l for l in collapsed.text.splitlines() if "busy_loop_for_profile" in l)
+    assert line.startswith("busy_worker;")
+    assert int(line.rsplit(" ", 1)[1]) > 0
+
+    names = {f["name"] for f in scope["shared"]["frames"]}
+    assert "busy_loop_for_profile" in names
+    assert any(p["name"] == "busy worker" and p["type"] == "sampled" for p in scope["profiles"])
@@ -0,0 +1,62 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.core import profiling
+from backend.core.profiling import ProfilingMiddleware, install_sql_profiler
+from backend import security_simple
+from backend.routes.debug import router as debug_router
+
+
+def _client(events_client, engine):
+    install_sql_profiler(engine)
+    app = events_client.app
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(debug_router)
+    return events_client
+
+
+def test_profile_header_returns_server_timing_and_statements(events_client, engine, monkeypatch, auth_headers):
+    monkeypatch.setattr(profiling.settings, "SQL_PROFILE_HEADER", True)
+    monkeypatch.setattr(security_simple, "ADMIN_USER_IDS", {1})
+    client = _client(events_client, engine)
+
+    plain = client.get("/events/12345")
+    assert "server-timing" not in plain.headers
+
+    res = client.get("/events/12345", headers={"X-Profile-SQL": "1"})
+    assert res.status_code == 404
+    assert res.headers["server-timing"].startswith("db;dur=")
+    profile = client.get(f"/debug/sql-profiles/{res.headers['x-sql-profile-id']}", headers=auth_headers).json()
+    assert profile["route"] == "/events/{event_id}"
+    assert profile["queries"] >= 1
+    assert "12345" in profile["statements"][0]["params"]
+
+
+def test_header_is_ignored_unless_enabled(events_client, engine, monkeypatch):
+    monkeypatch.setattr(profiling.settings, "SQL_PROFILE_HEADER", False)
+    client = _client(events_client, engine)
+    res = client.get("/events/12345", headers={"X-Profile-SQL": "1"})
+    assert "server-timing" not in res.headers
+
+
+def test_slow_queries_are_logged_with_route(events_client, engine, monkeypatch, caplog):
+    monkeypatch.setattr(profiling.settings, "SLOW_QUERY_MS", 0.0)
+    client = _client(events_client, engine)
+    with caplog.at_level(logging.WARNING, logger="app.db.slow"):
+        client.get("/events/12345")
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.db.slow"]
+    assert records and records[0]["route"] == "/events/{event_id}"
+    assert records[0]["method"] == "GET"
+    assert "params" not in records[0]
+
+
+def test_failed_statements_leave_nothing_on_the_pooled_connection(engine):
+    install_sql_profiler(engine)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert not conn.info.get("profile_start")
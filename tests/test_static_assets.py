@@ -0,0 +1,50 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.compression import negotiate
+from backend.core.static import IMMUTABLE, StaticAssets
+
+
+def _client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app.js").write_text("console.log('console');\n" * 200)
+    (tmp_path / "index.html").write_text('<script src="/static/assets/app.js"></script>')
+    assets = StaticAssets(str(tmp_path))
+    app = FastAPI()
+    app.mount("/static", assets)
+    app.add_api_route("/", assets.index, methods=["GET", "HEAD"])
+    return TestClient(app), assets
+
+
+def test_negotiate_respects_q_values_and_server_preference():
+    assert negotiate("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate("*", ["br", "gzip"]) == "br"
+    assert negotiate("deflate", ["br", "gzip"]) == "identity"
+    assert negotiate("deflate, identity;q=0", ["br", "gzip"]) is None
+    assert negotiate(None, ["br"]) == "identity"
+
+
+def test_index_links_hashed_precompressed_immutable_assets(tmp_path):
+    client, assets = _client(tmp_path)
+    url = assets.url_for("assets/app.js")
+    assert url != "/static/assets/app.js"
+
+    index = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert url in index.text
+    assert index.headers["cache-control"] == "no-cache"
+    assert client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": index.headers["etag"]}).status_code == 304
+
+    js = client.get(url, headers={"Accept-Encoding": "br, gzip"})
+    assert js.headers["cache-control"] == IMMUTABLE
+    assert js.headers["content-encoding"] in ("br", "gzip")
+    assert js.headers["vary"] == "Accept-Encoding"
+    assert int(js.headers["content-length"]) < len(js.content)
+
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == js.content
+
+    legacy = client.get("/static/assets/app.js")
+    assert legacy.status_code == 200 and legacy.headers["cache-control"] == "no-cache"
+    assert client.get("/static/assets/missing.js").status_code == 404
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+import casualty_management_app as proto
+from backend.models.trail import LocationTrail
+from backend.services import trails
+from backend.services.trails import RECORD, Trail, TrailStore, decode, encode, history, simplify
+
+T0 = 1_760_000_000
+
+
+def _walk(n, start=0):
+    # east along a street, then north: one corner every 100 points
+    out = []
+    lat, lng = 32.0, 34.8
+    for i in range(start, start + n):
+        if (i // 100) % 2:
+            lat += 1e-4
+        else:
+            lng += 1e-4
+        out.append((lat, lng, T0 + i))
+    return out
+
+
+def test_douglas_peucker_keeps_corners_only():
+    pts = np.array(_walk(300), RECORD)
+    kept = simplify(pts, tolerance_m=5)
+    assert list(kept) == [0, 99, 199, 299]
+
+
+def test_trail_memory_is_bounded_and_recent_points_exact():
+    trail = Trail(capacity=64)
+    walk = _walk(5000)
+    for p in walk:
+        assert trail.append(*p)
+    assert trail.n <= 64 and trail.points.nbytes == 64 * RECORD.itemsize
+    t = trail.points["t"][:trail.n]
+    assert np.all(np.diff(t) > 0)
+    # the newest points are untouched, the oldest survive as coarse anchors
+    assert t[-16:].tolist() == [p[2] for p in walk[-16:]]
+    assert t[0] == T0
+    assert not trail.append(32.0, 34.8, T0)  # late resend
+
+
+def test_encode_round_trip_is_compact():
+    pts = np.array(_walk(512), RECORD)
+    blob = encode(pts)
+    back = decode(blob)
+    assert back["t"].tolist() == pts["t"].tolist()
+    assert np.abs(back["lat"] - pts["lat"]).max() < 2e-6 and np.abs(back["lng"] - pts["lng"]).max() < 2e-6
+    assert len(blob) < pts.nbytes / 4
+
+
+def test_flush_writes_only_new_points_and_survives_failures(engine):
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    store = TrailStore(capacity=64)
+    now = T0 + 10_000
+    for p in _walk(40):
+        store.record("avi", *p)
+    assert store.flush(factory, now=now) == 40
+    for p in _walk(50, start=40):  # compacts once before the next flush
+        store.record("avi", *p)
+
+    def broken():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        store.flush(broken, now=now)
+    written = store.flush(factory, now=now)
+    assert 0 < written <= 50
+
+    with factory() as db:
+        assert db.scalar(select(func.count()).select_from(LocationTrail)) == 2
+        stored = history(db, "avi")
+        assert stored["t"][:40].tolist() == list(range(T0, T0 + 40))
+        assert stored["t"][-1] == T0 + 89 and np.all(np.diff(stored["t"]) > 0)
+        since = datetime.fromtimestamp(T0 + 85, timezone.utc)
+        assert history(db, "avi", since=since)["t"].tolist() == list(range(T0 + 85, T0 + 90))
+
+    # fully flushed and idle for a day: dropped from memory
+    assert store.flush(factory, now=T0 + 90 + trails.IDLE_SECONDS + 1) == 0
+    assert store.trail("avi") is None
+
+
+def test_idle_trails_are_evicted_without_flushing():
+    store = TrailStore(capacity=64)
+    store.record("gone", 32.0, 34.8, T0)
+    store.record("active", 32.0, 34.8, T0 + trails.IDLE_SECONDS)
+    later = T0 + trails.IDLE_SECONDS + 1
+    assert store.evict_idle(now=later) == 0  # would lose points a flush still has to store
+    assert store.evict_idle(now=later, unflushed=True) == 1
+    assert store.trail("gone") is None and len(store.trail("active")) == 1
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(proto, "trails", TrailStore())
+    monkeypatch.setattr(proto, "user_locations", {})
+    return TestClient(proto.app)
+
+
+def test_trail_endpoint(client):
+    start = datetime(2025, 10, 18, 12, 0, 0)
+    for i in range(5):
+        client.post("/tracking/update", json={
+            "username": "rivka", "lat": 32.0 + i * 0.001, "lng": 34.8, "timestamp": (start + timedelta(seconds=i)).isoformat()})
+
+    body = client.get("/tracking/rivka/trail").json()
+    assert [p["lat"] for p in body["points"]] == [32.0, 32.001, 32.002, 32.003, 32.004]
+    assert body["points"][0]["timestamp"] == "2025-10-18T12:00:00+00:00"
+    since = (start + timedelta(seconds=3)).isoformat()
+    assert len(client.get("/tracking/rivka/trail", params={"since": since}).json()["points"]) == 2
+    assert client.get("/tracking/nobody/trail").status_code == 404
@@ -0,0 +1,50 @@
+"""Round trips per write endpoint: every cursor execute plus the COMMIT."""
+import pytest
+from sqlalchemy import event
+
+from conftest import event_payload
+
+
+@pytest.fixture()
+def round_trips(engine):
+    log = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cur, stmt, *a: log.append(stmt.split()[0]))
+    event.listen(engine, "commit", lambda conn: log.append("COMMIT"))
+    return log
+
+
+def test_create_event_round_trips(events_client, auth_headers, round_trips):
+    resp = events_client.post("/events", json=event_payload(), headers=auth_headers)
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["participants"] == []
+    # INSERT event RETURNING id, INSERT change row, COMMIT; no refresh SELECT
+    assert round_trips == ["INSERT", "INSERT", "COMMIT"]
+
+
+def test_confirm_attendance_round_trips(events_client, auth_headers, round_trips):
+    event_id = events_client.post("/events", json=event_payload(), headers=auth_headers).json()["id"]
+    round_trips.clear()
+    resp = events_client.post(f"/events/{event_id}/confirm", json={"display_name": "Yael"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert [p["display_name"] for p in resp.json()["participants"]] == ["Yael"]
+    assert resp.json()["is_locked_for_edit"] is True
+    # UPDATE ... RETURNING (existence + recount), INSERT participant,
+    # SELECT participants for the response, INSERT change row, COMMIT
+    assert round_trips == ["UPDATE", "INSERT", "SELECT", "INSERT", "COMMIT"]
+
+    round_trips.clear()
+    assert events_client.post("/events/404/confirm", json={"display_name": "x"}, headers=auth_headers).status_code == 404
+    assert round_trips == ["UPDATE"]
+
+
+def test_edit_event_round_trips(events_client, auth_headers, round_trips):
+    event_id = events_client.post("/events", json=event_payload(), headers=auth_headers).json()["id"]
+    round_trips.clear()
+    resp = events_client.patch(f"/events/{event_id}", json={"title": "Partial collapse"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["title"] == "Partial collapse"
+    assert round_trips == ["UPDATE", "SELECT", "INSERT", "COMMIT"]
+
+    events_client.post(f"/events/{event_id}/confirm", json={"display_name": "Yael"}, headers=auth_headers)
+    locked = events_client.patch(f"/events/{event_id}", json={"title": "x"}, headers=auth_headers)
+    assert locked.status_code == 400
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+
+import casualty_management_app as proto
+from backend import ws as ws_module
+from backend.ws import Hub
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    hub = Hub(buffer_size=10)
+    hub.set_snapshot(proto.WS_TOPIC, proto.ws_snapshot)
+    monkeypatch.setattr(proto, "hub", hub)
+    monkeypatch.setattr(proto, "user_locations", {})
+    return TestClient(proto.app)
+
+
+def _expand(value, keys):
+    if isinstance(value, dict):
+        return {keys.get(k, k): _expand(v, keys) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v, keys) for v in value]
+    return value
+
+
+def test_msgpack_subscriber_gets_short_binary_frames(client, monkeypatch):
+    calls = []
+    real_encode = ws_module.encode
+    monkeypatch.setattr(ws_module, "encode", lambda m, fmt: calls.append(fmt) or real_encode(m, fmt))
+
+    with client.websocket_connect("/ws/events", subprotocols=["zufar.msgpack"]) as packed, \
+            client.websocket_connect("/ws/events?format=msgpack") as packed2, \
+            client.websocket_connect("/ws/events") as text:
+        hello = msgpack.unpackb(packed.receive_bytes())
+        assert hello["format"] == "msgpack" and hello["type"] == "hello"
+        packed2.receive_bytes()
+        assert text.receive_json()["format"] == "json"
+
+        client.post("/tracking/update", json={"username": "rabbi1", "lat": 32.1, "lng": 34.8,
+                                              "timestamp": datetime(2025, 1, 1).isoformat()})
+        frame = packed.receive_bytes()
+        assert packed2.receive_bytes() == frame
+        as_json = text.receive_json()
+
+    compact = msgpack.unpackb(frame)
+    assert hello["types"][compact["t"]] == "location_update"
+    expanded = _expand(compact, hello["keys"])
+    expanded["type"] = hello["types"][expanded.pop("type")]
+    assert expanded == as_json
+    assert len(frame) < 0.7 * len(json.dumps(as_json, separators=(",", ":")))
+    # one encode per format, shared by every subscriber of that format
+    assert sorted(calls) == ["json", "msgpack"]
+
+
+def test_binary_frames_from_clients_are_ignored(client):
+    with client.websocket_connect("/ws/events?format=msgpack") as packed:
+        packed.receive_bytes()  # hello
+        packed.send_bytes(msgpack.packb({"ping": 1}))
+        packed.send_text("ping")
+        client.post("/tracking/update", json={"username": "rabbi1", "lat": 32.1, "lng": 34.8,
+                                              "timestamp": datetime(2025, 1, 1).isoformat()})
+        assert msgpack.unpackb(packed.receive_bytes())["t"] is not None
+    # the socket left the hub when it closed
+    assert not proto.hub.topics[proto.WS_TOPIC].subscribers
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend import ws as ws_module
+from backend.ws import Hub
+
+
+class FakeSocket:
+    """Records frames; ``gate`` (when set) holds every send until released."""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.frames = []
+        self.closed = None
+
+    async def send_text(self, payload):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.frames.append(payload)
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+def _in_thread(fn):
+    # a sync route handler: runs off the loop, in another thread
+    return asyncio.get_running_loop().run_in_executor(None, fn)
+
+
+async def _until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def test_publish_nowait_returns_before_slow_socket_is_sent():
+    async def scenario():
+        hub = Hub()
+        gate = asyncio.Event()
+        slow = FakeSocket(gate)
+        await hub.subscribe(FakeSocket(), "t")  # hello goes to an ungated socket
+        hub.topic("t").subscribers[slow] = "json"
+
+        def handler():
+            start = time.perf_counter()
+            hub.publish_nowait("t", {"type": "event_update"})
+            return time.perf_counter() - start
+
+        took = await _in_thread(handler)
+        assert took < 0.05 and slow.frames == []
+        gate.set()
+        await _until(lambda: slow.frames)
+        assert '"seq":1' in slow.frames[0]
+        assert hub.queued() == 0
+
+    asyncio.run(scenario())
+
+
+def test_stuck_socket_is_dropped_and_does_not_hold_up_others(monkeypatch):
+    monkeypatch.setattr(ws_module, "SEND_TIMEOUT", 0.05)
+
+    async def scenario():
+        hub = Hub()
+        fast, stuck = FakeSocket(), FakeSocket(asyncio.Event())
+        await hub.subscribe(fast, "t")
+        hub.topic("t").subscribers[stuck] = "json"
+        await _in_thread(lambda: hub.publish_nowait("t", {"n": 1}))
+        await _until(lambda: len(fast.frames) == 2)
+        await _until(lambda: stuck not in hub.topic("t").subscribers)
+        await _until(lambda: stuck.closed == 1013)  # its client reconnects and resumes
+        await _in_thread(lambda: hub.publish_nowait("t", {"n": 2}))
+        await _until(lambda: len(fast.frames) == 3)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_keeps_messages_for_resume():
+    async def scenario():
+        hub = Hub(queue_size=1)
+        gate = asyncio.Event()
+        slow = FakeSocket(gate)
+        await hub.subscribe(FakeSocket(), "t")
+        hub.topic("t").subscribers[slow] = "json"
+
+        await _in_thread(lambda: hub.publish_nowait("t", {"n": 0}))
+        await _until(lambda: hub.topic("t").seq == 1)  # the dispatcher is stuck sending it
+        # n=1 fills the queue; 2 and 3 overflow into the replay buffer only
+        await _in_thread(lambda: [hub.publish_nowait("t", {"n": n}) for n in (1, 2, 3)])
+        await _until(lambda: hub.topic("t").seq == 3)
+        gate.set()
+        await _until(lambda: hub.queued() == 0 and len(slow.frames) == 2)
+        assert [f.message["n"] for f in hub.topic("t").missed_since(0)] == [0, 2, 3, 1]
+
+    asyncio.run(scenario())
+
+
+def test_publish_without_a_running_loop_is_buffered():
+    hub = Hub()
+    threads = [threading.Thread(target=hub.publish_nowait, args=("t", {"n": n})) for n in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(f.seq for f in hub.topic("t").buffer) == list(range(1, 11))
@@ -0,0 +1,62 @@
+from collections import deque
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import casualty_management_app as proto
+from backend.ws import Hub
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    hub = Hub(buffer_size=3)
+    hub.set_snapshot(proto.WS_TOPIC, proto.ws_snapshot)
+    monkeypatch.setattr(proto, "hub", hub)
+    monkeypatch.setattr(proto, "events", {})
+    return TestClient(proto.app)
+
+
+def _create(client, title):
+    resp = client.post("/events/create", json={
+        "title": title, "description": "d", "reporter": "police", "severity": "high",
+        "datetime": datetime.utcnow().isoformat(), "lat": 32.0, "lng": 34.8, "people_required": 2,
+    })
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def test_resume_replays_only_missed_messages(client):
+    with client.websocket_connect("/ws/events") as ws:
+        hello = ws.receive_json()
+        assert hello["type"] == "hello" and hello["seq"] == 0
+        _create(client, "first")
+        live = ws.receive_json()
+        assert live["seq"] == 1 and live["type"] == "new_event"
+
+    _create(client, "second")
+    _create(client, "third")
+
+    with client.websocket_connect(f"/ws/events?epoch={hello['epoch']}&last_seq=1") as ws:
+        assert ws.receive_json()["seq"] == 3
+        replayed = [ws.receive_json(), ws.receive_json()]
+        assert [m["seq"] for m in replayed] == [2, 3]
+        assert [m["data"]["title"] for m in replayed] == ["second", "third"]
+
+
+def test_gap_larger_than_buffer_gets_snapshot(client):
+    with client.websocket_connect("/ws/events") as ws:
+        epoch = ws.receive_json()["epoch"]
+    for i in range(5):
+        _create(client, f"e{i}")
+
+    with client.websocket_connect(f"/ws/events?epoch={epoch}&last_seq=0") as ws:
+        ws.receive_json()
+        snap = ws.receive_json()
+        assert snap["type"] == "snapshot" and snap["seq"] == 5
+        assert sorted(e["title"] for e in snap["data"]["events"]) == [f"e{i}" for i in range(5)]
+
+    # a restarted server (different epoch) also answers with a snapshot
+    with client.websocket_connect("/ws/events?epoch=stale&last_seq=5") as ws:
+        ws.receive_json()
+        assert ws.receive_json()["type"] == "snapshot"